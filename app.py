@@ -8,14 +8,40 @@ News Ticker Service for Naebak Platform (Upgraded Version)
 Technology: Flask + JSON Files
 """
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, g, jsonify, request
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+import base64
+import binascii
 import json
 import os
 from datetime import datetime
 import logging
+import time
+
+from archiver import AgingArchiver
+from change_feed import ChangeLog
+from invalidation import connect_store, create_bus
+from metrics import REGISTRY, render as render_metrics
+from news_model import NewsItem
+from news_schedule import SCHEDULE_FIELDS, normalize_time, parse_time
+from news_store import NewsStore, Snapshot, sort_key, supported_encodings
+from news_transfer import export_lines, import_records, iter_ndjson
+from storage import create_backend, load_data, save_data
+from search import SearchIndex
+from ticker_stream import TickerBroadcaster
+
+class NewsJSONProvider(DefaultJSONProvider):
+    """jsonify مع دعم الأخبار المحملة في الذاكرة (NewsItem) بصيغتها الأصلية"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, NewsItem):
+            return o.to_dict()
+        return DefaultJSONProvider.default(o)
 
 app = Flask(__name__)
+app.json = NewsJSONProvider(app)
 CORS(app)
 
 # إعداد التسجيل
@@ -32,64 +58,386 @@ def get_news_file():
 def get_settings_file():
     return app.config.get('SETTINGS_FILE', os.path.join(get_data_dir(), 'settings.json'))
 
+def get_news_backend():
+    return app.config.get('NEWS_BACKEND', 'json')
+
+def get_backend_options():
+    """خيارات محرك التخزين من إعدادات التطبيق"""
+    if get_news_backend() == 'journal':
+        return {
+            'max_bytes': app.config.get('JOURNAL_MAX_BYTES', 1024 * 1024),
+            'max_records': app.config.get('JOURNAL_MAX_RECORDS', 1000),
+        }
+    if get_news_backend() == 'sqlite':
+        return {'db_file': app.config.get('NEWS_DB_FILE', os.path.join(get_data_dir(), 'news.db'))}
+    if get_news_backend() == 'tiered':
+        return {
+            'archive_dir': app.config.get('NEWS_ARCHIVE_DIR', os.path.join(get_data_dir(), 'news.archive')),
+            'segment_cache': app.config.get('NEWS_ARCHIVE_SEGMENT_CACHE', 12),
+        }
+    return {}
+
+def get_archive_policy():
+    """سياسة الأرشفة التلقائية من إعدادات التطبيق، أو None إن لم تُضبط"""
+    max_age_days = app.config.get('ARCHIVE_MAX_AGE_DAYS')
+    keep_newest = app.config.get('ARCHIVE_KEEP_NEWEST')
+    if max_age_days is None and keep_newest is None:
+        return None
+    return {
+        'max_age_days': max_age_days,
+        'keep_newest': keep_newest,
+        'batch_size': app.config.get('ARCHIVE_BATCH_SIZE', 500),
+        'interval': app.config.get('ARCHIVE_INTERVAL', 3600),
+    }
+
+def get_metrics_dir():
+    """مجلد مشترك بين عمال gunicorn لتجميع المقاييس (بدونه تُعرض مقاييس العامل الحالي فقط)"""
+    return app.config.get('METRICS_DIR', os.environ.get('METRICS_DIR'))
+
+def get_invalidation_bus_url():
+    """عنوان ناقل الإبطال بين النسخ (file:///... أو unix:///... أو وسيط مسجل)، أو None لنسخة واحدة"""
+    return app.config.get('INVALIDATION_BUS', os.environ.get('INVALIDATION_BUS'))
+
 # --- دوال مساعدة --- #
 
-def load_data(file_path, default_data=[]):
-    """تحميل البيانات من ملف JSON"""
+def get_change_log_options():
+    return {
+        'log_file': app.config.get('CHANGE_LOG_FILE', get_news_file() + '.changes'),
+        'max_entries': app.config.get('CHANGE_LOG_MAX_ENTRIES', 1000),
+    }
+
+def get_store():
+    """مخزن الأخبار في الذاكرة المرتبط بمسارات الملفات الحالية"""
+    options = get_backend_options()
+    change_log_options = get_change_log_options()
+    stale_window = app.config.get('STALE_WHILE_REVALIDATE', 0.0)
+    bus_url = get_invalidation_bus_url()
+    revalidate_interval = app.config.get('INVALIDATION_REVALIDATE_INTERVAL', 30.0)
+    key = (get_news_backend(), get_news_file(), get_settings_file(), tuple(sorted(options.items())),
+           tuple(sorted(change_log_options.items())), stale_window, bus_url, revalidate_interval)
+    cached = app.extensions.get('news_store')
+    if cached is None or cached[0] != key:
+        if cached is not None and cached[1].invalidation_bus is not None:
+            cached[1].invalidation_bus.close(timeout=1)
+        backend = create_backend(get_news_backend(), get_news_file(), **options)
+        store = NewsStore(backend, get_settings_file(), loader=load_data, saver=save_data, stale_window=stale_window)
+        store.change_log = ChangeLog(**change_log_options)
+        store.subscribe(get_broadcaster().notify)
+        store.subscribe(lambda source, changes: record_changes(store.change_log, source, changes))
+        store.invalidation_bus = None
+        if bus_url:
+            # يُسجل بعد سجل التغييرات فتحمل الرسالة رقم الإصدار الجديد
+            store.invalidation_bus = connect_store(store, create_bus(bus_url), revalidate_interval,
+                                                   version=store.change_log.version)
+        cached = (key, store)
+        app.extensions['news_store'] = cached
+        archiver = get_archiver(store)
+        if archiver is not None and app.config.get('ARCHIVE_AUTOSTART', True):
+            archiver.start()
+    return cached[1]
+
+def get_archiver(store=None):
+    """الأرشفة التلقائية المرتبطة بالمخزن الحالي حسب السياسة المضبوطة، أو None"""
+    store = store or get_store()
+    policy = get_archive_policy()
+    cached = app.extensions.get('archiver')
+    if cached is not None and cached[0] is store and cached[1] == policy:
+        return cached[2]
+    if cached is not None and cached[2] is not None:
+        cached[2].stop()
+    archiver = None
+    if policy is not None:
+        archiver = AgingArchiver(store, apply_news_status, **policy)
+    app.extensions['archiver'] = (store, policy, archiver)
+    return archiver
+
+def get_search_index():
+    """فهرس البحث المرتبط بالمخزن الحالي، يُحدَّث تدريجياً مع كل تغيير"""
+    store = get_store()
+    cached = app.extensions.get('search_index')
+    if cached is None or cached[0] is not store:
+        index = SearchIndex()
+        store.subscribe(index.on_change)
+        cached = (store, index)
+        app.extensions['search_index'] = cached
+    return cached[1]
+
+def get_broadcaster():
+    """موزع تنبيهات بث الشريط (واحد لكل عامل)"""
+    if 'ticker_broadcaster' not in app.extensions:
+        app.extensions['ticker_broadcaster'] = TickerBroadcaster()
+    return app.extensions['ticker_broadcaster']
+
+def json_snapshot(payload):
+    """تسلسل الحمولة مرة واحدة بنفس صيغة jsonify"""
+    return Snapshot(app.json.response(payload).get_data(), payload)
+
+def snapshot_response(snapshot):
+    """إرجاع حمولة محضرة مسبقاً مع الضغط ودعم If-None-Match و If-Modified-Since (304)"""
+    encoding = None
+    if len(snapshot.body) >= app.config.get('COMPRESS_MIN_SIZE', 500):
+        encoding = request.accept_encodings.best_match(supported_encodings())
+
+    if encoding:
+        response = app.response_class(snapshot.encoded(encoding), mimetype='application/json')
+        response.content_encoding = encoding
+        # كل ترميز تمثيل مختلف، فيحمل ETag مختلفاً
+        response.set_etag(f'{snapshot.etag}-{encoding}')
+    else:
+        response = app.response_class(snapshot.body, mimetype='application/json')
+        response.set_etag(snapshot.etag)
+    response.vary.add('Accept-Encoding')
+    response.last_modified = snapshot.last_modified
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+def encode_cursor(key):
+    """تحويل مفتاح الصفحة (created_at, id) إلى مؤشر معتم"""
+    if key is None:
+        return None
+    raw = json.dumps(list(key), ensure_ascii=False).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    """فك المؤشر المعتم؛ يرفع ValueError إذا كان غير صالح"""
     try:
-        if os.path.exists(file_path):
-            with open(file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        return default_data
-    except (IOError, json.JSONDecodeError) as e:
-        logger.error(f"خطأ في تحميل الملف {file_path}: {e}")
-        return default_data
-
-def save_data(file_path, data):
-    """حفظ البيانات في ملف JSON"""
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        created_at, news_id = json.loads(raw.decode('utf-8'))
+    except (binascii.Error, UnicodeDecodeError, TypeError, ValueError):
+        raise ValueError(f'مؤشر غير صالح: {cursor}')
+    if not isinstance(created_at, str) or not isinstance(news_id, int):
+        raise ValueError(f'مؤشر غير صالح: {cursor}')
+    return (created_at, news_id)
+
+def get_page_args(args=None):
+    """قراءة limit و cursor من معاملات الطلب مع تطبيق الحد الأقصى لحجم الصفحة"""
+    args = request.args if args is None else args
+    limit = args.get('limit', app.config.get('NEWS_PAGE_SIZE', 50), type=int)
+    if limit is None or limit < 1:
+        raise ValueError('قيمة limit غير صالحة')
+    limit = min(limit, app.config.get('NEWS_MAX_PAGE_SIZE', 200))
+    cursor = args.get('cursor')
+    return limit, decode_cursor(cursor) if cursor else None
+
+def page_payload(news, next_key):
+    return {'success': True, 'data': news, 'count': len(news), 'next_cursor': encode_cursor(next_key)}
+
+def build_first_page_snapshot(news):
+    """الصفحة الأولى من الأخبار غير المؤرشفة بالحجم الافتراضي"""
+    limit = app.config.get('NEWS_PAGE_SIZE', 50)
+    return json_snapshot(page_payload(*news.page(exclude_status='archived', limit=limit)))
+
+def query_news_page(args, archived=False):
+    """
+    صفحة من الأخبار حسب معاملات الطلب (مشتركة بين Flask ونمط ASGI).
+    تعيد Snapshot للصفحة الأولى الافتراضية أو حمولة JSON لغيرها؛ ترفع ValueError لمعاملات غير صالحة.
+    """
+    limit, after = get_page_args(args)
+    store = get_store()
+    if archived:
+        return page_payload(*store.news().page(status='archived', limit=limit, after=after))
+    status_filter = args.get('status')
+    if status_filter:
+        return page_payload(*store.news().page(status=status_filter, limit=limit, after=after))
+    if after is None and limit == app.config.get('NEWS_PAGE_SIZE', 50):
+        # الصفحة الأولى الافتراضية تُحضّر وتُضغط مرة واحدة لكل نسخة من البيانات
+        return store.news_view('news_first_page', build_first_page_snapshot)
+    return page_payload(*store.news().page(exclude_status='archived', limit=limit, after=after))
+
+def news_page_response(args, archived=False):
     try:
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-        return True
-    except IOError as e:
-        logger.error(f"خطأ في حفظ الملف {file_path}: {e}")
-        return False
+        result = query_news_page(args, archived=archived)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'معاملات الصفحة غير صالحة'}), 400
+    if isinstance(result, Snapshot):
+        return snapshot_response(result)
+    return jsonify(result)
+
+# --- المقاييس --- #
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """عدّ الطلب وزمنه بوسم قالب المسار (لا المسار الفعلي) حتى يبقى عدد السلاسل محدوداً"""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        REGISTRY.observe('http_request_duration_seconds', time.perf_counter() - started,
+                         {'route': route, 'method': request.method})
+        REGISTRY.inc('http_requests_total', {'route': route, 'method': request.method, 'status': str(response.status_code)})
+    metrics_dir = get_metrics_dir()
+    if metrics_dir:
+        try:
+            REGISTRY.flush(metrics_dir, interval=app.config.get('METRICS_FLUSH_INTERVAL', 1.0))
+        except OSError as e:
+            logger.warning(f"تعذر حفظ المقاييس في {metrics_dir}: {e}")
+    return response
+
+def get_data_files():
+    """ملفات البيانات الحالية للمحرك المختار مع الإعدادات"""
+    files = [get_news_file()]
+    if get_news_backend() == 'journal':
+        files.append(get_news_file() + '.journal')
+    if get_news_backend() == 'sqlite':
+        db_file = get_backend_options()['db_file']
+        files += [db_file, db_file + '-wal']
+    if get_news_backend() == 'tiered':
+        archive_dir = get_backend_options()['archive_dir']
+        if os.path.isdir(archive_dir):
+            files += [os.path.join(archive_dir, name) for name in sorted(os.listdir(archive_dir))]
+    files.append(get_change_log_options()['log_file'])
+    files.append(get_settings_file())
+    return files
+
+def count_by_status(news):
+    return news.status_counts()
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """مقاييس Prometheus: الطلبات، وزمن التخزين وحجمه، وعدد الأخبار حسب الحالة، وحجم ملفات البيانات"""
+    statuses = get_store().news_view('status_counts', count_by_status)
+    sizes = []
+    for file_path in get_data_files():
+        try:
+            sizes.append(({'file': os.path.basename(file_path)}, os.path.getsize(file_path)))
+        except OSError:
+            continue
+    gauges = [
+        ('items', 'عدد الأخبار حسب الحالة', [({'status': status}, count) for status, count in sorted(statuses.items())]),
+        ('data_file_bytes', 'حجم ملفات البيانات على القرص', sizes),
+    ]
+    body = render_metrics(REGISTRY.collect(get_metrics_dir()), gauges)
+    return app.response_class(body, mimetype='text/plain; version=0.0.4')
 
 # --- نقاط النهاية (Endpoints) --- #
 
 @app.route('/health', methods=['GET'])
 def health_check():
     """فحص صحة الخدمة"""
+    archiver = get_archiver()
+    bus = get_store().invalidation_bus
     return jsonify({
         'status': 'healthy',
         'service': 'naebak-news-service',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'store': get_store().stats(),
+        'archiver': archiver.last_report if archiver is not None else None,
+        'invalidation': {'node': bus.node_id, 'published': bus.published, 'received': bus.received}
+                        if bus is not None else None
     })
 
 # --- إدارة الأخبار --- #
 
+def parse_schedule(data, current=None):
+    """
+    موعدا publish_at / expire_at من بيانات الطلب بعد توحيدهما (null يلغي الموعد).
+    يرفع ValueError لوقت غير صالح أو انتهاء قبل النشر.
+    """
+    schedule = {}
+    for field in SCHEDULE_FIELDS:
+        if field in data:
+            schedule[field] = None if data[field] is None else normalize_time(data[field])
+    merged = {field: (current or {}).get(field) for field in SCHEDULE_FIELDS}
+    merged.update(schedule)
+    if merged['publish_at'] and merged['expire_at'] and parse_time(merged['expire_at']) <= parse_time(merged['publish_at']):
+        raise ValueError('يجب أن يكون expire_at بعد publish_at')
+    return schedule
+
+def parse_channels(data):
+    """قنوات الشريط من بيانات الطلب بعد توحيدها (قائمة فارغة تزيل الخبر من كل القنوات)؛ يرفع ValueError"""
+    channels = data.get('channels')
+    if channels is None:
+        return []
+    if not isinstance(channels, list) or not all(isinstance(channel, str) for channel in channels):
+        raise ValueError('channels يجب أن تكون قائمة نصوص')
+    channels = list(dict.fromkeys(channel.strip() for channel in channels if channel.strip()))
+    if len(channels) > app.config.get('NEWS_MAX_CHANNELS', 20) or any(len(channel) > 64 for channel in channels):
+        raise ValueError('عدد القنوات أو طول اسم القناة يتجاوز الحد المسموح')
+    return channels
+
+def apply_channels(news_item, channels):
+    if channels:
+        news_item['channels'] = channels
+    else:
+        news_item.pop('channels', None)
+
+def apply_schedule(news_item, schedule):
+    for field, value in schedule.items():
+        if value is None:
+            news_item.pop(field, None)
+        else:
+            news_item[field] = value
+
+def make_news_item(news_id, data):
+    """إنشاء خبر جديد من بيانات الطلب (يرفع ValueError لموعد أو قنوات غير صالحة)"""
+    schedule = parse_schedule(data)
+    channels = parse_channels(data)
+    now = datetime.now().isoformat()
+    news_item = {
+        'id': news_id,
+        'content': data['content'],
+        'status': data.get('status', 'published'),  # published, draft, archived
+        'created_at': now,
+        'updated_at': now
+    }
+    apply_schedule(news_item, schedule)
+    apply_channels(news_item, channels)
+    return news_item
+
+def apply_news_update(news_item, data):
+    """نسخة محدثة من الخبر ببيانات الطلب (يرفع ValueError لموعد أو قنوات غير صالحة)"""
+    schedule = parse_schedule(data, news_item)
+    channels = parse_channels(data) if 'channels' in data else None
+    news_item = dict(news_item)
+    if 'content' in data:
+        news_item['content'] = data['content']
+    if 'status' in data:
+        news_item['status'] = data['status']
+    apply_schedule(news_item, schedule)
+    if channels is not None:
+        apply_channels(news_item, channels)
+    news_item['updated_at'] = datetime.now().isoformat()
+    return news_item
+
+def apply_news_status(news_item, status):
+    """نسخة من الخبر بحالة جديدة (أرشفة أو إعادة نشر)"""
+    return dict(news_item, status=status, updated_at=datetime.now().isoformat())
+
 @app.route('/api/news', methods=['GET'])
 def get_news():
     """الحصول على جميع الأخبار (غير المؤرشفة)"""
-    status_filter = request.args.get('status')
-    news = load_data(get_news_file())
-    
-    if status_filter:
-        news = [item for item in news if item.get('status') == status_filter]
-    else:
-        news = [item for item in news if item.get('status') != 'archived']
-
-    news.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-    return jsonify({'success': True, 'data': news, 'count': len(news)})
+    return news_page_response(request.args)
 
 @app.route('/api/news/archived', methods=['GET'])
 def get_archived_news():
     """الحصول على الأخبار المؤرشفة"""
-    news = load_data(get_news_file())
-    archived_news = [item for item in news if item.get('status') == 'archived']
-    archived_news.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-    return jsonify({'success': True, 'data': archived_news, 'count': len(archived_news)})
+    return news_page_response(request.args, archived=True)
+
+@app.route('/api/news/search', methods=['GET'])
+def search_news():
+    """البحث في محتوى الأخبار مع مراعاة الكتابة العربية"""
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'success': False, 'error': 'نص البحث مطلوب'}), 400
+    status_filter = request.args.get('status')
+    prefix = request.args.get('prefix', '1') not in ('0', 'false')
+    try:
+        limit = get_page_args()[0]
+    except ValueError:
+        return jsonify({'success': False, 'error': 'معاملات الصفحة غير صالحة'}), 400
+
+    news = get_store().news()
+    index = get_search_index()
+    if index.stale:
+        index.rebuild(news.iter_items())
+
+    ids = index.search(query, status=status_filter, prefix=prefix)
+    results = [item for item in (news.get(news_id) for news_id in ids) if item is not None]
+    results.sort(key=sort_key, reverse=True)
+    return jsonify({'success': True, 'data': results[:limit], 'count': min(len(results), limit), 'total': len(results)})
 
 @app.route('/api/news', methods=['POST'])
 def add_news():
@@ -97,18 +445,17 @@ def add_news():
     data = request.get_json()
     if not data or not data.get('content'):
         return jsonify({'success': False, 'error': 'المحتوى مطلوب'}), 400
+    try:
+        parse_schedule(data)
+        parse_channels(data)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
 
-    news = load_data(get_news_file())
-    new_item = {
-        'id': len(news) + 1,
-        'content': data['content'],
-        'status': data.get('status', 'published'),  # published, draft, archived
-        'created_at': datetime.now().isoformat(),
-        'updated_at': datetime.now().isoformat()
-    }
-    news.append(new_item)
+    with get_store().transaction() as tx:
+        new_item = make_news_item(tx.next_id(), data)
+        tx.put(new_item)
 
-    if save_data(get_news_file(), news):
+    if tx.committed:
         return jsonify({'success': True, 'data': new_item, 'message': 'تم إضافة الخبر بنجاح'}), 201
     return jsonify({'success': False, 'error': 'فشل في حفظ الخبر'}), 500
 
@@ -116,34 +463,31 @@ def add_news():
 def update_news(news_id):
     """تحديث خبر موجود"""
     data = request.get_json()
-    news = load_data(get_news_file())
-    news_item = next((item for item in news if item['id'] == news_id), None)
+    with get_store().transaction() as tx:
+        news_item = tx.get(news_id)
 
-    if not news_item:
-        return jsonify({'success': False, 'error': 'الخبر غير موجود'}), 404
+        if not news_item:
+            return jsonify({'success': False, 'error': 'الخبر غير موجود'}), 404
 
-    if 'content' in data:
-        news_item['content'] = data['content']
-    if 'status' in data:
-        news_item['status'] = data['status']
-    
-    news_item['updated_at'] = datetime.now().isoformat()
+        try:
+            news_item = apply_news_update(news_item, data)
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        tx.put(news_item)
 
-    if save_data(get_news_file(), news):
+    if tx.committed:
         return jsonify({'success': True, 'data': news_item, 'message': 'تم تحديث الخبر بنجاح'})
     return jsonify({'success': False, 'error': 'فشل في حفظ التحديث'}), 500
 
 @app.route('/api/news/<int:news_id>', methods=['DELETE'])
 def delete_news(news_id):
     """حذف خبر"""
-    news = load_data(get_news_file())
-    original_count = len(news)
-    news = [item for item in news if item['id'] != news_id]
+    with get_store().transaction() as tx:
+        if tx.get(news_id) is None:
+            return jsonify({'success': False, 'error': 'الخبر غير موجود'}), 404
+        tx.delete(news_id)
 
-    if len(news) == original_count:
-        return jsonify({'success': False, 'error': 'الخبر غير موجود'}), 404
-
-    if save_data(get_news_file(), news):
+    if tx.committed:
         return jsonify({'success': True, 'message': 'تم حذف الخبر بنجاح'})
     return jsonify({'success': False, 'error': 'فشل في حذف الخبر'}), 500
 
@@ -158,30 +502,208 @@ def unarchive_news(news_id):
     return update_news_status(news_id, 'published')
 
 def update_news_status(news_id, status):
-    news = load_data(get_news_file())
-    news_item = next((item for item in news if item['id'] == news_id), None)
+    with get_store().transaction() as tx:
+        news_item = tx.get(news_id)
 
-    if not news_item:
-        return jsonify({'success': False, 'error': 'الخبر غير موجود'}), 404
+        if not news_item:
+            return jsonify({'success': False, 'error': 'الخبر غير موجود'}), 404
 
-    news_item['status'] = status
-    news_item['updated_at'] = datetime.now().isoformat()
+        news_item = apply_news_status(news_item, status)
+        tx.put(news_item)
 
-    if save_data(get_news_file(), news):
+    if tx.committed:
         return jsonify({'success': True, 'data': news_item, 'message': f'تم تحديث حالة الخبر إلى {status}'})
     return jsonify({'success': False, 'error': 'فشل في تحديث حالة الخبر'}), 500
 
+@app.route('/api/archiver/run', methods=['POST'])
+def run_archiver():
+    """تشغيل الأرشفة التلقائية الآن حسب السياسة المضبوطة وإرجاع التقرير"""
+    archiver = get_archiver()
+    if archiver is None:
+        return jsonify({'success': False, 'error': 'لم تُضبط سياسة الأرشفة'}), 400
+    try:
+        report = archiver.run()
+    except IOError:
+        return jsonify({'success': False, 'error': 'فشل في حفظ دفعة الأرشفة'}), 500
+    if report is None:
+        return jsonify({'success': False, 'error': 'الأرشفة جارية في عامل آخر'}), 409
+    return jsonify({'success': True, 'data': report})
+
+# --- العمليات المجمعة --- #
+
+# العمليات المدعومة في الطلب المجمع وحالة الأرشفة المقابلة لها
+BATCH_STATUS_OPS = {'archive': 'archived', 'unarchive': 'published'}
+
+def apply_batch_operation(tx, operation):
+    """تطبيق عملية واحدة من الطلب المجمع داخل المعاملة؛ تعيد (البيانات، رسالة الخطأ)"""
+    if not isinstance(operation, dict):
+        return None, 'عملية غير صالحة'
+    op = operation.get('op')
+
+    if op == 'create':
+        if not operation.get('content'):
+            return None, 'المحتوى مطلوب'
+        news_item = make_news_item(tx.next_id(), operation)
+        tx.put(news_item)
+        return news_item, None
+
+    if op not in ('update', 'delete') and op not in BATCH_STATUS_OPS:
+        return None, f'عملية غير معروفة: {op}'
+    news_id = operation.get('id')
+    news_item = tx.get(news_id) if isinstance(news_id, int) else None
+    if not news_item:
+        return None, 'الخبر غير موجود'
+
+    if op == 'delete':
+        tx.delete(news_id)
+        return {'id': news_id}, None
+    if op == 'update':
+        news_item = apply_news_update(news_item, operation)
+    else:
+        news_item = apply_news_status(news_item, BATCH_STATUS_OPS[op])
+    tx.put(news_item)
+    return news_item, None
+
+@app.route('/api/news/batch', methods=['POST'])
+def batch_news():
+    """تنفيذ عدة عمليات (إنشاء، تحديث، أرشفة، حذف) بتحميل واحد وحفظ واحد"""
+    data = request.get_json()
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'success': False, 'error': 'قائمة العمليات مطلوبة'}), 400
+    max_operations = app.config.get('NEWS_BATCH_MAX_OPS', 1000)
+    if len(operations) > max_operations:
+        return jsonify({'success': False, 'error': f'الحد الأقصى {max_operations} عملية في الطلب الواحد'}), 400
+    atomic = bool(data.get('atomic', False))
+
+    results = []
+    with get_store().transaction() as tx:
+        for index, operation in enumerate(operations):
+            try:
+                item, error = apply_batch_operation(tx, operation)
+            except ValueError as e:
+                item, error = None, str(e)
+            result = {'index': index, 'op': operation.get('op') if isinstance(operation, dict) else None}
+            if error:
+                result.update(success=False, error=error)
+            else:
+                result.update(success=True, data=item)
+            results.append(result)
+
+        failed = sum(1 for result in results if not result['success'])
+        if atomic and failed:
+            # وضع "الكل أو لا شيء": لا يُحفظ أي تغيير إذا فشلت عملية واحدة
+            tx.rollback()
+
+    if atomic and failed:
+        return jsonify({'success': False, 'error': 'لم يتم تطبيق أي عملية', 'results': results, 'applied': 0}), 400
+    if tx.changes and not tx.committed:
+        return jsonify({'success': False, 'error': 'فشل في حفظ العمليات'}), 500
+    applied = len(results) - failed
+    return jsonify({'success': failed == 0, 'results': results, 'applied': applied})
+
+# --- التصدير والاستيراد (NDJSON) --- #
+
+NEWS_STATUSES = ('published', 'draft', 'archived')
+
+def parse_export_range(args):
+    """حدود from (شاملة) و to (غير شاملة) لتاريخ الإنشاء بعد توحيدها؛ يرفع ValueError لوقت غير صالح"""
+    return tuple(normalize_time(args[name]) if args.get(name) else None for name in ('from', 'to'))
+
+def prepare_import_item(record, current=None):
+    """الخبر كما سيُحفظ من سطر الاستيراد (يستبدل الخبر الحالي بنفس المعرّف)؛ يرفع ValueError لسطر غير صالح"""
+    if not isinstance(record, dict):
+        raise ValueError('السطر يجب أن يكون كائن JSON')
+    news_id = record.get('id')
+    if not isinstance(news_id, int) or isinstance(news_id, bool) or news_id < 1:
+        raise ValueError('معرّف غير صالح')
+    if not record.get('content') or not isinstance(record['content'], str):
+        raise ValueError('المحتوى مطلوب')
+    status = record.get('status', 'published')
+    if status not in NEWS_STATUSES:
+        raise ValueError(f'حالة غير معروفة: {status}')
+
+    news_item = dict(record, status=status)
+    now = datetime.now().isoformat()
+    for field in ('created_at', 'updated_at'):
+        value = record.get(field) or (current or {}).get(field) or now
+        news_item[field] = normalize_time(value)
+    for field in SCHEDULE_FIELDS:
+        news_item.pop(field, None)
+    apply_schedule(news_item, parse_schedule(record))
+    apply_channels(news_item, parse_channels(record))
+    return news_item
+
+@app.route('/api/news/export', methods=['GET'])
+def export_news():
+    """تصدير الأخبار بصيغة NDJSON (سطر لكل خبر) كتدفق، مع تصفية اختيارية: status و from و to"""
+    status_filter = request.args.get('status') or None
+    try:
+        since, until = parse_export_range(request.args)
+    except ValueError:
+        return jsonify({'success': False, 'error': 'معاملات التاريخ غير صالحة'}), 400
+    lines = export_lines(get_store().news(), status_filter, since, until,
+                         chunk_size=app.config.get('EXPORT_CHUNK_SIZE', 500))
+    response = Response(lines, mimetype='application/x-ndjson')
+    response.headers['Content-Disposition'] = 'attachment; filename="news.ndjson"'
+    return response
+
+@app.route('/api/news/import', methods=['POST'])
+def import_news():
+    """استيراد أخبار NDJSON من جسم الطلب: إضافة أو استبدال حسب المعرّف مع الحفظ على دفعات"""
+    records = iter_ndjson(request.stream)
+    try:
+        report = import_records(get_store(), records, prepare_import_item,
+                                batch_size=app.config.get('IMPORT_BATCH_SIZE', 500))
+    except IOError as e:
+        return jsonify({'success': False, 'error': str(e)}), 500
+    return jsonify({'success': report['failed'] == 0, 'data': report})
+
+# --- سجل التغييرات (المزامنة التفاضلية) --- #
+
+def change_entries(source, changes):
+    """تحويل تغييرات المخزن إلى سجلات: خبر كامل عند الإضافة أو التعديل، ومعرّف فقط عند الحذف"""
+    if source == 'settings':
+        return [{'type': 'colors', 'op': 'put', 'data': settings.get('colors', DEFAULT_COLORS)}
+                for _, settings in changes]
+    return [{'type': 'news', 'op': 'put', 'id': value['id'], 'item': value} if op == 'put'
+            else {'type': 'news', 'op': 'delete', 'id': value}
+            for op, value in changes]
+
+def record_changes(change_log, source, changes):
+    """مستمع تغييرات المخزن: يُستدعى بعد كل حفظ وتحت قفل الكتابة، فتتبع الإصدارات ترتيب الحفظ"""
+    if changes:
+        change_log.append(change_entries(source, changes))
+
+@app.route('/api/news/changes', methods=['GET'])
+def get_changes():
+    """التغييرات منذ إصدار معيّن: آخر حالة لكل خبر معدل، وشواهد حذف، والألوان إن تغيرت"""
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({'success': False, 'error': 'معامل since مطلوب (رقم الإصدار)'}), 400
+    changes, version, resync = get_store().change_log.since(since)
+    if resync:
+        return jsonify({'success': True, 'resync': True, 'version': version, 'changes': [],
+                        'message': 'الإصدار المطلوب خارج سجل التغييرات؛ أعد تحميل البيانات كاملة'})
+    return jsonify({'success': True, 'resync': False, 'version': version, 'changes': changes, 'count': len(changes)})
+
 # --- إدارة الإعدادات (الألوان) --- #
 
+DEFAULT_COLORS = {
+    'orange': '#FFA500',
+    'green': '#008000'
+}
+
+def build_colors_snapshot(settings):
+    return json_snapshot({'success': True, 'data': settings.get('colors', DEFAULT_COLORS)})
+
+def get_colors_snapshot():
+    return get_store().settings_view('colors', {'colors': DEFAULT_COLORS}, build_colors_snapshot)
+
 @app.route('/api/settings/colors', methods=['GET'])
 def get_colors():
     """الحصول على إعدادات الألوان"""
-    default_colors = {
-        'orange': '#FFA500',
-        'green': '#008000'
-    }
-    settings = load_data(get_settings_file(), default_data={'colors': default_colors})
-    return jsonify({'success': True, 'data': settings.get('colors', default_colors)})
+    return snapshot_response(get_colors_snapshot())
 
 @app.route('/api/settings/colors', methods=['PUT'])
 def update_colors():
@@ -190,33 +712,76 @@ def update_colors():
     if not data or ('orange' not in data and 'green' not in data):
         return jsonify({'success': False, 'error': 'يجب توفير قيم للألوان'}), 400
 
-    settings = load_data(get_settings_file(), default_data={'colors': {}})
-    if 'colors' not in settings:
-        settings['colors'] = {}
-        
-    if 'orange' in data:
-        settings['colors']['orange'] = data['orange']
-    if 'green' in data:
-        settings['colors']['green'] = data['green']
+    store = get_store()
+    with store.settings_lock:
+        settings = store.settings_for_update(default_data={'colors': {}})
+        if 'colors' not in settings:
+            settings['colors'] = {}
+            
+        if 'orange' in data:
+            settings['colors']['orange'] = data['orange']
+        if 'green' in data:
+            settings['colors']['green'] = data['green']
+
+        saved = store.save_settings(settings)
 
-    if save_data(get_settings_file(), settings):
+    if saved:
         return jsonify({'success': True, 'data': settings['colors'], 'message': 'تم تحديث الألوان بنجاح'})
     return jsonify({'success': False, 'error': 'فشل في حفظ إعدادات الألوان'}), 500
 
 # --- نقطة نهاية للشريط الإخباري --- #
 
+def build_ticker_snapshot(news, channel=None):
+    """بناء حمولة الشريط: أحدث TICKER_SIZE (10) أخبار منشورة وظاهرة الآن حسب publish_at / expire_at"""
+    ticker_news = news.visible(datetime.now(), limit=app.config.get('TICKER_SIZE', 10), channel=channel)
+
+    return json_snapshot({'success': True, 'data': ticker_news, 'count': len(ticker_news)})
+
+def build_channel_ticker_snapshot(channel):
+    return lambda news: build_ticker_snapshot(news, channel)
+
+def next_ticker_change(news):
+    # الحمولة صالحة حتى أقرب موعد نشر أو انتهاء مجدول
+    return news.next_transition(datetime.now())
+
+def seconds_until_ticker_change():
+    """ثوانٍ حتى أقرب موعد مجدول يغير الشريط، أو None"""
+    moment = next_ticker_change(get_store().news())
+    return None if moment is None else (moment - datetime.now()).total_seconds()
+
+def get_ticker_snapshot(channel=None):
+    """
+    حمولة الشريط العام أو شريط قناة واحدة. تُعاد بناء الحمولة فقط عند تغير الأخبار
+    (إضافة، تحديث، حذف، تغيير حالة) أو عند موعد مجدول، ولكل قناة فهرسها وحمولتها المخزنة.
+    """
+    store = get_store()
+    if channel is None:
+        return store.news_view('ticker', build_ticker_snapshot, valid_until=next_ticker_change)
+    if channel not in store.news().channels():
+        # قناة بلا أخبار: حمولة فارغة مشتركة حتى لا تُنشأ ذاكرة لكل اسم قناة في الطلبات
+        return store.news_view('ticker_empty', lambda news: json_snapshot({'success': True, 'data': [], 'count': 0}))
+    return store.news_view(f'ticker:{channel}', build_channel_ticker_snapshot(channel), valid_until=next_ticker_change)
+
 @app.route('/api/ticker', methods=['GET'])
 def get_ticker_news():
-    """الحصول على أخبار الشريط المتحرك (المنشورة فقط)"""
-    news = load_data(get_news_file())
-    ticker_news = [item for item in news if item.get('status') == 'published']
-    ticker_news.sort(key=lambda x: x.get('created_at', ''), reverse=True)
-    
-    # أخذ أحدث 10 أخبار منشورة
-    ticker_news = ticker_news[:10]
-    
-    return jsonify({'success': True, 'data': ticker_news, 'count': len(ticker_news)})
-
+    """الحصول على أخبار الشريط المتحرك (المنشورة فقط)، أو شريط قناة واحدة عبر ?channel="""
+    return snapshot_response(get_ticker_snapshot(request.args.get('channel') or None))
+
+@app.route('/api/ticker/stream', methods=['GET'])
+def stream_ticker_news():
+    """بث تحديثات الشريط عبر Server-Sent Events بدلاً من الاستطلاع الدوري"""
+    channel = request.args.get('channel') or None
+    events = get_broadcaster().stream(
+        lambda: get_ticker_snapshot(channel),
+        last_event_id=request.headers.get('Last-Event-ID') or request.args.get('last_event_id'),
+        heartbeat=app.config.get('TICKER_STREAM_HEARTBEAT', 15.0),
+        wake_in=seconds_until_ticker_change,
+    )
+    response = app.response_class(events, mimetype='text/event-stream')
+    response.cache_control.no_cache = True
+    # منع الوسطاء (مثل nginx) من تجميع الأحداث قبل إرسالها
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
 
 if __name__ == '__main__':
     # إنشاء مجلد البيانات إذا لم يكن موجوداً
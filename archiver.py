@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+الأرشفة التلقائية للأخبار القديمة
+Automatic aging archiver for the News Ticker Service
+
+سياسة احتفاظ قابلة للضبط: أرشفة الأخبار المنشورة الأقدم من N يوماً، و/أو الإبقاء على
+أحدث K خبر منشور فقط. تعمل كمهمة خلفية على دفعات محدودة الحجم، كل دفعة معاملة
+واحدة وحفظ واحد، فلا يُحجز قفل الكتابة طويلاً ويتقدم الكتّاب الآخرون بين الدفعات.
+"""
+
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+
+from metrics import REGISTRY
+from news_schedule import parse_time
+from storage import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class AgingArchiver:
+    """
+    ينقل الأخبار المنشورة القديمة إلى الأرشيف.
+    transition(item, status): نفس دالة تغيير الحالة المستخدمة في نقاط النهاية (apply_news_status).
+    """
+
+    def __init__(self, store, transition, max_age_days=None, keep_newest=None,
+                 batch_size=500, interval=3600.0, batch_pause=0.05):
+        if max_age_days is None and keep_newest is None:
+            raise ValueError('سياسة الأرشفة تتطلب max_age_days أو keep_newest')
+        self.store = store
+        self.transition = transition
+        self.max_age_days = max_age_days
+        self.keep_newest = keep_newest
+        self.batch_size = batch_size
+        self.interval = interval
+        self.batch_pause = batch_pause
+        # عامل واحد فقط يؤرشف في كل مرة بين عمليات gunicorn
+        self.run_lock = FileLock(f'{store.backend.lock.lock_file}.archiver')
+        self.last_report = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _candidates(self, news, now):
+        """أقدم الأخبار المنشورة التي تخالف السياسة، بحد أقصى دفعة واحدة"""
+        cutoff = (now - timedelta(days=self.max_age_days)).isoformat() if self.max_age_days is not None else None
+        excess = 0
+        if self.keep_newest is not None:
+            excess = max(0, news.count(status='published') - self.keep_newest)
+
+        selected = []
+        offset = 0
+        while True:
+            chunk = news.oldest('published', self.batch_size, offset)
+            for position, item in enumerate(chunk, offset):
+                too_old = cutoff is not None and (item.get('created_at') or '') < cutoff
+                if not too_old and position >= excess:
+                    # الترتيب من الأقدم: ما بعده أحدث منه فلا يخالف السياسة أيضاً
+                    return selected
+                publish_at = parse_time(item.get('publish_at'))
+                if publish_at is not None and publish_at > now:
+                    # خبر مجدول لم يظهر بعد
+                    continue
+                selected.append(item)
+                if len(selected) >= self.batch_size:
+                    return selected
+            if len(chunk) < self.batch_size:
+                return selected
+            offset += len(chunk)
+
+    def run_batch(self, now=None):
+        """دفعة واحدة: معاملة واحدة وحفظ واحد؛ تعيد عدد الأخبار المنقولة"""
+        now = now or datetime.now()
+        with self.store.transaction() as tx:
+            for item in self._candidates(tx.state, now):
+                tx.put(self.transition(item, 'archived'))
+        if tx.changes and not tx.committed:
+            raise IOError('فشل في حفظ دفعة الأرشفة')
+        return len(tx.changes)
+
+    def run(self, now=None, max_batches=None):
+        """
+        تشغيل كامل حتى لا يبقى ما يخالف السياسة (أو حتى max_batches).
+        يعيد تقريراً: عدد الأخبار المنقولة وعدد الدفعات والمدة، أو None إن كان عامل آخر يؤرشف الآن.
+        """
+        if not self.run_lock.acquire(blocking=False):
+            return None
+        try:
+            started = time.perf_counter()
+            moved = 0
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                count = self.run_batch(now)
+                if not count:
+                    break
+                moved += count
+                batches += 1
+                REGISTRY.inc('archiver_moved_total', value=count)
+                if count < self.batch_size:
+                    break
+                # مهلة قصيرة بين الدفعات حتى لا يحتكر الأرشيف قفل الكتابة
+                self._stop.wait(self.batch_pause)
+            duration = time.perf_counter() - started
+        finally:
+            self.run_lock.release()
+
+        REGISTRY.observe('archiver_run_seconds', duration)
+        self.last_report = {
+            'moved': moved,
+            'batches': batches,
+            'duration_seconds': round(duration, 6),
+            'finished_at': datetime.now().isoformat(),
+        }
+        if moved:
+            logger.info(f"تمت أرشفة {moved} خبر في {batches} دفعة خلال {duration:.3f} ثانية")
+        return self.last_report
+
+    # --- المهمة الخلفية --- #
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run()
+            except Exception:
+                logger.exception('خطأ في الأرشفة التلقائية')
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='news-archiver', daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
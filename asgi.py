@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+نمط التشغيل غير المتزامن (ASGI) لنقاط القراءة
+ASGI entry point for the read endpoints of the News Ticker Service
+
+يخدم /api/ticker و /api/ticker/stream و /api/news و /api/news/archived و /api/settings/colors
+من حلقة أحداث واحدة، فلا يحجز العميل البطيء عاملاً كاملاً. قراءة الملفات (load_data)
+وبناء الحمولات تجري في خيوط منفصلة عبر asyncio.to_thread، وبقية المسارات تُحال
+إلى تطبيق Flask نفسه (إن توفرت asgiref) فيبقى عقد JSON واحداً.
+
+التشغيل:
+    uvicorn asgi:app --host 0.0.0.0 --port 5000
+    gunicorn -k uvicorn.workers.UvicornWorker asgi:app
+"""
+
+import asyncio
+import logging
+import time
+from urllib.parse import parse_qsl
+
+from werkzeug.datastructures import MultiDict
+from werkzeug.http import http_date, parse_accept_header, parse_date, parse_etags
+
+import app as flask_module
+from metrics import REGISTRY
+from news_store import Snapshot, supported_encodings
+
+try:
+    from asgiref.wsgi import WsgiToAsgi
+except ImportError:  # asgiref اختيارية: بدونها تُرفض المسارات غير المدعومة بـ 404
+    WsgiToAsgi = None
+
+logger = logging.getLogger(__name__)
+
+flask_app = flask_module.app
+
+
+def _headers(scope):
+    """ترويسات الطلب كقاموس بأسماء صغيرة"""
+    return {name.decode('latin-1').lower(): value.decode('latin-1') for name, value in scope.get('headers', [])}
+
+
+def _query_args(scope):
+    return MultiDict(parse_qsl(scope.get('query_string', b'').decode('latin-1'), keep_blank_values=True))
+
+
+def _not_modified(headers, etag, last_modified):
+    """نفس قواعد make_conditional: If-None-Match أولاً ثم If-Modified-Since"""
+    if_none_match = headers.get('if-none-match')
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+    if_modified_since = parse_date(headers.get('if-modified-since'))
+    if if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= if_modified_since
+    return False
+
+
+class NewsASGIApp:
+    """تطبيق ASGI خفيف فوق نفس المخزن والحمولات المحضرة في app.py"""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+        self.fallback = WsgiToAsgi(wsgi_app) if WsgiToAsgi is not None else None
+        self.routes = {
+            '/api/ticker': self.ticker,
+            '/api/ticker/stream': self.ticker_stream,
+            '/api/news': self.news,
+            '/api/news/archived': self.archived_news,
+            '/api/settings/colors': self.colors,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        handler = self.routes.get(scope['path']) if scope['method'] in ('GET', 'HEAD') else None
+        if handler is None:
+            if self.fallback is not None:
+                await self.fallback(scope, receive, send)
+            else:
+                await self.send_json(scope, send, {'success': False, 'error': 'المسار غير مدعوم في نمط ASGI'}, 404)
+            return
+        await self.instrumented(handler, scope, receive, send)
+
+    async def instrumented(self, handler, scope, receive, send):
+        """نفس مقاييس الطلبات التي يسجلها تطبيق Flask (الزمن حتى إرسال الترويسات)"""
+        started = time.perf_counter()
+        labels = {'route': scope['path'], 'method': scope['method']}
+
+        async def send_and_record(message):
+            if message['type'] == 'http.response.start':
+                REGISTRY.observe('http_request_duration_seconds', time.perf_counter() - started, labels)
+                REGISTRY.inc('http_requests_total', dict(labels, status=str(message['status'])))
+            await send(message)
+
+        await handler(scope, receive, send_and_record)
+        metrics_dir = flask_module.get_metrics_dir()
+        if metrics_dir:
+            try:
+                REGISTRY.flush(metrics_dir, interval=self.wsgi_app.config.get('METRICS_FLUSH_INTERVAL', 1.0))
+            except OSError as e:
+                logger.warning(f"تعذر حفظ المقاييس في {metrics_dir}: {e}")
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # --- الاستجابات --- #
+
+    def _base_headers(self, content_type='application/json'):
+        # نفس ترويسة CORS التي يضيفها Flask-CORS لتطبيق WSGI
+        return [(b'content-type', content_type.encode('latin-1')), (b'access-control-allow-origin', b'*')]
+
+    async def send_body(self, scope, send, status, headers, body):
+        headers.append((b'content-length', str(len(body)).encode('latin-1')))
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': b'' if scope['method'] == 'HEAD' else body})
+
+    async def send_json(self, scope, send, payload, status=200):
+        body = self.wsgi_app.json.response(payload).get_data()
+        await self.send_body(scope, send, status, self._base_headers(), body)
+
+    async def send_snapshot(self, scope, send, snapshot):
+        """مثل snapshot_response: ضغط حسب Accept-Encoding و ETag لكل ترميز و 304"""
+        headers = _headers(scope)
+        encoding = None
+        if len(snapshot.body) >= self.wsgi_app.config.get('COMPRESS_MIN_SIZE', 500):
+            encoding = parse_accept_header(headers.get('accept-encoding')).best_match(supported_encodings())
+
+        etag = f'{snapshot.etag}-{encoding}' if encoding else snapshot.etag
+        response_headers = self._base_headers()
+        response_headers += [
+            (b'etag', f'"{etag}"'.encode('latin-1')),
+            (b'vary', b'Accept-Encoding'),
+            (b'cache-control', b'no-cache'),
+        ]
+        if snapshot.last_modified:
+            response_headers.append((b'last-modified', http_date(snapshot.last_modified).encode('latin-1')))
+
+        if _not_modified(headers, etag, snapshot.last_modified):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': response_headers[1:]})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+        if encoding:
+            response_headers.append((b'content-encoding', encoding.encode('latin-1')))
+            # الضغط يُحفظ في اللقطة، فلا يكلف إلا أول طلب لكل نسخة من البيانات
+            body = await asyncio.to_thread(snapshot.encoded, encoding)
+        else:
+            body = snapshot.body
+        await self.send_body(scope, send, 200, response_headers, body)
+
+    async def run(self, func, *args, **kwargs):
+        """تنفيذ دالة تلمس المخزن (قراءة ملفات أو SQLite) خارج حلقة الأحداث"""
+        return await asyncio.to_thread(func, *args, **kwargs)
+
+    # --- نقاط النهاية --- #
+
+    async def ticker(self, scope, receive, send):
+        channel = _query_args(scope).get('channel') or None
+        await self.send_snapshot(scope, send, await self.run(flask_module.get_ticker_snapshot, channel))
+
+    async def colors(self, scope, receive, send):
+        await self.send_snapshot(scope, send, await self.run(flask_module.get_colors_snapshot))
+
+    async def news(self, scope, receive, send, archived=False):
+        try:
+            result = await self.run(flask_module.query_news_page, _query_args(scope), archived=archived)
+        except ValueError:
+            await self.send_json(scope, send, {'success': False, 'error': 'معاملات الصفحة غير صالحة'}, 400)
+            return
+        if isinstance(result, Snapshot):
+            await self.send_snapshot(scope, send, result)
+        else:
+            await self.send_json(scope, send, result)
+
+    async def archived_news(self, scope, receive, send):
+        await self.news(scope, receive, send, archived=True)
+
+    async def ticker_stream(self, scope, receive, send):
+        """بث SSE: المشترك مهمة خفيفة في الحلقة بدلاً من خيط أو عامل"""
+        headers = _headers(scope)
+        args = _query_args(scope)
+        channel = args.get('channel') or None
+        events = flask_module.get_broadcaster().astream(
+            lambda: flask_module.get_ticker_snapshot(channel),
+            last_event_id=headers.get('last-event-id') or args.get('last_event_id'),
+            heartbeat=self.wsgi_app.config.get('TICKER_STREAM_HEARTBEAT', 15.0),
+            wake_in=flask_module.seconds_until_ticker_change,
+        )
+        response_headers = self._base_headers('text/event-stream; charset=utf-8')
+        response_headers += [(b'cache-control', b'no-cache'), (b'x-accel-buffering', b'no')]
+        await send({'type': 'http.response.start', 'status': 200, 'headers': response_headers})
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        async def pump():
+            async for chunk in events:
+                await send({'type': 'http.response.body', 'body': chunk.encode('utf-8'), 'more_body': True})
+
+        task = asyncio.ensure_future(pump())
+        disconnect = asyncio.ensure_future(self._wait_disconnect(receive))
+        try:
+            await asyncio.wait({task, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for pending in (task, disconnect):
+                pending.cancel()
+            await asyncio.gather(task, disconnect, return_exceptions=True)
+            await events.aclose()
+        if task.done() and not task.cancelled() and task.exception() is not None:
+            logger.warning('انقطع بث الشريط: %s', task.exception())
+
+    async def _wait_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+
+app = NewsASGIApp(flask_app)
@@ -0,0 +1,391 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+قياس أداء خدمة الشريط الإخباري
+Load-testing and micro-benchmark suite for the News Ticker Service
+
+يولّد بيانات أخبار عربية اصطناعية بأحجام متزايدة (من 10 حتى 1,000,000 خبر)، ثم يقيس
+زمن الاستجابة (p50/p95/p99) والإنتاجية لكل مسار في app.py، للقراءة والكتابة، بعامل واحد
+وبعدة عمال على نفس الملفات، إضافة إلى قياسات مصغرة لـ load_data و save_data.
+تُكتب النتائج بصيغة JSON للمقارنة بين التشغيلات واكتشاف التراجع قبل النشر.
+
+أمثلة:
+    python benchmark.py --sizes 10,1000,10000 --output bench.json
+    python benchmark.py --sizes 100000 --backend sqlite --workers 1,4
+    python benchmark.py --sizes 1000 --compare baseline.json --threshold 0.25
+"""
+
+import argparse
+import json
+import logging
+import math
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from news_store import NewsState
+from storage import load_data, save_data
+
+# مفردات لتوليد محتوى عربي واقعي للفهرسة والبحث والضغط
+WORDS = (
+    'مجلس النواب الجلسة العامة مشروع قانون الموازنة الحكومة الوزير المحافظة الدائرة الانتخابية '
+    'المرشح النائب اللجنة التشريعية الصحة التعليم الطرق المياه الكهرباء الشباب المرأة الزراعة '
+    'الاستثمار المواطنين الخدمات الأسبوع المقبل اليوم أمس اجتماع مناقشة موافقة رفض تعديل طلب إحاطة '
+    'سؤال برلماني مبادرة زيارة افتتاح مستشفى مدرسة جامعة مشروع تنمية القرية المدينة'
+).split()
+STATUSES = ('published',) * 8 + ('draft', 'archived')
+BASE_TIME = datetime(2025, 1, 1)
+
+
+def generate_dataset(size, seed=0):
+    """أخبار اصطناعية بمحتوى عربي وتواريخ متزايدة؛ نفس البذرة تعطي نفس البيانات"""
+    rng = random.Random(seed)
+    news = []
+    for news_id in range(1, size + 1):
+        created_at = (BASE_TIME + timedelta(seconds=news_id)).isoformat()
+        news.append({
+            'id': news_id,
+            'content': ' '.join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))),
+            'status': rng.choice(STATUSES),
+            'created_at': created_at,
+            'updated_at': created_at,
+        })
+    return news
+
+
+def summarize(samples, elapsed):
+    """إحصاءات زمن الاستجابة بالمللي ثانية والإنتاجية بالطلب في الثانية"""
+    ordered = sorted(samples)
+
+    def percentile(p):
+        # أقرب رتبة (nearest-rank) حتى تكون القيمة زمناً مقاساً فعلاً
+        return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)] * 1000
+
+    return {
+        'samples': len(ordered),
+        'min_ms': ordered[0] * 1000,
+        'mean_ms': sum(ordered) / len(ordered) * 1000,
+        'p50_ms': percentile(50),
+        'p95_ms': percentile(95),
+        'p99_ms': percentile(99),
+        'max_ms': ordered[-1] * 1000,
+        'throughput_rps': len(ordered) / elapsed if elapsed > 0 else None,
+    }
+
+
+def measure(func, iterations, budget):
+    """تكرار func حتى عدد المرات أو انتهاء الميزانية الزمنية (عينة واحدة على الأقل)"""
+    samples = []
+    started = time.perf_counter()
+    for i in range(iterations):
+        begin = time.perf_counter()
+        func(i)
+        samples.append(time.perf_counter() - begin)
+        if time.perf_counter() - started >= budget:
+            break
+    return samples, time.perf_counter() - started
+
+
+# --- سيناريوهات المسارات --- #
+
+def _json_body(payload):
+    return {'data': json.dumps(payload, ensure_ascii=False), 'content_type': 'application/json'}
+
+
+class Context:
+    """حالة مشتركة بين السيناريوهات: المعرّفات الموجودة والمؤشرات"""
+
+    def __init__(self, client, size):
+        self.client = client
+        self.size = size
+        self.ids = list(range(1, size + 1))
+        self.created = []
+        self.cursor = None
+        self.ticker_etag = None
+
+    def pick(self, i):
+        return self.ids[(i * 7919) % len(self.ids)]
+
+
+def _check(response, *expected):
+    if response.status_code not in expected:
+        raise RuntimeError(f'{response.request.method} {response.request.path}: {response.status_code}')
+    return response
+
+
+def _prepare_reads(ctx):
+    first = json.loads(ctx.client.get('/api/news?limit=20').data)
+    ctx.cursor = first['next_cursor']
+    ctx.ticker_etag = ctx.client.get('/api/ticker').headers['ETag']
+
+
+def _stream_first_event(ctx, i):
+    response = ctx.client.get('/api/ticker/stream', buffered=False)
+    try:
+        chunks = iter(response.response)
+        next(chunks)  # retry
+        next(chunks)  # اللقطة الأولى
+    finally:
+        response.close()
+
+
+def _post_news(ctx, i):
+    data = json.loads(_check(ctx.client.post('/api/news', **_json_body({'content': f'خبر قياس {i}'})), 201).data)
+    ctx.created.append(data['data']['id'])
+
+
+def _delete_news(ctx, i):
+    if ctx.created:
+        _check(ctx.client.delete(f'/api/news/{ctx.created.pop()}'), 200)
+
+
+def _batch(ctx, i):
+    operations = [{'op': 'update', 'id': ctx.pick(i + n), 'data': {'content': f'تعديل مجمع {i}'}} for n in range(10)]
+    _check(ctx.client.post('/api/news/batch', **_json_body({'operations': operations})), 200, 207)
+
+
+# (الاسم، الطريقة، المسار، نوع العملية، دالة التنفيذ)
+SCENARIOS = [
+    ('health', 'GET', '/health', 'read', lambda ctx, i: _check(ctx.client.get('/health'), 200)),
+    ('news_first_page', 'GET', '/api/news', 'read', lambda ctx, i: _check(ctx.client.get('/api/news'), 200)),
+    ('news_first_page_gzip', 'GET', '/api/news', 'read',
+     lambda ctx, i: _check(ctx.client.get('/api/news', headers={'Accept-Encoding': 'gzip'}), 200)),
+    ('news_cursor_page', 'GET', '/api/news?cursor=', 'read',
+     lambda ctx, i: _check(ctx.client.get('/api/news', query_string={'limit': 20, 'cursor': ctx.cursor}), 200)),
+    ('news_by_status', 'GET', '/api/news?status=draft', 'read',
+     lambda ctx, i: _check(ctx.client.get('/api/news?status=draft&limit=20'), 200)),
+    ('news_archived', 'GET', '/api/news/archived', 'read',
+     lambda ctx, i: _check(ctx.client.get('/api/news/archived?limit=20'), 200)),
+    ('news_search', 'GET', '/api/news/search', 'read',
+     lambda ctx, i: _check(ctx.client.get('/api/news/search', query_string={'q': WORDS[i % len(WORDS)], 'limit': 20}), 200)),
+    ('colors', 'GET', '/api/settings/colors', 'read',
+     lambda ctx, i: _check(ctx.client.get('/api/settings/colors'), 200)),
+    ('ticker', 'GET', '/api/ticker', 'read', lambda ctx, i: _check(ctx.client.get('/api/ticker'), 200)),
+    ('ticker_not_modified', 'GET', '/api/ticker', 'read',
+     lambda ctx, i: _check(ctx.client.get('/api/ticker', headers={'If-None-Match': ctx.ticker_etag}), 304)),
+    ('ticker_stream_first_event', 'GET', '/api/ticker/stream', 'read', _stream_first_event),
+    ('news_create', 'POST', '/api/news', 'write', _post_news),
+    ('news_update', 'PUT', '/api/news/<id>', 'write',
+     lambda ctx, i: _check(ctx.client.put(f'/api/news/{ctx.pick(i)}', **_json_body({'content': f'تحديث {i}'})), 200)),
+    ('news_archive', 'PUT', '/api/news/<id>/archive', 'write',
+     lambda ctx, i: _check(ctx.client.put(f'/api/news/{ctx.pick(i)}/archive'), 200)),
+    ('news_unarchive', 'PUT', '/api/news/<id>/unarchive', 'write',
+     lambda ctx, i: _check(ctx.client.put(f'/api/news/{ctx.pick(i)}/unarchive'), 200)),
+    ('news_batch_update_10', 'POST', '/api/news/batch', 'write', _batch),
+    ('colors_update', 'PUT', '/api/settings/colors', 'write',
+     lambda ctx, i: _check(ctx.client.put('/api/settings/colors', **_json_body({'orange': f'#FFA5{i % 100:02d}'})), 200)),
+    ('news_delete', 'DELETE', '/api/news/<id>', 'write', _delete_news),
+]
+
+# مزيج العمال المتعددين: قراءات الشريط والصفحة الأولى مع نسبة من الكتابات
+MIXED_READ_RATIO = 0.9
+
+
+def configure_app(app, data_dir, backend):
+    app.config['DATA_DIR'] = data_dir
+    app.config['NEWS_BACKEND'] = backend
+    for key in ('NEWS_FILE', 'SETTINGS_FILE', 'NEWS_DB_FILE', 'NEWS_ARCHIVE_DIR'):
+        app.config.pop(key, None)
+
+
+def prepare_data_dir(size, seed):
+    data_dir = tempfile.mkdtemp(prefix=f'naebak-bench-{size}-')
+    save_data(os.path.join(data_dir, 'news.json'), generate_dataset(size, seed))
+    save_data(os.path.join(data_dir, 'settings.json'), {'colors': {'orange': '#FFA500', 'green': '#008000'}})
+    return data_dir
+
+
+def run_routes(size, data_dir, backend, iterations, budget, only=None):
+    """كل السيناريوهات بعامل واحد (القراءات أولاً ثم الكتابات)"""
+    from app import app
+    configure_app(app, data_dir, backend)
+    ctx = Context(app.test_client(), size)
+    _prepare_reads(ctx)
+
+    results = []
+    for name, method, path, kind, func in SCENARIOS:
+        if only and name not in only:
+            continue
+        samples, elapsed = measure(lambda i: func(ctx, i), iterations, budget)
+        results.append(dict(summarize(samples, elapsed), name=name, method=method, path=path,
+                            kind=kind, size=size, workers=1, backend=backend))
+    return results
+
+
+def _mixed_worker(data_dir, backend, size, requests_count, budget, seed, queue):
+    """عامل مستقل (يحاكي عامل gunicorn) على نفس ملفات البيانات"""
+    from app import app
+    configure_app(app, data_dir, backend)
+    client = app.test_client()
+    rng = random.Random(seed)
+    samples = []
+    started = time.perf_counter()
+    for i in range(requests_count):
+        begin = time.perf_counter()
+        if rng.random() < MIXED_READ_RATIO:
+            client.get('/api/ticker' if i % 2 else '/api/news')
+        else:
+            client.put(f'/api/news/{rng.randint(1, size)}', **_json_body({'content': f'تحديث {seed}-{i}'}))
+        samples.append(time.perf_counter() - begin)
+        if time.perf_counter() - started >= budget:
+            break
+    queue.put(samples)
+
+
+def run_mixed(size, data_dir, backend, workers, iterations, budget):
+    """مزيج قراءة/كتابة بعدة عمليات متزامنة؛ الإنتاجية = كل الطلبات / الزمن الكلي"""
+    context = multiprocessing.get_context('fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn')
+    queue = context.Queue()
+    processes = [
+        context.Process(target=_mixed_worker, args=(data_dir, backend, size, iterations, budget, seed, queue))
+        for seed in range(workers)
+    ]
+    started = time.perf_counter()
+    for process in processes:
+        process.start()
+    samples = []
+    for _ in processes:
+        samples.extend(queue.get())
+    for process in processes:
+        process.join()
+    elapsed = time.perf_counter() - started
+    return dict(summarize(samples, elapsed), name='mixed_read_write', method='MIXED', path='/api/ticker,/api/news',
+                kind='mixed', size=size, workers=workers, backend=backend, read_ratio=MIXED_READ_RATIO)
+
+
+def build_state(news):
+    """حالة الأخبار في الذاكرة مع فهرس الشريط (كما بعد أول طلب)"""
+    state = NewsState(news)
+    state.page(status='published', limit=10)
+    return state
+
+
+def state_memory(news):
+    """الذاكرة التي تشغلها حالة الأخبار وفهرسها بالبايت (tracemalloc)"""
+    tracemalloc.start()
+    try:
+        baseline = tracemalloc.get_traced_memory()[0]
+        state = build_state(news)
+        used = tracemalloc.get_traced_memory()[0] - baseline
+    finally:
+        tracemalloc.stop()
+    del state
+    return used
+
+
+def run_storage_micro(size, data_dir, iterations, budget):
+    """قياسات مصغرة لقراءة وكتابة ملف الأخبار كاملاً وبناء الحالة في الذاكرة"""
+    news_file = os.path.join(data_dir, 'news.json')
+    news = load_data(news_file)
+    results = []
+    for name, func in (
+        ('load_data', lambda i: load_data(news_file)),
+        ('save_data', lambda i: save_data(os.path.join(data_dir, 'micro.json'), news)),
+        ('build_state', lambda i: build_state(news)),
+    ):
+        samples, elapsed = measure(func, iterations, budget)
+        results.append(dict(summarize(samples, elapsed), name=name, method='CALL', path='storage',
+                            kind='micro', size=size, workers=1, file_bytes=os.path.getsize(news_file)))
+    # الذاكرة تشمل NewsItem والفهارس، لا قائمة dict المحملة من الملف
+    results[-1]['state_bytes'] = state_memory(load_data(news_file))
+    return results
+
+
+def run_benchmarks(sizes, backend='json', workers=(1,), iterations=200, budget=10.0,
+                   micro_iterations=20, seed=0, only=None, mixed=True):
+    """تشغيل كل القياسات وإرجاع تقرير قابل للتسلسل إلى JSON"""
+    results = []
+    for size in sizes:
+        data_dir = prepare_data_dir(size, seed)
+        try:
+            results.extend(run_storage_micro(size, data_dir, micro_iterations, budget))
+            results.extend(run_routes(size, data_dir, backend, iterations, budget, only))
+            if mixed:
+                for count in workers:
+                    results.append(run_mixed(size, data_dir, backend, count, iterations, budget))
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'backend': backend,
+            'sizes': list(sizes),
+            'iterations': iterations,
+            'budget_seconds': budget,
+            'seed': seed,
+        },
+        'results': results,
+    }
+
+
+def result_key(result):
+    return (result['name'], result['size'], result['workers'], result.get('backend'))
+
+
+def compare(baseline, current, threshold=0.2, metric='p95_ms'):
+    """مقارنة تقريرين؛ تعيد القياسات التي ساءت بأكثر من النسبة المحددة"""
+    previous = {result_key(result): result for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        old = previous.get(result_key(result))
+        if old is None or not old.get(metric):
+            continue
+        change = (result[metric] - old[metric]) / old[metric]
+        if change > threshold:
+            regressions.append({
+                'name': result['name'], 'size': result['size'], 'workers': result['workers'],
+                'metric': metric, 'baseline': old[metric], 'current': result[metric], 'change': change,
+            })
+    return regressions
+
+
+def _int_list(value):
+    return [int(part.replace('_', '')) for part in value.split(',') if part]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='قياس أداء خدمة الشريط الإخباري')
+    parser.add_argument('--sizes', type=_int_list, default=[10, 1000, 10000],
+                        help='أحجام البيانات مفصولة بفواصل (حتى 1000000)')
+    parser.add_argument('--backend', default='json', choices=('json', 'journal', 'sqlite', 'tiered'))
+    parser.add_argument('--workers', type=_int_list, default=[1, 4], help='أعداد العمال لمزيج القراءة/الكتابة')
+    parser.add_argument('--iterations', type=int, default=200, help='عدد الطلبات لكل سيناريو')
+    parser.add_argument('--micro-iterations', type=int, default=20)
+    parser.add_argument('--budget', type=float, default=10.0, help='الحد الأقصى بالثواني لكل سيناريو')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', type=lambda value: set(value.split(',')), help='تشغيل سيناريوهات محددة فقط')
+    parser.add_argument('--no-mixed', action='store_true', help='تخطي قياس العمال المتعددين')
+    parser.add_argument('--output', help='ملف JSON للنتائج (الافتراضي: المخرج القياسي)')
+    parser.add_argument('--compare', help='تقرير سابق للمقارنة')
+    parser.add_argument('--threshold', type=float, default=0.2, help='نسبة التراجع المسموحة في p95')
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.backend, args.workers, args.iterations, args.budget,
+                            args.micro_iterations, args.seed, args.only, not args.no_mixed)
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            report['regressions'] = compare(json.load(f), report, args.threshold)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    # سجلات الخدمة لكل طلب تشوّه القياس
+    logging.getLogger().setLevel(os.environ.get('BENCH_LOG_LEVEL', 'WARNING'))
+    sys.exit(main())
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+سجل التغييرات للمزامنة التفاضلية
+Change feed for delta sync of the News Ticker Service
+
+كل تغيير محفوظ (خبر مضاف أو معدل أو محذوف، أو ألوان) يأخذ رقم إصدار متزايداً ويُلحق
+بسجل NDJSON مشترك بين العمال. يحتفظ السجل بآخر max_entries تغييراً فقط؛ العميل الذي
+تأخر عن أقدم تغيير محفوظ يُطلب منه إعادة المزامنة الكاملة.
+"""
+
+import json
+import logging
+import os
+import threading
+from bisect import bisect_right
+from operator import itemgetter
+
+from news_model import json_default
+from storage import FileLock, file_signature
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeLog:
+    """
+    سجل تغييرات محدود: سطر لكل تغيير {'version', 'type', 'op', ...}.
+    يُقص إلى آخر max_entries سطراً عندما يبلغ ضعفها، فتبقى كلفة الإلحاق ثابتة في المتوسط.
+    """
+
+    def __init__(self, log_file, max_entries=1000):
+        self.log_file = log_file
+        self.max_entries = max_entries
+        self.lock = FileLock(f'{log_file}.lock')
+        self._lock = threading.Lock()
+        # (توقيع الملف، السجلات مرتبة حسب الإصدار)
+        self._cache = None
+
+    def _read(self):
+        records = []
+        try:
+            with open(self.log_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        # سطر مقطوع في نهاية السجل بسبب توقف مفاجئ
+                        logger.warning(f"تجاهل سجل تالف في {self.log_file}")
+        except FileNotFoundError:
+            pass
+        return records
+
+    def records(self):
+        """السجلات الحالية (لا يجوز تعديلها)"""
+        signature = file_signature(self.log_file)
+        with self._lock:
+            if self._cache is not None and self._cache[0] == signature:
+                return self._cache[1]
+        records = self._read()
+        with self._lock:
+            self._cache = (signature, records)
+        return records
+
+    def version(self):
+        records = self.records()
+        return records[-1]['version'] if records else 0
+
+    def append(self, entries):
+        """إلحاق تغييرات بأرقام إصدار متتالية؛ يعيد آخر إصدار أو None إذا فشلت الكتابة"""
+        if not entries:
+            return self.version()
+        with self.lock:
+            records = self.records()
+            version = records[-1]['version'] if records else 0
+            added = []
+            for entry in entries:
+                version += 1
+                added.append(dict(entry, version=version))
+            records = records + added
+            lines = [json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=json_default)
+                     for record in (records[-self.max_entries:] if len(records) >= 2 * self.max_entries else added)]
+            payload = ('\n'.join(lines) + '\n').encode('utf-8')
+            try:
+                os.makedirs(os.path.dirname(self.log_file) or '.', exist_ok=True)
+                if len(records) >= 2 * self.max_entries:
+                    # قص السجل: كتابة آخر max_entries في ملف مؤقت ثم استبداله
+                    records = records[-self.max_entries:]
+                    tmp_path = f'{self.log_file}.tmp.{os.getpid()}'
+                    with open(tmp_path, 'wb') as f:
+                        f.write(payload)
+                    os.replace(tmp_path, self.log_file)
+                else:
+                    fd = os.open(self.log_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                    try:
+                        os.write(fd, payload)
+                    finally:
+                        os.close(fd)
+            except OSError as e:
+                logger.error(f"خطأ في الكتابة إلى سجل التغييرات {self.log_file}: {e}")
+                return None
+            with self._lock:
+                self._cache = (file_signature(self.log_file), records)
+        return version
+
+    def since(self, version):
+        """
+        التغييرات بعد الإصدار version: (التغييرات، الإصدار الحالي، هل تلزم إعادة مزامنة كاملة).
+        لا يُعاد إلا آخر تغيير لكل عنصر، مرتبة حسب الإصدار.
+        """
+        records = self.records()
+        current = records[-1]['version'] if records else 0
+        oldest = records[0]['version'] if records else current + 1
+        if version > current or version < oldest - 1:
+            # السجل قُص بعد version، أو أعيد إنشاؤه (إصدار العميل أحدث من الحالي)
+            return [], current, True
+        start = bisect_right(records, version, key=itemgetter('version'))
+        latest = {}
+        for record in records[start:]:
+            latest.pop((record['type'], record.get('id')), None)
+            latest[(record['type'], record.get('id'))] = record
+        return list(latest.values()), current, False
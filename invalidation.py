@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ناقل إبطال الذاكرة المؤقتة بين النسخ (replicas)
+Cross-node cache invalidation bus for the News Ticker Service
+
+عدة نسخ من الخدمة خلف موزع أحمال على تخزين مشترك: بعد كل حفظ ناجح تنشر النسخة رسالة
+{'source', 'version'} على الناقل، فتبطل النسخ الأخرى ذاكرتها وتتحقق من الملف عند القراءة التالية
+فقط، بدلاً من فحص الملف مع كل طلب.
+
+يُختار الناقل بعنوان: file:///path/bus.log (ملف إلحاقي مشترك) أو unix:///path/dir (مقابس datagram
+محلية). لوسيط حقيقي (Redis أو NATS أو غيرهما): صنف فرعي من InvalidationBus ينفذ _send و _listen
+ثم register_bus('redis', factory).
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from urllib.parse import urlsplit
+
+from metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidationBus:
+    """
+    الواجهة المشتركة: publish / subscribe / start / close.
+    المحولات تنفذ _send(payload) لإرسال رسالة (bytes) إلى كل العقد، و _listen() حلقة استقبال
+    تعمل في خيط خلفي وتستدعي self._receive(payload) لكل رسالة حتى يُضبط self._closed.
+    """
+
+    def __init__(self):
+        self.node_id = uuid.uuid4().hex
+        self._callbacks = []
+        self._closed = threading.Event()
+        self._thread = None
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, callback):
+        """تسجيل دالة تُستدعى لكل رسالة من عقدة أخرى: callback(message)"""
+        self._callbacks.append(callback)
+
+    def publish(self, source, version=None):
+        """
+        نشر تغيير بعد حفظ ناجح. الإرسال بأفضل جهد: فشله لا يفشل الكتابة،
+        والعقد الأخرى تتحقق من الملف على أي حال بعد مهلة revalidate_interval.
+        """
+        message = {'node': self.node_id, 'source': source, 'version': version, 'at': time.time()}
+        try:
+            self._send(json.dumps(message, separators=(',', ':')).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"تعذر نشر رسالة الإبطال: {e}")
+            return False
+        self.published += 1
+        REGISTRY.inc('invalidation_messages_total', {'direction': 'sent'})
+        return True
+
+    def _receive(self, payload):
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            logger.warning('تجاهل رسالة إبطال تالفة')
+            return
+        if not isinstance(message, dict) or message.get('node') == self.node_id:
+            return
+        self.received += 1
+        REGISTRY.inc('invalidation_messages_total', {'direction': 'received'})
+        for callback in list(self._callbacks):
+            try:
+                callback(message)
+            except Exception:
+                logger.exception('خطأ في مستمع رسائل الإبطال')
+
+    def _run(self):
+        try:
+            self._listen()
+        except Exception:
+            if not self._closed.is_set():
+                logger.exception('توقف استقبال رسائل الإبطال')
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._closed.clear()
+            self._thread = threading.Thread(target=self._run, name='invalidation-bus', daemon=True)
+            self._thread.start()
+
+    def close(self, timeout=None):
+        self._closed.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._close()
+
+    # --- نقاط التوسعة للمحولات --- #
+
+    def _send(self, payload):
+        raise NotImplementedError
+
+    def _listen(self):
+        raise NotImplementedError
+
+    def _close(self):
+        pass
+
+
+class FileBus(InvalidationBus):
+    """
+    ملف إلحاقي مشترك بسطر لكل رسالة؛ كل عقدة تتابعه من موضعها عند البدء.
+    مناسب للاختبارات وللعقد على نفس القرص (الفحص الدوري لملف صغير بدل ملفات البيانات).
+    """
+
+    def __init__(self, path, poll_interval=0.05):
+        super().__init__()
+        self.path = path
+        self.poll_interval = poll_interval
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        try:
+            self._offset = os.path.getsize(path)
+        except OSError:
+            self._offset = 0
+
+    def _send(self, payload):
+        # سطر واحد صغير بكتابة واحدة مع O_APPEND فلا تتداخل رسائل العقد
+        fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, payload + b'\n')
+        finally:
+            os.close(fd)
+
+    def _listen(self):
+        buffer = b''
+        while not self._closed.wait(self.poll_interval):
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                continue
+            if size < self._offset:
+                # الملف أعيد إنشاؤه أو قُص
+                self._offset = 0
+                buffer = b''
+            if size == self._offset:
+                continue
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                chunk = f.read(size - self._offset)
+            self._offset += len(chunk)
+            lines = (buffer + chunk).split(b'\n')
+            buffer = lines.pop()
+            for line in lines:
+                if line.strip():
+                    self._receive(line)
+
+
+class UnixSocketBus(InvalidationBus):
+    """
+    كل عقدة تربط مقبس datagram باسمها داخل مجلد مشترك، والنشر يرسل الرسالة إلى كل المقابس الأخرى فيه.
+    الاستقبال فوري دون فحص دوري؛ مقابس العقد المتوقفة تُحذف عند أول إرسال فاشل إليها.
+    """
+
+    def __init__(self, directory, timeout=0.2):
+        super().__init__()
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.path = os.path.join(directory, f'{self.node_id}.sock')
+        self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._socket.bind(self.path)
+        self._socket.settimeout(timeout)
+
+    def _send(self, payload):
+        for name in os.listdir(self.directory):
+            peer = os.path.join(self.directory, name)
+            if not name.endswith('.sock') or peer == self.path:
+                continue
+            try:
+                self._socket.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # عقدة توقفت دون حذف مقبسها
+                try:
+                    os.remove(peer)
+                except OSError:
+                    pass
+            except OSError as e:
+                logger.warning(f"تعذر إرسال رسالة الإبطال إلى {peer}: {e}")
+
+    def _listen(self):
+        while not self._closed.is_set():
+            try:
+                payload = self._socket.recv(65536)
+            except socket.timeout:
+                continue
+            except OSError:
+                if self._closed.is_set():
+                    return
+                raise
+            self._receive(payload)
+
+    def _close(self):
+        self._socket.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+
+# مخطط العنوان -> دالة تنشئ الناقل من العنوان المحلل (urlsplit)
+BUSES = {
+    'file': lambda url: FileBus(url.path),
+    'unix': lambda url: UnixSocketBus(url.path),
+}
+
+
+def register_bus(scheme, factory):
+    """نقطة التوسعة لوسيط حقيقي: factory(url) تعيد InvalidationBus للعناوين من نوع scheme://"""
+    BUSES[scheme] = factory
+
+
+def create_bus(url):
+    parsed = urlsplit(url)
+    factory = BUSES.get(parsed.scheme)
+    if factory is None:
+        raise ValueError(f'ناقل إبطال غير معروف: {parsed.scheme}')
+    return factory(parsed)
+
+
+def connect_store(store, bus, revalidate_interval=30.0, version=None):
+    """
+    ربط المخزن بالناقل: نشر كل حفظ ناجح، وإبطال الذاكرة عند رسائل العقد الأخرى.
+    مع الناقل لا يفحص المخزن الملف مع كل قراءة، بل بعد رسالة إبطال أو كل revalidate_interval ثانية
+    (احتياطاً لرسالة مفقودة). version(): رقم الإصدار المرسل مع الرسالة (اختياري).
+    """
+    store.revalidate_interval = revalidate_interval
+
+    def publish(source, changes):
+        # changes تساوي None عند إعادة التحميل أو الإبطال: لا شيء جديد يُنشر
+        if changes:
+            bus.publish(source, version() if version is not None else None)
+
+    store.subscribe(publish)
+    bus.subscribe(lambda message: store.invalidate(message.get('source')))
+    bus.start()
+    return bus
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مقاييس الخدمة بصيغة Prometheus النصية
+Prometheus text-format metrics for the News Ticker Service
+
+سجل بسيط للعدادات والمدرجات التكرارية (histograms) دون اعتماديات خارجية.
+تحت gunicorn بعدة عمليات يكتب كل عامل لقطة من مقاييسه إلى ملف خاص به في مجلد مشترك
+(METRICS_DIR)، ونقطة /metrics تجمع ملفات كل العمال، فتكون الأرقام واحدة أياً كان العامل
+الذي استقبل طلب الجمع، ولا تحتاج السلاسل إلى تسمية بمعرّف العملية.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# حدود المدرجات بالثواني (من 0.5 مللي ثانية حتى 10 ثوانٍ)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = (1024, 16 * 1024, 128 * 1024, 1024 * 1024, 8 * 1024 * 1024, 64 * 1024 * 1024, 512 * 1024 * 1024)
+
+PREFIX = 'naebak_news_'
+
+# الاسم -> (النوع، الوصف، حدود المدرج)
+METRICS = {
+    'http_requests_total': ('counter', 'عدد الطلبات حسب المسار والطريقة ورمز الحالة', None),
+    'http_request_duration_seconds': ('histogram', 'زمن معالجة الطلب حتى إرسال الترويسات', DEFAULT_BUCKETS),
+    'storage_seconds': ('histogram', 'زمن load_data و save_data مقسماً إلى قرص (io) وتحليل JSON (json)', DEFAULT_BUCKETS),
+    'storage_bytes': ('histogram', 'حجم الملفات المقروءة والمكتوبة عبر load_data و save_data', BYTES_BUCKETS),
+    'storage_bytes_total': ('counter', 'مجموع البايتات المقروءة والمكتوبة عبر load_data و save_data', None),
+    'storage_errors_total': ('counter', 'أخطاء قراءة أو كتابة الملفات', None),
+    'store_load_seconds': ('histogram', 'زمن تحميل البيانات في المخزن بعد تغيرها على القرص (قراءة وبناء الحالة)', DEFAULT_BUCKETS),
+    'store_cache_total': ('counter', 'نتائج التحقق من ذاكرة المخزن: hit أو miss أو reload', None),
+    'view_build_seconds': ('histogram', 'زمن بناء الحمولات المشتقة (ترتيب وتسلسل) لكل نسخة من البيانات', DEFAULT_BUCKETS),
+    'single_flight_total': ('counter', 'طلبات لم تعد التحميل (load) أو البناء (view) بنفسها: انتظرت خيطاً آخر (coalesced) أو أخذت القيمة القديمة (stale)', None),
+    'invalidation_messages_total': ('counter', 'رسائل ناقل الإبطال بين النسخ: المرسلة (sent) والمستلمة من عقد أخرى (received)', None),
+    'archiver_moved_total': ('counter', 'عدد الأخبار التي نقلتها الأرشفة التلقائية', None),
+    'archiver_run_seconds': ('histogram', 'مدة تشغيل الأرشفة التلقائية', DEFAULT_BUCKETS),
+}
+
+
+def _labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    """عدادات ومدرجات عامل واحد؛ آمنة بين الخيوط"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        self._counters = {}     # (الاسم، الوسوم) -> القيمة
+        self._histograms = {}   # (الاسم، الوسوم) -> [عدادات الحدود..., المجموع، العدد]
+        self._worker_file = None
+        self._last_flush = 0.0
+
+    def _check_fork(self):
+        # العملية الابنة تبدأ من الصفر حتى لا تُحسب مقاييس الأب مرتين (يُستدعى تحت القفل)
+        if self._pid != os.getpid():
+            self._pid = os.getpid()
+            self._counters = {}
+            self._histograms = {}
+            self._worker_file = None
+            self._last_flush = 0.0
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _labels_key(labels or {}))
+        with self._lock:
+            self._check_fork()
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        buckets = METRICS[name][2]
+        key = (name, _labels_key(labels or {}))
+        with self._lock:
+            self._check_fork()
+            series = self._histograms.get(key)
+            if series is None:
+                series = self._histograms[key] = [0] * (len(buckets) + 2)
+            for i, bound in enumerate(buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def timer(self, name, labels=None):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - started, labels)
+
+    def snapshot(self):
+        """نسخة قابلة للتسلسل إلى JSON"""
+        with self._lock:
+            self._check_fork()
+            return {
+                'counters': [[name, list(map(list, labels)), value] for (name, labels), value in self._counters.items()],
+                'histograms': [[name, list(map(list, labels)), list(series)]
+                               for (name, labels), series in self._histograms.items()],
+            }
+
+    # --- تعدد العمليات --- #
+
+    def flush(self, directory, interval=0.0):
+        """كتابة لقطة هذا العامل في مجلد المقاييس المشترك (مرة كل interval ثانية على الأكثر)"""
+        now = time.monotonic()
+        with self._lock:
+            self._check_fork()
+            if now - self._last_flush < interval:
+                return
+            self._last_flush = now
+            if self._worker_file is None:
+                # معرّف عشوائي مع رقم العملية: عامل جديد بنفس الرقم لا يكتب فوق عدادات عامل سابق
+                self._worker_file = os.path.join(directory, f'worker-{self._pid}-{uuid.uuid4().hex[:8]}.json')
+            worker_file = self._worker_file
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f'{worker_file}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f)
+        os.replace(tmp_path, worker_file)
+
+    def collect(self, directory=None):
+        """
+        مقاييس كل العمال مجمّعة: لقطة هذا العامل من الذاكرة ولقطات الآخرين من ملفاتهم.
+        ملفات العمال المنتهين تبقى حتى لا تتراجع العدادات.
+        """
+        snapshots = [self.snapshot()]
+        if directory and os.path.isdir(directory):
+            with self._lock:
+                own = os.path.basename(self._worker_file) if self._worker_file else None
+            for name in os.listdir(directory):
+                if not name.startswith('worker-') or not name.endswith('.json') or name == own:
+                    continue
+                try:
+                    with open(os.path.join(directory, name), 'r', encoding='utf-8') as f:
+                        snapshots.append(json.load(f))
+                except (OSError, ValueError):
+                    continue
+        return merge(snapshots)
+
+
+def merge(snapshots):
+    """جمع لقطات عدة عمال: العدادات تُجمع، والمدرجات تُجمع حدّاً بحد"""
+    counters = {}
+    histograms = {}
+    for snapshot in snapshots:
+        for name, labels, value in snapshot.get('counters', ()):
+            key = (name, tuple(map(tuple, labels)))
+            counters[key] = counters.get(key, 0) + value
+        for name, labels, series in snapshot.get('histograms', ()):
+            key = (name, tuple(map(tuple, labels)))
+            current = histograms.get(key)
+            histograms[key] = list(series) if current is None else [a + b for a, b in zip(current, series)]
+    return counters, histograms
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in pairs) + '}'
+
+
+def _format_value(value):
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render(collected, gauges=()):
+    """
+    النص بصيغة Prometheus 0.0.4.
+    gauges: قائمة (الاسم، الوصف، [(الوسوم، القيمة)...]) تُحسب لحظة الجمع ولا تُجمع بين العمال.
+    """
+    counters, histograms = collected
+    lines = []
+    for name, (kind, help_text, buckets) in METRICS.items():
+        full_name = PREFIX + name
+        if kind == 'counter':
+            series = sorted((labels, value) for (metric, labels), value in counters.items() if metric == name)
+        else:
+            series = sorted((labels, value) for (metric, labels), value in histograms.items() if metric == name)
+        if not series:
+            continue
+        lines.append(f'# HELP {full_name} {help_text}')
+        lines.append(f'# TYPE {full_name} {kind}')
+        for labels, value in series:
+            if kind == 'counter':
+                lines.append(f'{full_name}{_format_labels(labels)} {_format_value(value)}')
+                continue
+            for bound, count in zip(buckets, value):
+                lines.append(f'{full_name}_bucket{_format_labels(labels, [("le", bound)])} {count}')
+            lines.append(f'{full_name}_bucket{_format_labels(labels, [("le", "+Inf")])} {value[-1]}')
+            lines.append(f'{full_name}_sum{_format_labels(labels)} {_format_value(float(value[-2]))}')
+            lines.append(f'{full_name}_count{_format_labels(labels)} {value[-1]}')
+
+    for name, help_text, series in gauges:
+        full_name = PREFIX + name
+        lines.append(f'# HELP {full_name} {help_text}')
+        lines.append(f'# TYPE {full_name} gauge')
+        for labels, value in series:
+            lines.append(f'{full_name}{_format_labels(sorted(labels.items()))} {_format_value(value)}')
+    return '\n'.join(lines) + '\n'
+
+
+# سجل العملية الحالية؛ تستخدمه طبقة التخزين والمخزن والتطبيق
+REGISTRY = Registry()
+
+
+def observe_storage(op, file_path, phase, seconds):
+    REGISTRY.observe('storage_seconds', seconds, {'op': op, 'file': os.path.basename(file_path), 'phase': phase})
+
+
+def count_storage_bytes(op, file_path, size):
+    labels = {'op': op, 'file': os.path.basename(file_path)}
+    REGISTRY.observe('storage_bytes', size, labels)
+    REGISTRY.inc('storage_bytes_total', labels, size)
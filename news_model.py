@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+نموذج الخبر المضغوط في الذاكرة
+Compact in-memory news item for the News Ticker Service
+
+الحالة المحملة في الذاكرة تحتفظ بكل خبر كـ NewsItem بحقول ثابتة (__slots__) بدل dict:
+الحالة نص مشترك (interned)، والتواريخ أعداد صحيحة (ميكروثانية)، والحقول الأخرى في dict اختياري.
+الخبر يتصرف كـ Mapping للقراءة (item['id'] و item.get('status') و dict(item)) ولا يُحوّل
+إلى صيغة JSON الأصلية إلا عند التسلسل.
+"""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime, timedelta
+
+# الحالات المعروفة كنصوص مشتركة: مقارنة الهوية والمساواة رخيصة ولا تتكرر النصوص في الذاكرة
+STATUSES = {status: sys.intern(status) for status in ('published', 'draft', 'archived')}
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+# مفتاح ترتيب الأخبار بلا تاريخ إنشاء صالح (تأتي قبل غيرها كما في الترتيب النصي)
+NO_TIME = -1
+
+
+def encode_time(value):
+    """تاريخ ISO محلي -> ميكروثانية منذ 1970، أو None إن لم يكن نصاً صالحاً"""
+    if not isinstance(value, str) or not value:
+        return None
+    try:
+        moment = datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    if moment.tzinfo is not None:
+        return None
+    return (moment - _EPOCH) // _MICROSECOND
+
+
+def decode_time(micros):
+    return (_EPOCH + timedelta(microseconds=micros)).isoformat()
+
+
+def time_key(value):
+    """مفتاح ترتيب رقمي لقيمة created_at (نص ISO)"""
+    micros = encode_time(value)
+    return NO_TIME if micros is None else micros
+
+
+def _compact_time(value):
+    """العدد الصحيح إن كان يعيد نفس النص تماماً، وإلا None (يبقى النص الأصلي في extra)"""
+    micros = encode_time(value)
+    if micros is not None and decode_time(micros) == value:
+        return micros
+    return None
+
+
+class NewsItem(Mapping):
+    """خبر واحد في الذاكرة (لا يُعدّل بعد إنشائه؛ التحديث عبر dict(item, ...))"""
+
+    __slots__ = ('id', 'content', 'status', 'created', 'updated', 'extra')
+
+    # ترتيب الحقول في صيغة JSON الأصلية
+    FIELDS = ('id', 'content', 'status', 'created_at', 'updated_at')
+
+    def __init__(self, id, content, status, created, updated, extra=None):
+        self.id = id
+        self.content = content
+        self.status = status
+        self.created = created
+        self.updated = updated
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        تحويل خبر dict إلى NewsItem. أي قيمة لا تُضغط دون فقد (تاريخ بصيغة أخرى، أو None صريح)
+        تبقى كما هي في extra، فيعيد to_dict نفس الخبر تماماً.
+        """
+        extra = {key: value for key, value in data.items() if key not in cls.FIELDS}
+        status = data.get('status')
+        if isinstance(status, str):
+            status = STATUSES.get(status) or sys.intern(status)
+        times = []
+        for field in ('created_at', 'updated_at'):
+            micros = _compact_time(data.get(field))
+            if micros is None and field in data:
+                extra[field] = data[field]
+            times.append(micros)
+        for field in ('content', 'status'):
+            if field in data and data[field] is None:
+                extra[field] = None
+        return cls(data['id'], data.get('content'), status, times[0], times[1], extra or None)
+
+    @property
+    def key(self):
+        """مفتاح الترتيب الرقمي (created, id) المقابل لـ sort_key"""
+        return (self.created if self.created is not None else time_key(self.get('created_at')), self.id)
+
+    def to_dict(self):
+        """الصيغة الأصلية للخبر (تُبنى عند الطلب فقط)"""
+        return {key: self[key] for key in self}
+
+    def _has(self, key):
+        if key == 'created_at':
+            return self.created is not None
+        if key == 'updated_at':
+            return self.updated is not None
+        return self._slot(key) is not None
+
+    def _slot(self, key):
+        """قيمة الحقل الثابت أو None إن لم يكن موجوداً"""
+        if key == 'id':
+            return self.id
+        if key == 'content':
+            return self.content
+        if key == 'status':
+            return self.status
+        if key == 'created_at':
+            return None if self.created is None else decode_time(self.created)
+        if key == 'updated_at':
+            return None if self.updated is None else decode_time(self.updated)
+        return None
+
+    def __getitem__(self, key):
+        if self.extra is not None and key in self.extra:
+            return self.extra[key]
+        value = self._slot(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key, default=None):
+        # المسار السريع للحقول الأكثر استخداماً في التصفية والترتيب
+        if key == 'status' and self.status is not None:
+            return self.status
+        if key == 'id':
+            return self.id
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self):
+        extra = self.extra or {}
+        for key in self.FIELDS:
+            if key in extra or self._has(key):
+                yield key
+        for key in extra:
+            if key not in self.FIELDS:
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, NewsItem):
+            return (self.id == other.id and self.content == other.content and self.status == other.status
+                    and self.created == other.created and self.updated == other.updated
+                    and self.extra == other.extra)
+        return Mapping.__eq__(self, other)
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f'NewsItem({self.to_dict()!r})'
+
+    def __reduce__(self):
+        return (NewsItem, (self.id, self.content, self.status, self.created, self.updated, self.extra))
+
+
+def as_item(item):
+    """الخبر كـ NewsItem (بلا نسخ إن كان كذلك بالفعل)"""
+    return item if isinstance(item, NewsItem) else NewsItem.from_dict(item)
+
+
+def json_default(value):
+    """لـ json.dumps(default=...): تسلسل NewsItem بصيغته الأصلية"""
+    if isinstance(value, NewsItem):
+        return value.to_dict()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
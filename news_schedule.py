@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+جدولة ظهور الأخبار في الشريط
+Scheduled publish/expire times for news items
+
+الخبر المنشور (status = published) يظهر في الشريط من publish_at (إن وجد)
+حتى ما قبل expire_at (إن وجد). الأوقات تُخزن بصيغة ISO بالتوقيت المحلي للخادم
+مثل created_at، فتصلح للمقارنة كنصوص وكتواريخ.
+"""
+
+from bisect import bisect_right, insort
+from datetime import datetime
+
+SCHEDULE_FIELDS = ('publish_at', 'expire_at')
+
+
+def normalize_time(value):
+    """تحويل وقت ISO (بمنطقة زمنية أو بدونها) إلى صيغة ISO محلية؛ يرفع ValueError إن كان غير صالح"""
+    if not isinstance(value, str):
+        raise ValueError(f'وقت غير صالح: {value!r}')
+    moment = datetime.fromisoformat(value)
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment.isoformat()
+
+
+def parse_time(value):
+    return datetime.fromisoformat(value) if value else None
+
+
+def is_visible(item, now):
+    """هل يظهر الخبر في الشريط في اللحظة now"""
+    if item.get('status') != 'published':
+        return False
+    publish_at = parse_time(item.get('publish_at'))
+    if publish_at is not None and now < publish_at:
+        return False
+    expire_at = parse_time(item.get('expire_at'))
+    return expire_at is None or now < expire_at
+
+
+def transition_times(item):
+    """اللحظات التي يتغير فيها ظهور الخبر (للأخبار المنشورة فقط)"""
+    if item.get('status') != 'published':
+        return []
+    return [parse_time(item[field]) for field in SCHEDULE_FIELDS if item.get(field)]
+
+
+class TimeIndex:
+    """أوقات التحول مرتبة تصاعدياً: أقرب تحول بعد لحظة ما بـ O(log n)"""
+
+    __slots__ = ('times',)
+
+    def __init__(self, times):
+        self.times = times
+
+    @classmethod
+    def build(cls, items):
+        return cls(sorted(moment for item in items for moment in transition_times(item)))
+
+    def copy(self):
+        return TimeIndex(list(self.times))
+
+    def insert(self, item):
+        for moment in transition_times(item):
+            insort(self.times, moment)
+
+    def remove(self, item):
+        for moment in transition_times(item):
+            pos = bisect_right(self.times, moment) - 1
+            if pos >= 0 and self.times[pos] == moment:
+                del self.times[pos]
+
+    def next_after(self, now):
+        """أول تحول بعد now، أو None إن لم يبق تحول مجدول"""
+        pos = bisect_right(self.times, now)
+        return self.times[pos] if pos < len(self.times) else None
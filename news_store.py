@@ -0,0 +1,876 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+مخزن الأخبار في الذاكرة لخدمة الشريط الإخباري
+In-memory News Store for the News Ticker Service
+
+يحتفظ بالأخبار والإعدادات بعد تحليلها، ويتحقق من تغير الملفات
+(mtime / size / inode) قبل كل قراءة حتى تظهر تعديلات العمال الآخرين.
+"""
+
+import copy
+import gzip
+import hashlib
+import logging
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from datetime import datetime, timezone
+from operator import attrgetter, itemgetter
+
+from metrics import REGISTRY
+from news_model import as_item, time_key
+from news_schedule import TimeIndex, is_visible
+from storage import FileLock, file_signature, sort_key
+
+try:
+    import brotli
+except ImportError:  # اختياري: بدونه يُستخدم gzip فقط
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# قيمة تميز غياب الملف أو تعذر تحليله عن البيانات الفعلية
+_MISSING = object()
+
+
+def supported_encodings():
+    """ترميزات الضغط المتاحة مرتبة حسب الأفضلية"""
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def compress(body, encoding):
+    if encoding == 'br':
+        return brotli.compress(body, quality=11)
+    # mtime=0 حتى تكون النسخة المضغوطة متطابقة بين العمال
+    return gzip.compress(body, compresslevel=9, mtime=0)
+
+
+class Snapshot:
+    """حمولة JSON مسلسلة مسبقاً مع ETag قوي وتاريخ آخر تعديل ونسخ مضغوطة تُحسب مرة واحدة"""
+
+    __slots__ = ('body', 'etag', 'last_modified', 'payload', '_encoded', '_lock')
+
+    def __init__(self, body, payload=None):
+        self.body = body
+        # الحمولة الأصلية قبل التسلسل (تستخدمها قنوات البث لحساب الفروقات)
+        self.payload = payload
+        self.etag = hashlib.sha1(body).hexdigest()
+        self.last_modified = datetime.now(timezone.utc).replace(microsecond=0)
+        self._encoded = {}
+        self._lock = threading.Lock()
+
+    def encoded(self, encoding):
+        """المحتوى مضغوطاً بالترميز المطلوب (gzip أو br)، يُضغط مرة واحدة لكل نسخة من البيانات"""
+        body = self._encoded.get(encoding)
+        if body is None:
+            with self._lock:
+                body = self._encoded.get(encoding)
+                if body is None:
+                    body = self._encoded[encoding] = compress(self.body, encoding)
+        return body
+
+
+def index_key(key):
+    """مفتاح الصفحة العام (created_at, id) -> المفتاح الرقمي المستخدم داخل الفهرس"""
+    return (time_key(key[0]), key[1])
+
+
+class SortedIndex:
+    """
+    فهرس مرتب تصاعدياً حسب (created_at, id) لمجموعة من الأخبار (NewsItem)، مقسم إلى أجزاء
+    بحجم CHUNK تقريباً: النسخة (copy) تشارك الأجزاء مع الأصل، والتعديل ينسخ الجزء الذي يمسه فقط،
+    فكلفة تطبيق تغيير على حالة جديدة لا تتبع عدد الأخبار.
+    المفاتيح رقمية (NewsItem.key)؛ مفاتيح الصفحات خارج الفهرس تبقى (created_at, id) كما في sort_key.
+    """
+
+    __slots__ = ('_keys', '_items', '_maxes', '_len', '_owned')
+
+    CHUNK = 512
+
+    def __init__(self, keys, items, maxes, length, owned=None):
+        # قوائم أجزاء متوازية: _keys[i] و _items[i]، و _maxes[i] آخر مفتاح في الجزء i
+        self._keys = keys
+        self._items = items
+        self._maxes = maxes
+        self._len = length
+        # هويات الأجزاء التي أنشأتها هذه النسخة (يجوز تعديلها دون نسخ)
+        self._owned = set() if owned is None else owned
+
+    @classmethod
+    def build(cls, items):
+        pairs = sorted(((item.key, item) for item in items), key=itemgetter(0))
+        keys = [[key for key, _ in pairs[start:start + cls.CHUNK]] for start in range(0, len(pairs), cls.CHUNK)]
+        values = [[item for _, item in pairs[start:start + cls.CHUNK]] for start in range(0, len(pairs), cls.CHUNK)]
+        return cls(keys, values, [chunk[-1] for chunk in keys], len(pairs), {id(chunk) for chunk in keys})
+
+    def copy(self):
+        return SortedIndex(list(self._keys), list(self._items), list(self._maxes), self._len)
+
+    def __len__(self):
+        return self._len
+
+    @property
+    def keys(self):
+        """كل المفاتيح مرتبة (تُجمع عند الطلب؛ للفحص والاختبارات)"""
+        return [key for chunk in self._keys for key in chunk]
+
+    @property
+    def items(self):
+        """كل العناصر مرتبة من الأقدم (تُجمع عند الطلب)"""
+        return [item for chunk in self._items for item in chunk]
+
+    def _own(self, i):
+        if id(self._keys[i]) not in self._owned:
+            self._keys[i] = list(self._keys[i])
+            self._items[i] = list(self._items[i])
+            self._owned.add(id(self._keys[i]))
+
+    def insert(self, item):
+        key = item.key
+        if not self._keys:
+            self._keys.append([key])
+            self._items.append([item])
+            self._maxes.append(key)
+            self._owned.add(id(self._keys[0]))
+            self._len = 1
+            return
+        i = min(bisect_left(self._maxes, key), len(self._maxes) - 1)
+        self._own(i)
+        keys, items = self._keys[i], self._items[i]
+        pos = bisect_left(keys, key)
+        keys.insert(pos, key)
+        items.insert(pos, item)
+        self._maxes[i] = keys[-1]
+        self._len += 1
+        if len(keys) > 2 * self.CHUNK:
+            # تقسيم الجزء الكبير إلى نصفين
+            half = len(keys) // 2
+            self._keys[i:i + 1] = [keys[:half], keys[half:]]
+            self._items[i:i + 1] = [items[:half], items[half:]]
+            self._maxes[i:i + 1] = [keys[half - 1], keys[-1]]
+            self._owned.discard(id(keys))
+            self._owned.update((id(self._keys[i]), id(self._keys[i + 1])))
+
+    def remove(self, item):
+        key = item.key
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return
+        pos = bisect_left(self._keys[i], key)
+        if pos == len(self._keys[i]) or self._keys[i][pos] != key:
+            return
+        self._own(i)
+        del self._keys[i][pos]
+        del self._items[i][pos]
+        self._len -= 1
+        if self._keys[i]:
+            self._maxes[i] = self._keys[i][-1]
+        else:
+            self._owned.discard(id(self._keys[i]))
+            del self._keys[i], self._items[i], self._maxes[i]
+
+    def _position(self, key):
+        """(الجزء، الموضع) لأول مفتاح >= key"""
+        i = bisect_left(self._maxes, key)
+        if i == len(self._maxes):
+            return i - 1, len(self._keys[i - 1]) if i else 0
+        return i, bisect_left(self._keys[i], key)
+
+    def iter_desc(self, after=None):
+        """العناصر من الأحدث إلى الأقدم، بدءاً بعد المفتاح العام after"""
+        if not self._keys:
+            return
+        if after is None:
+            i, pos = len(self._keys) - 1, len(self._keys[-1])
+        else:
+            i, pos = self._position(index_key(after))
+        while i >= 0:
+            items = self._items[i]
+            for j in range(pos - 1, -1, -1):
+                yield items[j]
+            i -= 1
+            if i >= 0:
+                pos = len(self._items[i])
+
+    def ascending(self, offset, limit):
+        """limit عنصراً من الأقدم بعد تخطي offset"""
+        result = []
+        for items in self._items:
+            if offset >= len(items):
+                offset -= len(items)
+                continue
+            result.extend(items[offset:offset + limit - len(result)])
+            offset = 0
+            if len(result) >= limit:
+                break
+        return result
+
+    def page(self, limit=None, after=None):
+        """صفحة من الأحدث إلى الأقدم تبدأ بعد المفتاح after؛ تعيد (العناصر، مفتاح الصفحة التالية)"""
+        news = []
+        more = False
+        for item in self.iter_desc(after):
+            if limit is not None and len(news) >= limit:
+                more = True
+                break
+            news.append(item)
+        return news, (sort_key(news[-1]) if more and news else None)
+
+
+class IdMap:
+    """
+    فهرس المعرّفات مقسم إلى أجزاء حسب المعرّف: التحديث (evolve) ينسخ الأجزاء المتغيرة فقط
+    وتبقى البقية مشتركة مع الحالة السابقة.
+    """
+
+    __slots__ = ('_shards', '_size')
+
+    def __init__(self, shards, size):
+        self._shards = shards
+        self._size = size
+
+    @classmethod
+    def build(cls, items):
+        shards = [{} for _ in range(max(16, math.isqrt(len(items))))]
+        for item in items:
+            shards[hash(item.id) % len(shards)][item.id] = item
+        return cls(shards, sum(len(shard) for shard in shards))
+
+    def get(self, news_id, default=None):
+        return self._shards[hash(news_id) % len(self._shards)].get(news_id, default)
+
+    def __contains__(self, news_id):
+        return news_id in self._shards[hash(news_id) % len(self._shards)]
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for shard in self._shards:
+            yield from shard
+
+    def values(self):
+        for shard in self._shards:
+            yield from shard.values()
+
+    def evolve(self, updates):
+        """نسخة جديدة بعد updates: المعرّف -> NewsItem أو None للحذف"""
+        shards = list(self._shards)
+        size = self._size
+        copied = set()
+        for news_id, item in updates.items():
+            n = hash(news_id) % len(shards)
+            if n not in copied:
+                shards[n] = dict(shards[n])
+                copied.add(n)
+            shard = shards[n]
+            if item is None:
+                if shard.pop(news_id, _MISSING) is not _MISSING:
+                    size -= 1
+            else:
+                if news_id not in shard:
+                    size += 1
+                shard[news_id] = item
+        return IdMap(shards, size)
+
+
+def item_channels(item):
+    """قنوات الشريط التي يظهر فيها الخبر (الحقل channels)"""
+    return item.get('channels') or ()
+
+
+def _matches(item, status, exclude_status, channel=None):
+    if channel is not None and channel not in item_channels(item):
+        return False
+    if status is not None:
+        return item.get('status') == status
+    if exclude_status is not None:
+        return item.get('status') != exclude_status
+    return True
+
+
+class NewsState:
+    """حالة الأخبار المحملة: الأخبار (NewsItem) وفهرس المعرّفات والفهارس المرتبة (لا تُعدّل بعد إنشائها)"""
+
+    __slots__ = ('_items', 'by_id', '_max_id', '_indexes', '_schedule', '_channels', '_lock')
+
+    def __init__(self, items, max_id=None, by_id=None, indexes=None, schedule=None, channels=None):
+        if by_id is None:
+            # الأخبار المحملة من المحرك تُحوّل مرة واحدة
+            self._items = [as_item(item) for item in items]
+            self.by_id = IdMap.build(self._items)
+        else:
+            # الحالات المشتقة عبر apply: القائمة تُجمع من by_id عند أول طلب فقط
+            self._items = items
+            self.by_id = by_id
+        self._max_id = max(self.by_id, default=0) if max_id is None else max_id
+        # (status, exclude_status, channel) -> SortedIndex ؛ تُبنى عند أول استخدام
+        self._indexes = {} if indexes is None else indexes
+        # أوقات publish_at / expire_at للأخبار المنشورة (TimeIndex)؛ يُبنى عند أول استخدام
+        self._schedule = schedule
+        # القناة -> عدد أخبارها (Counter)؛ يُبنى عند أول استخدام
+        self._channels = channels
+        self._lock = threading.Lock()
+
+    @property
+    def items(self):
+        """كل الأخبار (مرتبة حسب المعرّف في الحالات المشتقة)؛ لا يجوز تعديلها"""
+        if self._items is None:
+            with self._lock:
+                if self._items is None:
+                    self._items = sorted(self.by_id.values(), key=attrgetter('id'))
+        return self._items
+
+    def get(self, news_id):
+        return self.by_id.get(news_id)
+
+    def count(self, status=None):
+        if status is None:
+            return len(self.by_id)
+        return len(self._index(status, None))
+
+    def max_id(self):
+        return self._max_id
+
+    def iter_items(self):
+        return iter(self.items)
+
+    def _index(self, status, exclude_status, channel=None):
+        key = (status, exclude_status, channel)
+        index = self._indexes.get(key)
+        if index is None:
+            with self._lock:
+                index = self._indexes.get(key)
+                if index is None:
+                    index = SortedIndex.build(
+                        item for item in self.items if _matches(item, status, exclude_status, channel))
+                    self._indexes[key] = index
+        return index
+
+    def page(self, status=None, exclude_status=None, limit=None, after=None):
+        """صفحة مرتبة من الأحدث بعد المفتاح after؛ تعيد (العناصر، مفتاح الصفحة التالية)"""
+        return self._index(status, exclude_status).page(limit, after)
+
+    def list(self, status=None, exclude_status=None, limit=None):
+        """الأخبار مرتبة من الأحدث، مع تصفية حسب الحالة"""
+        return self.page(status, exclude_status, limit)[0]
+
+    def oldest(self, status, limit, offset=0):
+        """أقدم الأخبار بالحالة المطلوبة مرتبة من الأقدم"""
+        return self._index(status, None).ascending(offset, limit)
+
+    def status_counts(self):
+        return Counter(item.get('status') for item in self.items)
+
+    def channels(self):
+        """القنوات المستخدمة في الأخبار الحالية مع عدد أخبار كل منها (لا يجوز تعديله)"""
+        if self._channels is None:
+            with self._lock:
+                if self._channels is None:
+                    self._channels = Counter(
+                        channel for item in self.items for channel in item_channels(item))
+        return self._channels
+
+    def _time_index(self):
+        if self._schedule is None:
+            with self._lock:
+                if self._schedule is None:
+                    self._schedule = TimeIndex.build(self.items)
+        return self._schedule
+
+    def next_transition(self, now):
+        """أقرب لحظة بعد now يتغير فيها ظهور خبر منشور (publish_at أو expire_at)، أو None"""
+        return self._time_index().next_after(now)
+
+    def visible(self, now, limit=None, channel=None):
+        """الأخبار المنشورة الظاهرة في اللحظة now مرتبة من الأحدث (في القناة channel إن حُددت)"""
+        news = []
+        for item in self._index('published', None, channel).iter_desc():
+            if is_visible(item, now):
+                news.append(item)
+                if limit is not None and len(news) >= limit:
+                    break
+        return news
+
+    def apply(self, changes):
+        """
+        إنشاء حالة جديدة بعد تطبيق التغييرات؛ changes من ('put', item) أو ('delete', id).
+        الحالة الجديدة تشارك الأجزاء غير المتغيرة من الفهارس مع الحالية، فالكلفة تتبع حجم التغيير.
+        """
+        max_id = self._max_id
+        with self._lock:
+            indexes = {key: index.copy() for key, index in self._indexes.items()}
+            schedule = self._schedule.copy() if self._schedule is not None else None
+            channels = Counter(self._channels) if self._channels is not None else None
+        # المعرّف -> الخبر الجديد أو None للمحذوف
+        updates = {}
+        for op, value in changes:
+            if op == 'put':
+                value = as_item(value)
+            news_id = value.id if op == 'put' else value
+            old = updates[news_id] if news_id in updates else self.by_id.get(news_id)
+            for (status, exclude_status, channel), index in indexes.items():
+                if old is not None and _matches(old, status, exclude_status, channel):
+                    index.remove(old)
+                if op == 'put' and _matches(value, status, exclude_status, channel):
+                    index.insert(value)
+            if channels is not None:
+                if old is not None:
+                    channels.subtract(item_channels(old))
+                if op == 'put':
+                    channels.update(item_channels(value))
+            if schedule is not None:
+                if old is not None:
+                    schedule.remove(old)
+                if op == 'put':
+                    schedule.insert(value)
+            if op == 'put':
+                updates[news_id] = value
+                max_id = max(max_id, news_id)
+            else:
+                updates[news_id] = None
+        if channels is not None:
+            # حذف القنوات التي لم يبق فيها خبر
+            channels = +channels
+        return NewsState(None, max_id, self.by_id.evolve(updates), indexes, schedule, channels)
+
+
+class TieredState:
+    """
+    حالة التخزين المتدرج: الأخبار النشطة في الذاكرة (NewsState) والمؤرشفة في قطع شهرية (ArchiveSegments).
+    الشريط والصفحة الأولى وكل ما يستثني المؤرشف يُخدم من الطبقة النشطة وحدها.
+    """
+
+    __slots__ = ('hot', 'archive')
+
+    def __init__(self, hot, archive):
+        self.hot = hot
+        self.archive = archive
+
+    @property
+    def items(self):
+        """الأخبار النشطة فقط (هي ما يحفظه المحرك في الملف)"""
+        return self.hot.items
+
+    def get(self, news_id):
+        item = self.hot.get(news_id)
+        return item if item is not None else self.archive.get(news_id)
+
+    def count(self, status=None):
+        if status == 'archived':
+            return self.archive.count()
+        if status is None:
+            return self.hot.count() + self.archive.count()
+        return self.hot.count(status)
+
+    def max_id(self):
+        return max(self.hot.max_id(), self.archive.max_id())
+
+    def iter_items(self):
+        yield from self.hot.iter_items()
+        yield from self.archive.iter_items()
+
+    def status_counts(self):
+        counts = self.hot.status_counts()
+        counts['archived'] += self.archive.count()
+        return counts
+
+    def page(self, status=None, exclude_status=None, limit=None, after=None):
+        """صفحة مرتبة من الأحدث بعد المفتاح after؛ تعيد (العناصر، مفتاح الصفحة التالية)"""
+        if status == 'archived':
+            return self.archive.page(limit, after)
+        if status is not None or exclude_status == 'archived':
+            return self.hot.page(status, exclude_status, limit, after)
+        # بلا تصفية: دمج الطبقتين حسب (created_at, id)
+        hot, hot_next = self.hot.page(None, exclude_status, limit, after)
+        archived, archived_next = self.archive.page(limit, after)
+        merged = sorted(hot + archived, key=sort_key, reverse=True)
+        if limit is None or (len(merged) <= limit and hot_next is None and archived_next is None):
+            return merged, None
+        news = merged[:limit]
+        return news, sort_key(news[-1])
+
+    def list(self, status=None, exclude_status=None, limit=None):
+        """الأخبار مرتبة من الأحدث، مع تصفية حسب الحالة"""
+        return self.page(status, exclude_status, limit)[0]
+
+    def oldest(self, status, limit, offset=0):
+        """أقدم الأخبار بالحالة المطلوبة مرتبة من الأقدم (للأخبار النشطة)"""
+        return self.hot.oldest(status, limit, offset)
+
+    def next_transition(self, now):
+        return self.hot.next_transition(now)
+
+    def visible(self, now, limit=None, channel=None):
+        return self.hot.visible(now, limit, channel)
+
+    def channels(self):
+        """قنوات الأخبار النشطة (الأخبار المؤرشفة لا تظهر في أي شريط)"""
+        return self.hot.channels()
+
+    def apply(self, changes):
+        """الأخبار المؤرشفة تخرج من الطبقة النشطة؛ يكتبها المحرك في قطعها عند الحفظ"""
+        hot_changes = []
+        # المعرّفات الموجودة في الطبقة النشطة بعد ما سبق من تغييرات
+        present = {}
+        for op, value in changes:
+            news_id = value['id'] if op == 'put' else value
+            in_hot = present.get(news_id, self.hot.get(news_id) is not None)
+            if op == 'put' and value.get('status') != 'archived':
+                hot_changes.append((op, value))
+                present[news_id] = True
+            else:
+                if in_hot:
+                    hot_changes.append(('delete', news_id))
+                present[news_id] = False
+        return TieredState(self.hot.apply(hot_changes), self.archive)
+
+
+class _Flight:
+    """إعادة بناء جارية لمفتاح واحد؛ الخيوط الأخرى تنتظر نتيجتها بدل تكرارها"""
+
+    __slots__ = ('tag', 'started', 'event', 'value', 'error')
+
+    def __init__(self, tag):
+        self.tag = tag
+        self.started = time.monotonic()
+        self.event = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self):
+        self.event.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+class NewsTransaction:
+    """
+    معاملة كتابة على الأخبار: تُنفذ تحت قفل المحرك وعلى أحدث حالة محفوظة،
+    وتُحفظ تغييراتها مرة واحدة عند الخروج من كتلة with.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.state = None
+        self.changes = []
+        # التغييرات المعلقة داخل المعاملة: id -> item أو None للمحذوف
+        self._pending = {}
+        self.committed = False
+
+    def __enter__(self):
+        self.store.backend.lock.acquire()
+        try:
+            # إعادة التحقق تحت القفل تلتقط كتابات العمليات الأخرى قبل التعديل؛
+            # بلا انتظار لتحميل يقوده خيط آخر (قد يحتاج هو نفسه قفل الكتابة)
+            self.state = self.store._entry('news', coalesce=False)[1]
+        except Exception:
+            self.store.backend.lock.release()
+            raise
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            if exc_type is None and self.changes:
+                self.committed = self.store._commit(self.state, self.changes)
+        finally:
+            self.store.backend.lock.release()
+        return False
+
+    def get(self, news_id):
+        if news_id in self._pending:
+            return self._pending[news_id]
+        return self.state.get(news_id)
+
+    def next_id(self):
+        """حجز معرّف جديد من التسلسل المحفوظ"""
+        return self.store.backend.allocate_id(self.state)
+
+    def put(self, item):
+        self.changes.append(('put', item))
+        self._pending[item['id']] = item
+
+    def delete(self, news_id):
+        self.changes.append(('delete', news_id))
+        self._pending[news_id] = None
+
+    def rollback(self):
+        """إلغاء كل تغييرات المعاملة فلا يُحفظ شيء عند الخروج"""
+        self.changes = []
+        self._pending = {}
+
+
+class NewsStore:
+    """ذاكرة مؤقتة للأخبار والإعدادات مع عدادات الإصابة والإخفاق وإعادة التحميل"""
+
+    def __init__(self, backend, settings_file, loader, saver, stale_window=0.0):
+        self.backend = backend
+        self.settings_file = settings_file
+        # يسلسل تحديثات الإعدادات بين العمليات (قراءة ثم تعديل ثم حفظ)
+        self.settings_lock = FileLock(f'{settings_file}.lock')
+        self._loader = loader
+        self._saver = saver
+        self._lock = threading.Lock()
+        # المصدر ('news' أو 'settings') -> (signature, data, version)
+        self._cache = {}
+        # (source, name) -> (version, value) للقيم المشتقة مثل حمولة الشريط المحضرة مسبقاً
+        self._derived = {}
+        # دوال تُستدعى بعد كل تغيير في البيانات: callback(source, changes)
+        self._listeners = []
+        # عمليات التحميل وإعادة البناء الجارية: مفتاح -> _Flight (خيط واحد يبني والبقية تنتظر)
+        self._flights = {}
+        # مدة (بالثواني) يُسمح فيها بإرجاع القيمة القديمة بينما يعيد خيط آخر بناءها
+        self.stale_window = stale_window
+        # مع ناقل الإبطال: مدة الوثوق بالنسخة المخزنة دون فحص الملف (None: فحص مع كل قراءة)
+        self.revalidate_interval = None
+        # المصدر -> لحظة آخر فحص لتوقيع الملف (time.monotonic)
+        self._checked = {}
+        self.hits = 0
+        self.misses = 0
+        self.reloads = 0
+        self.rebuilds = 0
+        self.coalesced = 0
+        self.stale_served = 0
+        # يزداد عند كل تغيير في البيانات المحملة (قراءة جديدة أو حفظ)
+        self.version = 0
+
+    def _signature(self, source):
+        if source == 'news':
+            return self.backend.signature()
+        return file_signature(self.settings_file)
+
+    def _read_signature(self, source):
+        """
+        توقيع المصدر للقراءة. مع ناقل الإبطال يُوثق بالنسخة المخزنة حتى تصل رسالة إبطال
+        أو تمر revalidate_interval ثانية، فلا يُفحص الملف مع كل طلب.
+        """
+        if self.revalidate_interval is not None:
+            with self._lock:
+                cached = self._cache.get(source)
+                checked = self._checked.get(source)
+            if cached is not None and checked is not None \
+                    and time.monotonic() - checked < self.revalidate_interval:
+                return cached[0]
+        signature = self._signature(source)
+        with self._lock:
+            self._checked[source] = time.monotonic()
+        return signature
+
+    def invalidate(self, source=None):
+        """إبطال النسخة المخزنة (رسالة من عقدة أخرى): القراءة التالية تتحقق من الملف وتعيد التحميل إن تغير"""
+        with self._lock:
+            if source is None:
+                self._checked.clear()
+            else:
+                self._checked.pop(source, None)
+        # إيقاظ المستمعين (مثل بث الشريط) ليعيدوا القراءة
+        self._notify(source, None)
+
+    def _load(self, source, signature):
+        if source == 'news':
+            # المحركات التي تنفذ الاستعلامات بنفسها (مثل SQLite) لا تُحمّل في الذاكرة
+            if getattr(self.backend, 'live', False):
+                return self.backend
+            if getattr(self.backend, 'tiered', False):
+                return TieredState(NewsState(self.backend.load()), self.backend.archive)
+            return NewsState(self.backend.load())
+        if signature is None:
+            return None
+        data = self._loader(self.settings_file, _MISSING)
+        return None if data is _MISSING else data
+
+    def _single_flight(self, key, tag, compute):
+        """
+        تنفيذ compute مرة واحدة بين الخيوط المتزامنة التي تطلب نفس (key, tag)؛
+        من يصل أثناء التنفيذ ينتظر النتيجة نفسها (أو الاستثناء نفسه).
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None or flight.tag != tag
+            if leader:
+                flight = self._flights[key] = _Flight(tag)
+            else:
+                self.coalesced += 1
+        if not leader:
+            REGISTRY.inc('single_flight_total', {'key': key[0], 'result': 'coalesced'})
+            return flight.wait()
+        try:
+            flight.value = compute()
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            flight.event.set()
+        return flight.value
+
+    def _entry(self, source, coalesce=True):
+        # الكتابة (coalesce=False) تتحقق من الملف دائماً لالتقاط كتابات العقد الأخرى
+        signature = self._read_signature(source) if coalesce else self._signature(source)
+        with self._lock:
+            cached = self._cache.get(source)
+            if cached is not None and cached[0] == signature:
+                self.hits += 1
+                result = 'hit'
+            elif cached is None:
+                self.misses += 1
+                result = 'miss'
+            else:
+                self.reloads += 1
+                result = 'reload'
+        REGISTRY.inc('store_cache_total', {'source': source, 'result': result})
+        if result == 'hit':
+            return cached
+        if not coalesce:
+            return self._reload(source, signature)
+        # بعد كتابة أو إعادة تشغيل: خيط واحد يقرأ الملف والبقية ينتظرون نفس النتيجة
+        return self._single_flight(('load', source), signature, lambda: self._reload(source, signature))
+
+    def _reload(self, source, signature):
+        with REGISTRY.timer('store_load_seconds', {'source': source}):
+            data = self._load(source, signature)
+        with self._lock:
+            self.version += 1
+            entry = (signature, data, self.version)
+            self._cache[source] = entry
+        self._notify(source, None)
+        return entry
+
+    def _store(self, source, data, changes=None):
+        with self._lock:
+            self.version += 1
+            self._cache[source] = (self._signature(source), data, self.version)
+            self._checked[source] = time.monotonic()
+        self._notify(source, changes)
+
+    def subscribe(self, callback):
+        """تسجيل دالة تُستدعى بعد كل تغيير: callback(source, changes)؛ changes تساوي None عند إعادة التحميل"""
+        self._listeners.append(callback)
+
+    def _notify(self, source, changes):
+        for callback in list(self._listeners):
+            try:
+                callback(source, changes)
+            except Exception:
+                logger.exception(f"خطأ في مستمع تغييرات {source}")
+
+    def _view(self, source, name, builder, default_data=None, valid_until=None):
+        """
+        قيمة مشتقة مخزنة لكل نسخة من البيانات. عند انتهاء صلاحيتها يعيد بناءها خيط واحد فقط:
+        البقية تنتظر نتيجته، أو تأخذ القيمة القديمة إن بدأ البناء منذ أقل من stale_window ثانية.
+        """
+        key = (source, name)
+        signature = self._read_signature(source)
+        with self._lock:
+            cached = self._derived.get(key)
+            entry = self._cache.get(source)
+            flight = self._flights.get(('view',) + key)
+        if cached is not None and entry is not None and entry[0] == signature and cached[0] == entry[2] \
+                and (cached[2] is None or datetime.now() < cached[2]):
+            with self._lock:
+                self.hits += 1
+            REGISTRY.inc('store_cache_total', {'source': source, 'result': 'hit'})
+            return cached[1]
+        if cached is not None and flight is not None and time.monotonic() - flight.started <= self.stale_window:
+            with self._lock:
+                self.stale_served += 1
+            REGISTRY.inc('single_flight_total', {'key': 'view', 'result': 'stale'})
+            return cached[1]
+
+        def rebuild():
+            _, data, version = self._entry(source)
+            with self._lock:
+                current = self._derived.get(key)
+            if current is not None and current[0] == version and (current[2] is None or datetime.now() < current[2]):
+                # بناها خيط آخر بعد فحصنا الأول
+                return current[1]
+            # نهاية الصلاحية تُحسب قبل البناء: أي تحول يقع أثناء البناء يعيد البناء مرة أخرى ولا يفوت
+            until = valid_until(data) if valid_until is not None else None
+            with REGISTRY.timer('view_build_seconds', {'view': name}):
+                if source == 'news':
+                    value = builder(data)
+                else:
+                    value = builder(copy.deepcopy(default_data) if data is None else data)
+            with self._lock:
+                self.rebuilds += 1
+                self._derived[key] = (version, value, until)
+            return value
+
+        return self._single_flight(('view',) + key, signature, rebuild)
+
+    # --- الأخبار --- #
+
+    def news(self):
+        """حالة الأخبار الحالية للاستعلام: get / count / list (لا يجوز تعديل عناصرها)"""
+        return self._entry('news')[1]
+
+    def get(self, news_id):
+        """خبر واحد حسب المعرّف أو None (لا يجوز تعديله؛ يُنسخ قبل التحديث)"""
+        return self.news().get(news_id)
+
+    def transaction(self):
+        """بدء معاملة كتابة على الأخبار (انظر NewsTransaction)"""
+        return NewsTransaction(self)
+
+    def _commit(self, state, changes):
+        """حفظ تغييرات الأخبار عبر محرك التخزين وتحديث الذاكرة دون إعادة التحميل"""
+        if getattr(self.backend, 'live', False):
+            if not self.backend.commit(None, changes):
+                return False
+        else:
+            state = state.apply(changes)
+            # المحركات التي تكتب التغييرات وحدها (السجل الإلحاقي) لا تحتاج القائمة الكاملة
+            news = None if getattr(self.backend, 'incremental', False) else state.items
+            if not self.backend.commit(news, changes):
+                return False
+        self._store('news', state, changes)
+        return True
+
+    def news_view(self, name, builder, valid_until=None):
+        """
+        قيمة مشتقة من حالة الأخبار تُبنى مرة واحدة لكل نسخة من البيانات.
+        valid_until(news): لحظة انتهاء صلاحية القيمة حتى دون تغير البيانات (مثل موعد نشر مجدول) أو None.
+        """
+        return self._view('news', name, builder, valid_until=valid_until)
+
+    # --- الإعدادات --- #
+
+    def settings(self, default_data):
+        """الإعدادات المخزنة (مشتركة بين الطلبات، لا يجوز تعديلها)"""
+        data = self._entry('settings')[1]
+        return copy.deepcopy(default_data) if data is None else data
+
+    def settings_for_update(self, default_data):
+        """نسخة قابلة للتعديل من الإعدادات (تُقرأ من الملف مباشرة إن تغير، لا من نسخة موثوقة)"""
+        data = self._entry('settings', coalesce=False)[1]
+        return copy.deepcopy(default_data if data is None else data)
+
+    def save_settings(self, settings):
+        if not self._saver(self.settings_file, settings):
+            return False
+        self._store('settings', settings, [('put', settings)])
+        return True
+
+    def settings_view(self, name, default_data, builder):
+        """قيمة مشتقة من الإعدادات تُبنى مرة واحدة لكل نسخة من البيانات"""
+        return self._view('settings', name, builder, default_data)
+
+    def stats(self):
+        """عدادات الذاكرة المؤقتة"""
+        with self._lock:
+            return {
+                'backend': self.backend.name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'reloads': self.reloads,
+                'rebuilds': self.rebuilds,
+                'coalesced': self.coalesced,
+                'stale_served': self.stale_served,
+                'version': self.version,
+            }
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+تصدير الأخبار واستيرادها بصيغة NDJSON
+Streaming NDJSON export/import for the News Ticker Service
+
+سطر JSON واحد لكل خبر. التصدير يمر على الأخبار صفحة بعد صفحة عبر نفس الفهارس
+المستخدمة في نقاط القراءة، والاستيراد يقرأ جسم الطلب على أجزاء ويحفظ على دفعات،
+فلا يُبنى المستند كاملاً في الذاكرة في أي من الاتجاهين.
+"""
+
+import json
+
+from news_model import json_default
+
+
+def export_lines(news, status=None, since=None, until=None, chunk_size=500):
+    """
+    أسطر NDJSON (bytes) للأخبار من الأحدث، مع تصفية اختيارية حسب الحالة و created_at:
+    since <= created_at < until (أوقات ISO موحدة).
+    """
+    # مفتاح الترتيب (created_at, id): المعرّفات موجبة فالمفتاح (until, 0) يستثني ما يساوي until
+    after = (until, 0) if until is not None else None
+    while True:
+        items, after = news.page(status=status, limit=chunk_size, after=after)
+        for item in items:
+            if since is not None and (item.get('created_at') or '') < since:
+                # الترتيب من الأحدث: كل ما بعده أقدم أيضاً
+                return
+            yield json.dumps(item, ensure_ascii=False, default=json_default).encode('utf-8') + b'\n'
+        if after is None:
+            return
+
+
+def iter_ndjson(stream, chunk_size=64 * 1024):
+    """
+    قراءة جسم NDJSON على أجزاء؛ تعيد (رقم السطر، القيمة، رسالة الخطأ) لكل سطر غير فارغ.
+    """
+    buffer = b''
+    line_number = 0
+    while True:
+        chunk = stream.read(chunk_size)
+        if chunk:
+            buffer += chunk
+            lines = buffer.split(b'\n')
+            buffer = lines.pop()
+        else:
+            lines = [buffer] if buffer else []
+        for line in lines:
+            line_number += 1
+            if not line.strip():
+                continue
+            try:
+                yield line_number, json.loads(line), None
+            except ValueError:
+                yield line_number, None, 'سطر JSON غير صالح'
+        if not chunk:
+            return
+
+
+def import_records(store, records, prepare, batch_size=500, max_errors=100):
+    """
+    إضافة أو استبدال الأخبار حسب المعرّف؛ كل batch_size خبر معاملة واحدة وحفظ واحد.
+    records: من iter_ndjson. prepare(record, current): الخبر المراد حفظه أو يرفع ValueError.
+    يعيد تقريراً بالأعداد وأول max_errors خطأ، ويرفع IOError إذا فشل حفظ دفعة.
+    """
+    report = {'created': 0, 'updated': 0, 'failed': 0, 'batches': 0, 'errors': []}
+
+    def fail(line_number, error):
+        report['failed'] += 1
+        if len(report['errors']) < max_errors:
+            report['errors'].append({'line': line_number, 'error': error})
+
+    def flush(batch):
+        with store.transaction() as tx:
+            for line_number, record in batch:
+                news_id = record.get('id') if isinstance(record, dict) else None
+                current = tx.get(news_id) if isinstance(news_id, int) else None
+                try:
+                    item = prepare(record, current)
+                except ValueError as e:
+                    fail(line_number, str(e))
+                    continue
+                tx.put(item)
+                report['updated' if current is not None else 'created'] += 1
+        if tx.changes and not tx.committed:
+            raise IOError(f"فشل في حفظ دفعة الاستيراد عند السطر {batch[-1][0]}")
+        report['batches'] += 1
+
+    batch = []
+    for line_number, record, error in records:
+        if error:
+            fail(line_number, error)
+            continue
+        batch.append((line_number, record))
+        if len(batch) >= batch_size:
+            flush(batch)
+            batch = []
+    if batch:
+        flush(batch)
+    return report
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+البحث النصي في الأخبار مع مراعاة خصائص اللغة العربية
+Arabic-aware full-text search for the News Ticker Service
+
+فهرس مقلوب في الذاكرة (كلمة -> معرّفات الأخبار) يُحدّث تدريجياً مع كل تغيير،
+مع توحيد الكتابة العربية: حذف التشكيل والتطويل، وتوحيد أشكال الألف والهمزة، والتاء المربوطة.
+"""
+
+import re
+import threading
+from bisect import bisect_left, insort
+
+# التشكيل والعلامات القرآنية والألف الخنجرية
+_DIACRITICS = re.compile('[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed]')
+_TATWEEL = '\u0640'
+_CHAR_MAP = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ؤ': 'و', 'ئ': 'ي', 'ى': 'ي',
+    'ة': 'ه',
+})
+_TOKEN = re.compile(r'\w+')
+
+
+def normalize_arabic(text):
+    """توحيد النص العربي قبل الفهرسة أو البحث"""
+    text = _DIACRITICS.sub('', text).replace(_TATWEEL, '')
+    return text.translate(_CHAR_MAP).lower()
+
+
+def tokenize(text):
+    """تقسيم النص إلى كلمات موحدة"""
+    return _TOKEN.findall(normalize_arabic(text or ''))
+
+
+def index_terms(text):
+    """كلمات الفهرسة: الكلمات الموحدة وصورتها دون أداة التعريف (فيطابق البحث عن جلسه كلمة الجلسه)"""
+    terms = set()
+    for token in tokenize(text):
+        terms.add(token)
+        if token.startswith('ال') and len(token) > 3:
+            terms.add(token[2:])
+    return terms
+
+
+class SearchIndex:
+    """فهرس مقلوب لمحتوى الأخبار يدعم البحث بالبادئة والتصفية حسب الحالة"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = {}      # كلمة -> مجموعة معرّفات
+        self._doc_tokens = {}    # معرّف -> كلمات الخبر
+        self._statuses = {}      # معرّف -> الحالة
+        self._vocabulary = []    # الكلمات مرتبة للبحث بالبادئة
+        # يُعاد البناء عند أول استخدام أو بعد إعادة تحميل البيانات من القرص
+        self.stale = True
+        self.rebuilds = 0
+
+    def _add(self, item):
+        tokens = index_terms(item.get('content'))
+        self._doc_tokens[item['id']] = tokens
+        self._statuses[item['id']] = item.get('status')
+        for token in tokens:
+            ids = self._postings.get(token)
+            if ids is None:
+                ids = self._postings[token] = set()
+                insort(self._vocabulary, token)
+            ids.add(item['id'])
+
+    def _remove(self, news_id):
+        self._statuses.pop(news_id, None)
+        for token in self._doc_tokens.pop(news_id, ()):
+            ids = self._postings[token]
+            ids.discard(news_id)
+            if not ids:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def rebuild(self, items):
+        with self._lock:
+            self._postings = {}
+            self._doc_tokens = {}
+            self._statuses = {}
+            self._vocabulary = []
+            for item in items:
+                self._add(item)
+            self.stale = False
+            self.rebuilds += 1
+
+    def on_change(self, source, changes):
+        """مستمع تغييرات المخزن: تحديث تدريجي عند الحفظ، وإعادة بناء عند إعادة التحميل"""
+        if source != 'news':
+            return
+        with self._lock:
+            if changes is None:
+                self.stale = True
+                return
+            if self.stale:
+                return
+            for op, value in changes:
+                if op == 'put':
+                    self._remove(value['id'])
+                    self._add(value)
+                elif op == 'delete':
+                    self._remove(value)
+
+    def _matching(self, term, prefix):
+        if not prefix:
+            return self._postings.get(term, set())
+        ids = set()
+        pos = bisect_left(self._vocabulary, term)
+        while pos < len(self._vocabulary) and self._vocabulary[pos].startswith(term):
+            ids |= self._postings[self._vocabulary[pos]]
+            pos += 1
+        return ids
+
+    def search(self, query, status=None, prefix=True):
+        """معرّفات الأخبار التي تحتوي كل كلمات الاستعلام"""
+        terms = tokenize(query)
+        if not terms:
+            return set()
+        with self._lock:
+            ids = None
+            for term in terms:
+                matched = self._matching(term, prefix)
+                ids = matched.copy() if ids is None else ids & matched
+                if not ids:
+                    return set()
+            if status is not None:
+                ids = {news_id for news_id in ids if self._statuses.get(news_id) == status}
+            return ids
@@ -0,0 +1,768 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+محركات تخزين الأخبار لخدمة الشريط الإخباري
+News Storage Backends for the News Ticker Service
+
+كل محرك يوفر:
+    signature()              توقيع يتغير عند تغير البيانات على القرص
+    load()                   تحميل قائمة الأخبار كاملة
+    commit(news, changes)    حفظ التغييرات؛ changes قائمة من ('put', item) أو ('delete', id)
+    allocate_id(state)       حجز معرّف جديد من تسلسل محفوظ لا يتراجع
+    lock                     قفل استشاري يسلسل الكتابة بين العمليات
+
+المحركات التي تحمل live = True (مثل SQLite) تنفذ الاستعلامات get / count / list
+بنفسها بدلاً من تحميل كل الأخبار في الذاكرة.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+
+try:
+    import fcntl
+except ImportError:  # غير متوفر على Windows؛ يبقى القفل داخل العملية فقط
+    fcntl = None
+
+from metrics import REGISTRY, count_storage_bytes, observe_storage
+from news_model import json_default
+from news_schedule import is_visible, parse_time
+
+logger = logging.getLogger(__name__)
+
+# --- دوال مساعدة --- #
+
+def file_signature(file_path):
+    """توقيع الملف المستخدم لاكتشاف التغيير: (mtime, size, inode) أو None إن لم يوجد"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def sort_key(item):
+    """مفتاح الترتيب المستخدم في القوائم والمؤشرات: (created_at, id)"""
+    return (item.get('created_at') or '', item['id'])
+
+def load_data(file_path, default_data=None):
+    """تحميل البيانات من ملف JSON (يُقاس زمن القراءة من القرص وزمن التحليل كلٌّ على حدة)"""
+    if default_data is None:
+        default_data = []
+    try:
+        if os.path.exists(file_path):
+            started = time.perf_counter()
+            with open(file_path, 'rb') as f:
+                raw = f.read()
+            parsing = time.perf_counter()
+            observe_storage('load', file_path, 'io', parsing - started)
+            count_storage_bytes('load', file_path, len(raw))
+            data = json.loads(raw.decode('utf-8'))
+            observe_storage('load', file_path, 'json', time.perf_counter() - parsing)
+            return data
+        return default_data
+    except (IOError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        REGISTRY.inc('storage_errors_total', {'op': 'load', 'file': os.path.basename(file_path)})
+        logger.error(f"خطأ في تحميل الملف {file_path}: {e}")
+        return default_data
+
+def save_data(file_path, data):
+    """حفظ البيانات في ملف JSON (في ملف مؤقت ثم استبداله حتى لا يرى القراء ملفاً نصف مكتوب)"""
+    tmp_path = f'{file_path}.tmp.{os.getpid()}.{threading.get_ident()}'
+    try:
+        started = time.perf_counter()
+        raw = json.dumps(data, ensure_ascii=False, indent=2, default=json_default).encode('utf-8')
+        writing = time.perf_counter()
+        observe_storage('save', file_path, 'json', writing - started)
+        os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(raw)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, file_path)
+        observe_storage('save', file_path, 'io', time.perf_counter() - writing)
+        count_storage_bytes('save', file_path, len(raw))
+        return True
+    except IOError as e:
+        REGISTRY.inc('storage_errors_total', {'op': 'save', 'file': os.path.basename(file_path)})
+        logger.error(f"خطأ في حفظ الملف {file_path}: {e}")
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        return False
+
+
+class FileLock:
+    """قفل استشاري بين العمليات (flock) وقابل لإعادة الدخول داخل الخيط نفسه"""
+
+    def __init__(self, lock_file):
+        self.lock_file = lock_file
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    def acquire(self, blocking=True):
+        if not self._thread_lock.acquire(blocking):
+            return False
+        if self._depth == 0:
+            try:
+                os.makedirs(os.path.dirname(self.lock_file) or '.', exist_ok=True)
+                fd = os.open(self.lock_file, os.O_RDWR | os.O_CREAT, 0o644)
+            except OSError:
+                self._thread_lock.release()
+                raise
+            if fcntl is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+                except OSError:
+                    os.close(fd)
+                    self._thread_lock.release()
+                    if blocking:
+                        raise
+                    return False
+            self._fd = fd
+        self._depth += 1
+        return True
+
+    def release(self):
+        self._depth -= 1
+        if self._depth == 0:
+            fd, self._fd = self._fd, None
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+        self._thread_lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class IdSequence:
+    """تسلسل معرّفات محفوظ في ملف؛ لا يعيد استخدام معرّف حتى بعد الحذف"""
+
+    def __init__(self, seq_file):
+        self.seq_file = seq_file
+
+    def next(self, floor=0):
+        """حجز المعرّف التالي (يُستدعى تحت قفل الكتابة)"""
+        try:
+            with open(self.seq_file, 'r', encoding='utf-8') as f:
+                last_id = int(f.read().strip() or 0)
+        except (IOError, ValueError):
+            last_id = 0
+        next_id = max(last_id, floor) + 1
+        tmp_path = f'{self.seq_file}.tmp.{os.getpid()}'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(str(next_id))
+        os.replace(tmp_path, self.seq_file)
+        return next_id
+
+# --- المحركات --- #
+
+class JsonFileBackend:
+    """المحرك الافتراضي: ملف JSON واحد يعاد كتابته بالكامل عند كل حفظ"""
+
+    name = 'json'
+
+    def __init__(self, news_file):
+        self.news_file = news_file
+        self.lock = FileLock(f'{news_file}.lock')
+        self.sequence = IdSequence(f'{news_file}.seq')
+
+    def signature(self):
+        return file_signature(self.news_file)
+
+    def load(self):
+        return load_data(self.news_file)
+
+    def commit(self, news, changes):
+        return save_data(self.news_file, news)
+
+    def allocate_id(self, state):
+        return self.sequence.next(state.max_id())
+
+
+class JournalBackend:
+    """
+    محرك السجل الإلحاقي: لقطة JSON + ملف سجل يُلحق به سطر واحد لكل تغيير.
+    عند تجاوز حد الحجم أو عدد السجلات يُدمج السجل في لقطة جديدة في الخلفية.
+    """
+
+    name = 'journal'
+    # commit يكتب التغييرات وحدها ولا يحتاج قائمة الأخبار الكاملة
+    incremental = True
+
+    def __init__(self, news_file, max_bytes=1024 * 1024, max_records=1000):
+        self.news_file = news_file
+        self.journal_file = f'{news_file}.journal'
+        # السجل الذي يجري دمجه حالياً؛ يبقى مقروءاً حتى تُستبدل اللقطة
+        self.compacting_file = f'{news_file}.journal.compacting'
+        self.max_bytes = max_bytes
+        self.max_records = max_records
+        self.lock = FileLock(f'{news_file}.lock')
+        # قفل منفصل يضمن دمجاً واحداً فقط في كل مرة عبر جميع العمليات
+        self.compaction_lock = FileLock(f'{news_file}.compact.lock')
+        self.sequence = IdSequence(f'{news_file}.seq')
+        self._lock = threading.Lock()
+        self._records = 0
+        self._compactor = None
+        self.compactions = 0
+
+    def signature(self):
+        return (
+            file_signature(self.news_file),
+            file_signature(self.compacting_file),
+            file_signature(self.journal_file),
+        )
+
+    def _replay(self, by_id, journal_file):
+        """إعادة تطبيق سجل على الأخبار؛ يعيد عدد السجلات المقروءة"""
+        count = 0
+        try:
+            with open(journal_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # سطر مقطوع في نهاية السجل بسبب توقف مفاجئ
+                        logger.warning(f"تجاهل سجل تالف في {journal_file}")
+                        continue
+                    if record.get('op') == 'put':
+                        by_id[record['item']['id']] = record['item']
+                    elif record.get('op') == 'delete':
+                        by_id.pop(record['id'], None)
+                    count += 1
+        except FileNotFoundError:
+            pass
+        return count
+
+    def load(self):
+        by_id = {item['id']: item for item in load_data(self.news_file)}
+        self._replay(by_id, self.compacting_file)
+        records = self._replay(by_id, self.journal_file)
+        with self._lock:
+            self._records = records
+        return list(by_id.values())
+
+    def commit(self, news, changes):
+        lines = []
+        for op, value in changes:
+            record = {'op': 'put', 'item': value} if op == 'put' else {'op': 'delete', 'id': value}
+            lines.append(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=json_default))
+        payload = ('\n'.join(lines) + '\n').encode('utf-8')
+        try:
+            os.makedirs(os.path.dirname(self.journal_file) or '.', exist_ok=True)
+            with self.lock, self._lock:
+                fd = os.open(self.journal_file, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                try:
+                    os.write(fd, payload)
+                    size = os.fstat(fd).st_size
+                finally:
+                    os.close(fd)
+                self._records += len(lines)
+                records = self._records
+        except OSError as e:
+            logger.error(f"خطأ في الكتابة إلى السجل {self.journal_file}: {e}")
+            return False
+
+        if size >= self.max_bytes or records >= self.max_records:
+            self.schedule_compaction()
+        return True
+
+    def allocate_id(self, state):
+        return self.sequence.next(state.max_id())
+
+    # --- الدمج --- #
+
+    def schedule_compaction(self):
+        """بدء الدمج في خيط خلفي إن لم يكن هناك دمج جارٍ"""
+        with self._lock:
+            if self._compactor is not None and self._compactor.is_alive():
+                return
+            self._compactor = threading.Thread(target=self.compact, name='journal-compactor', daemon=True)
+            self._compactor.start()
+
+    def wait_for_compaction(self, timeout=None):
+        compactor = self._compactor
+        if compactor is not None:
+            compactor.join(timeout)
+
+    def compact(self):
+        """دمج السجل في لقطة جديدة دون إيقاف عمليات الكتابة"""
+        if not self.compaction_lock.acquire(blocking=False):
+            # عملية أخرى تدمج السجل حالياً
+            return False
+        try:
+            with self.lock, self._lock:
+                # إن وُجد دمج سابق لم يكتمل نستكمله أولاً قبل تدوير السجل من جديد
+                if not os.path.exists(self.compacting_file):
+                    if not os.path.exists(self.journal_file):
+                        return False
+                    # الكتابات اللاحقة تذهب إلى سجل جديد بينما ندمج السجل القديم
+                    os.replace(self.journal_file, self.compacting_file)
+                    self._records = 0
+
+            by_id = {item['id']: item for item in load_data(self.news_file)}
+            self._replay(by_id, self.compacting_file)
+            if not save_data(self.news_file, list(by_id.values())):
+                return False
+            try:
+                os.remove(self.compacting_file)
+            except OSError:
+                pass
+        finally:
+            self.compaction_lock.release()
+        self.compactions += 1
+        logger.info(f"تم دمج سجل الأخبار في {self.news_file}")
+        return True
+
+
+class SqliteBackend:
+    """
+    محرك SQLite: مفتاح أساسي على id وفهرس مركب على (status, created_at)،
+    فتصبح استعلامات الشريط والقوائم والأرشيف والبحث بالمعرّف بحثاً في الفهارس.
+    """
+
+    name = 'sqlite'
+    live = True
+
+    # الحقول المخزنة في أعمدة؛ بقية الحقول تُحفظ في عمود extra بصيغة JSON
+    COLUMNS = ('id', 'content', 'status', 'created_at', 'updated_at')
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS news (
+            id INTEGER PRIMARY KEY,
+            content TEXT NOT NULL,
+            status TEXT NOT NULL,
+            created_at TEXT NOT NULL DEFAULT '',
+            updated_at TEXT NOT NULL DEFAULT '',
+            extra TEXT
+        );
+        CREATE INDEX IF NOT EXISTS idx_news_status_created ON news (status, created_at);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    def __init__(self, news_file, db_file=None):
+        self.news_file = news_file
+        self.db_file = db_file or os.path.splitext(news_file)[0] + '.db'
+        self.lock = FileLock(f'{self.db_file}.lock')
+        self._local = threading.local()
+        self._init_db()
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, isolation_level=None, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _init_db(self):
+        os.makedirs(os.path.dirname(self.db_file) or '.', exist_ok=True)
+        conn = self._connection()
+        conn.executescript(self.SCHEMA)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            created = conn.execute("SELECT 1 FROM meta WHERE key = 'version'").fetchone() is None
+            if created:
+                conn.execute("INSERT INTO meta (key, value) VALUES ('version', 0)")
+                # ترحيل لمرة واحدة من ملف JSON الموجود عند إنشاء القاعدة
+                news = load_data(self.news_file)
+                self._write(conn, [('put', item) for item in news])
+                if news:
+                    logger.info(f"تم ترحيل {len(news)} خبر من {self.news_file} إلى {self.db_file}")
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def _row_to_item(self, row):
+        item = {key: row[key] for key in self.COLUMNS}
+        if row['extra']:
+            item.update(json.loads(row['extra']))
+        return item
+
+    def _write(self, conn, changes):
+        for op, value in changes:
+            if op == 'put':
+                extra = {key: v for key, v in value.items() if key not in self.COLUMNS}
+                conn.execute(
+                    'INSERT OR REPLACE INTO news (id, content, status, created_at, updated_at, extra) '
+                    'VALUES (?, ?, ?, ?, ?, ?)',
+                    (value['id'], value.get('content', ''), value.get('status', 'published'),
+                     value.get('created_at', ''), value.get('updated_at', ''),
+                     json.dumps(extra, ensure_ascii=False) if extra else None)
+                )
+            elif op == 'delete':
+                conn.execute('DELETE FROM news WHERE id = ?', (value,))
+        conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def signature(self):
+        # عداد يزداد داخل كل معاملة كتابة، فيلتقط تغييرات العمليات الأخرى أيضاً
+        return self._connection().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def load(self):
+        rows = self._connection().execute('SELECT * FROM news ORDER BY id')
+        return [self._row_to_item(row) for row in rows]
+
+    def commit(self, news, changes):
+        conn = self._connection()
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                self._write(conn, changes)
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            return True
+        except sqlite3.Error as e:
+            logger.error(f"خطأ في الكتابة إلى قاعدة البيانات {self.db_file}: {e}")
+            return False
+
+    def allocate_id(self, state):
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('last_id', 0)")
+            conn.execute(
+                "UPDATE meta SET value = MAX(value, (SELECT COALESCE(MAX(id), 0) FROM news)) + 1 "
+                "WHERE key = 'last_id'"
+            )
+            next_id = conn.execute("SELECT value FROM meta WHERE key = 'last_id'").fetchone()[0]
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return next_id
+
+    # --- الاستعلامات --- #
+
+    def get(self, news_id):
+        row = self._connection().execute('SELECT * FROM news WHERE id = ?', (news_id,)).fetchone()
+        return self._row_to_item(row) if row is not None else None
+
+    def count(self, status=None):
+        if status is None:
+            return self._connection().execute('SELECT COUNT(*) FROM news').fetchone()[0]
+        return self._connection().execute('SELECT COUNT(*) FROM news WHERE status = ?', (status,)).fetchone()[0]
+
+    def max_id(self):
+        return self._connection().execute('SELECT COALESCE(MAX(id), 0) FROM news').fetchone()[0]
+
+    def iter_items(self):
+        """المرور على كل الأخبار دون تحميلها دفعة واحدة"""
+        for row in self._connection().execute('SELECT * FROM news ORDER BY id'):
+            yield self._row_to_item(row)
+
+    def page(self, status=None, exclude_status=None, limit=None, after=None):
+        """صفحة مرتبة من الأحدث بعد المفتاح after؛ تعيد (العناصر، مفتاح الصفحة التالية)"""
+        sql = 'SELECT * FROM news'
+        conditions = []
+        params = []
+        if status is not None:
+            conditions.append('status = ?')
+            params.append(status)
+        elif exclude_status is not None:
+            conditions.append('status != ?')
+            params.append(exclude_status)
+        if after is not None:
+            conditions.append('(created_at, id) < (?, ?)')
+            params.extend(after)
+        if conditions:
+            sql += ' WHERE ' + ' AND '.join(conditions)
+        sql += ' ORDER BY created_at DESC, id DESC'
+        if limit is not None:
+            # صف إضافي لمعرفة وجود صفحة تالية
+            sql += ' LIMIT ?'
+            params.append(limit + 1)
+        news = [self._row_to_item(row) for row in self._connection().execute(sql, params)]
+        if limit is not None and len(news) > limit:
+            news = news[:limit]
+            return news, (news[-1]['created_at'], news[-1]['id'])
+        return news, None
+
+    def list(self, status=None, exclude_status=None, limit=None):
+        """الأخبار مرتبة من الأحدث، مع تصفية حسب الحالة"""
+        return self.page(status, exclude_status, limit)[0]
+
+    def status_counts(self):
+        return Counter(dict(self._connection().execute('SELECT status, COUNT(*) FROM news GROUP BY status')))
+
+    def channels(self):
+        """القنوات المستخدمة مع عدد أخبار كل منها"""
+        return Counter(dict(self._connection().execute(
+            "SELECT value, COUNT(*) FROM news, json_each(news.extra, '$.channels') GROUP BY value")))
+
+    def oldest(self, status, limit, offset=0):
+        """أقدم الأخبار بالحالة المطلوبة مرتبة من الأقدم"""
+        rows = self._connection().execute(
+            'SELECT * FROM news WHERE status = ? ORDER BY created_at, id LIMIT ? OFFSET ?', (status, limit, offset))
+        return [self._row_to_item(row) for row in rows]
+
+    def next_transition(self, now):
+        """أقرب publish_at أو expire_at بعد now لخبر منشور (الأوقات نصوص ISO محلية فتُقارن كنصوص)"""
+        row = self._connection().execute(
+            "SELECT MIN(t) FROM ("
+            "SELECT json_extract(extra, '$.publish_at') AS t FROM news WHERE status = 'published' AND extra IS NOT NULL "
+            "UNION ALL "
+            "SELECT json_extract(extra, '$.expire_at') FROM news WHERE status = 'published' AND extra IS NOT NULL"
+            ") WHERE t > ?",
+            (now.isoformat(),)
+        ).fetchone()
+        return parse_time(row[0])
+
+    def visible(self, now, limit=None, channel=None):
+        """الأخبار المنشورة الظاهرة في اللحظة now مرتبة من الأحدث (عبر فهرس الحالة والتاريخ)"""
+        news = []
+        sql = "SELECT * FROM news WHERE status = 'published'"
+        params = []
+        if channel is not None:
+            sql += " AND EXISTS (SELECT 1 FROM json_each(news.extra, '$.channels') WHERE value = ?)"
+            params.append(channel)
+        rows = self._connection().execute(sql + ' ORDER BY created_at DESC, id DESC', params)
+        for row in rows:
+            item = self._row_to_item(row)
+            if is_visible(item, now):
+                news.append(item)
+                if limit is not None and len(news) >= limit:
+                    break
+        return news
+
+def archive_month(item):
+    """شهر القطعة التي يُحفظ فيها الخبر المؤرشف: YYYY-MM من created_at"""
+    created_at = item.get('created_at') or ''
+    return created_at[:7] if len(created_at) >= 7 else '0000-00'
+
+
+class ArchiveSegments:
+    """
+    الأخبار المؤرشفة مقسمة إلى ملف لكل شهر (YYYY-MM.json) مع فهرس صغير (manifest.json)
+    يحمل لكل قطعة عدد أخبارها ونطاق معرّفاتها. القطع تُحمّل عند الحاجة فقط ويُحتفظ بأحدثها استخداماً.
+    """
+
+    def __init__(self, directory, cache_size=12):
+        self.directory = directory
+        self.manifest_file = os.path.join(directory, 'manifest.json')
+        self.cache_size = cache_size
+        self._lock = threading.RLock()
+        self._manifest = None
+        # الشهر -> (توقيع الملف، المفاتيح، العناصر مرتبة تصاعدياً، فهرس المعرّفات)
+        self._segments = OrderedDict()
+        self.segment_loads = 0
+
+    def segment_file(self, month):
+        return os.path.join(self.directory, f'{month}.json')
+
+    def manifest(self):
+        """الشهر -> {'count', 'min_id', 'max_id'} (لا يجوز تعديله)"""
+        signature = file_signature(self.manifest_file)
+        with self._lock:
+            if self._manifest is None or self._manifest[0] != signature:
+                data = load_data(self.manifest_file, {}) if signature is not None else {}
+                self._manifest = (signature, data.get('segments', {}))
+            return self._manifest[1]
+
+    def _cache_segment(self, month, items):
+        keys = [sort_key(item) for item in items]
+        entry = (file_signature(self.segment_file(month)), keys, items, {item['id']: item for item in items})
+        with self._lock:
+            self._segments[month] = entry
+            self._segments.move_to_end(month)
+            while len(self._segments) > self.cache_size:
+                self._segments.popitem(last=False)
+        return entry
+
+    def _segment(self, month):
+        signature = file_signature(self.segment_file(month))
+        with self._lock:
+            cached = self._segments.get(month)
+            if cached is not None and cached[0] == signature:
+                self._segments.move_to_end(month)
+                return cached
+        items = sorted(load_data(self.segment_file(month)), key=sort_key) if signature is not None else []
+        self.segment_loads += 1
+        return self._cache_segment(month, items)
+
+    def _months(self):
+        """الأشهر غير الفارغة من الأحدث"""
+        return sorted((month for month, info in self.manifest().items() if info.get('count')), reverse=True)
+
+    def locate(self, news_id):
+        """الشهر الذي يحوي الخبر أو None؛ لا تُحمّل إلا القطع التي يشمل نطاقها المعرّف"""
+        for month, info in self.manifest().items():
+            if info['min_id'] <= news_id <= info['max_id'] and news_id in self._segment(month)[3]:
+                return month
+        return None
+
+    def get(self, news_id):
+        month = self.locate(news_id)
+        return self._segment(month)[3][news_id] if month is not None else None
+
+    def count(self):
+        return sum(info.get('count', 0) for info in self.manifest().values())
+
+    def max_id(self):
+        return max((info['max_id'] for info in self.manifest().values()), default=0)
+
+    def iter_items(self):
+        for month in self._months():
+            yield from reversed(self._segment(month)[2])
+
+    def page(self, limit=None, after=None):
+        """صفحة من الأحدث بعد المفتاح after؛ تُحمّل فقط القطع التي تقع فيها الصفحة"""
+        months = self._months()
+        if after is not None:
+            after = tuple(after)
+            months = [month for month in months if month <= archive_month({'created_at': after[0]})]
+        news = []
+        for position, month in enumerate(months):
+            _, keys, items, _ = self._segment(month)
+            end = len(keys) if after is None else bisect_left(keys, after)
+            start = 0 if limit is None else max(0, end - (limit - len(news)))
+            news.extend(items[start:end][::-1])
+            if limit is not None and len(news) >= limit:
+                more = start > 0 or position + 1 < len(months)
+                return news, (keys[start] if more else None)
+        return news, None
+
+    def apply(self, puts, removals):
+        """
+        إضافة أو تحديث puts وإزالة المعرّفات removals؛ تُكتب القطع المتأثرة ثم الفهرس.
+        يعيد False إذا فشلت الكتابة.
+        """
+        with self._lock:
+            manifest = dict(self.manifest())
+            touched = {}
+
+            def segment_items(month):
+                if month not in touched:
+                    touched[month] = dict(self._segment(month)[3])
+                return touched[month]
+
+            for news_id in removals:
+                month = self.locate(news_id)
+                if month is not None:
+                    segment_items(month).pop(news_id, None)
+            for item in puts:
+                segment_items(archive_month(item))[item['id']] = item
+
+            for month, by_id in touched.items():
+                items = sorted(by_id.values(), key=sort_key)
+                if items:
+                    if not save_data(self.segment_file(month), items):
+                        return False
+                    manifest[month] = {'count': len(items), 'min_id': min(by_id), 'max_id': max(by_id)}
+                else:
+                    manifest.pop(month, None)
+                    try:
+                        os.remove(self.segment_file(month))
+                    except OSError:
+                        pass
+                self._cache_segment(month, items)
+            if not touched:
+                return True
+            # الفهرس يُكتب أخيراً: القارئ لا يرى قطعة في الفهرس قبل اكتمال كتابتها
+            if not save_data(self.manifest_file, {'segments': dict(sorted(manifest.items()))}):
+                return False
+            self._manifest = None
+            return True
+
+
+class TieredBackend:
+    """
+    التخزين المتدرج: الأخبار النشطة (المنشورة والمسودات) في ملف JSON صغير يُحمّل في الذاكرة،
+    والمؤرشفة في قطع شهرية (ArchiveSegments) لا تُقرأ إلا عند طلبها.
+    فلا يتأثر زمن الشريط ولا الذاكرة بحجم الأرشيف.
+    """
+
+    name = 'tiered'
+    tiered = True
+
+    def __init__(self, news_file, archive_dir=None, segment_cache=12):
+        self.news_file = news_file
+        self.archive = ArchiveSegments(archive_dir or os.path.splitext(news_file)[0] + '.archive', segment_cache)
+        self.lock = FileLock(f'{news_file}.lock')
+        self.sequence = IdSequence(f'{news_file}.seq')
+        # معرّفات الأخبار النشطة كما حُمّلت أو حُفظت آخر مرة (ما عداها قد يكون في الأرشيف)
+        self._hot_ids = set()
+
+    def signature(self):
+        return (file_signature(self.news_file), file_signature(self.archive.manifest_file))
+
+    def load(self):
+        """الأخبار النشطة فقط؛ الأخبار المؤرشفة في الملف (مثلاً عند التحويل من محرك json) تُنقل إلى القطع"""
+        news = load_data(self.news_file)
+        if any(item.get('status') == 'archived' for item in news):
+            with self.lock:
+                news = load_data(self.news_file)
+                archived = [item for item in news if item.get('status') == 'archived']
+                if archived and self.archive.apply(archived, ()):
+                    news = [item for item in news if item.get('status') != 'archived']
+                    save_data(self.news_file, news)
+                    logger.info(f"تم نقل {len(archived)} خبر مؤرشف من {self.news_file} إلى {self.archive.directory}")
+        self._hot_ids = {item['id'] for item in news}
+        return news
+
+    def commit(self, news, changes):
+        """
+        news: الأخبار النشطة بعد التغيير. الترتيب: إضافات الأرشيف ثم الملف النشط ثم الإزالة من الأرشيف،
+        فانقطاع الكتابة في المنتصف قد يترك خبراً مكرراً في الطبقتين لكنه لا يفقده.
+        """
+        archived = {}
+        removals = set()
+        hot_changed = False
+        for op, value in changes:
+            news_id = value['id'] if op == 'put' else value
+            is_archived = op == 'put' and value.get('status') == 'archived'
+            if news_id in self._hot_ids or (op == 'put' and not is_archived):
+                hot_changed = True
+            if news_id not in self._hot_ids:
+                # خبر مؤرشف (أو جديد) يتغير: يُزال من قطعته الحالية إن وجد
+                removals.add(news_id)
+            if is_archived:
+                archived[news_id] = value
+            else:
+                archived.pop(news_id, None)
+
+        moved = removals & set(archived)
+        if archived and not self.archive.apply(list(archived.values()), moved):
+            return False
+        if hot_changed and not save_data(self.news_file, news):
+            return False
+        if removals - moved and not self.archive.apply((), removals - moved):
+            return False
+        self._hot_ids = {item['id'] for item in news}
+        return True
+
+    def allocate_id(self, state):
+        return self.sequence.next(state.max_id())
+
+BACKENDS = {
+    JsonFileBackend.name: JsonFileBackend,
+    JournalBackend.name: JournalBackend,
+    SqliteBackend.name: SqliteBackend,
+    TieredBackend.name: TieredBackend,
+}
+
+def create_backend(kind, news_file, **options):
+    """إنشاء محرك التخزين المطلوب حسب الاسم"""
+    try:
+        backend_class = BACKENDS[kind]
+    except KeyError:
+        raise ValueError(f"محرك تخزين غير معروف: {kind}")
+    return backend_class(news_file, **options)
@@ -6,7 +6,19 @@ import json
 import os
 import tempfile
 import shutil
-from app import app
+import gzip
+import multiprocessing
+import time
+from datetime import datetime, timedelta
+from app import app, get_store
+
+def _add_news_worker(news_file, settings_file, count):
+    """عامل مستقل يضيف أخباراً على نفس الملفات (يحاكي عمال gunicorn)"""
+    app.config['NEWS_FILE'] = news_file
+    app.config['SETTINGS_FILE'] = settings_file
+    client = app.test_client()
+    for i in range(count):
+        client.post('/api/news', data=json.dumps({'content': f'خبر {i}'}), content_type='application/json')
 
 class NewsServiceTestCase(unittest.TestCase):
     """مجموعة اختبارات لخدمة الشريط الإخباري"""
@@ -163,6 +175,276 @@ class NewsServiceTestCase(unittest.TestCase):
         get_response = self.app.get('/api/news')
         get_data = json.loads(get_response.data)
         self.assertEqual(get_data['count'], 0)
+    def test_09_store_cache_hits(self):
+        """اختبار أن القراءات المتكررة تُخدم من الذاكرة دون إعادة تحليل الملف"""
+        self.app.post('/api/news', data=json.dumps({'content': 'خبر مخزن'}), content_type='application/json')
+        store = get_store()
+        reloads_before = store.stats()['reloads']
+        hits_before = store.stats()['hits']
+
+        for _ in range(3):
+            self.app.get('/api/ticker')
+
+        stats = store.stats()
+        self.assertEqual(stats['reloads'], reloads_before)
+        self.assertEqual(stats['hits'], hits_before + 3)
+
+    def test_10_store_detects_external_writes(self):
+        """اختبار إعادة التحميل عند تعديل الملف من عامل آخر"""
+        self.app.post('/api/news', data=json.dumps({'content': 'خبر أول'}), content_type='application/json')
+        self.app.get('/api/news')
+
+        news_file = app.config['NEWS_FILE']
+        with open(news_file, 'r', encoding='utf-8') as f:
+            news = json.load(f)
+        news.append(dict(news[0], id=2, content='خبر من عامل آخر'))
+        with open(news_file, 'w', encoding='utf-8') as f:
+            json.dump(news, f, ensure_ascii=False)
+
+        response = self.app.get('/api/news')
+        data = json.loads(response.data)
+        self.assertEqual(data['count'], 2)
+        self.assertGreaterEqual(get_store().stats()['reloads'], 1)
+    def test_11_ticker_etag_not_modified(self):
+        """اختبار إرجاع 304 عند تطابق ETag للشريط وتغيره بعد الكتابة"""
+        self.app.post('/api/news', data=json.dumps({'content': 'خبر للشريط'}), content_type='application/json')
+
+        first = self.app.get('/api/ticker')
+        etag = first.headers['ETag']
+        self.assertIsNotNone(first.headers.get('Last-Modified'))
+
+        cached = self.app.get('/api/ticker', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+
+        self.app.post('/api/news', data=json.dumps({'content': 'خبر جديد'}), content_type='application/json')
+        changed = self.app.get('/api/ticker', headers={'If-None-Match': etag})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed.headers['ETag'], etag)
+        self.assertEqual(json.loads(changed.data)['count'], 2)
+    def test_12_ids_are_not_reused_after_delete(self):
+        """اختبار عدم تكرار المعرّفات بعد الحذف"""
+        ids = []
+        for content in ('أ', 'ب'):
+            response = self.app.post('/api/news', data=json.dumps({'content': content}), content_type='application/json')
+            ids.append(json.loads(response.data)['data']['id'])
+        self.app.delete(f'/api/news/{ids[0]}')
+
+        response = self.app.post('/api/news', data=json.dumps({'content': 'ج'}), content_type='application/json')
+        new_id = json.loads(response.data)['data']['id']
+        self.assertNotIn(new_id, ids)
+
+    def test_13_concurrent_writes_from_several_processes(self):
+        """اختبار عدم فقدان التحديثات عند الكتابة المتوازية من عدة عمليات"""
+        context = multiprocessing.get_context('fork')
+        workers = [
+            context.Process(target=_add_news_worker,
+                            args=(app.config['NEWS_FILE'], app.config['SETTINGS_FILE'], 10))
+            for _ in range(4)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        with open(app.config['NEWS_FILE'], 'r', encoding='utf-8') as f:
+            news = json.load(f)
+        self.assertEqual(len(news), 40)
+        self.assertEqual(len({item['id'] for item in news}), 40)
+    def test_14_cursor_pagination(self):
+        """اختبار تقسيم الأخبار إلى صفحات باستخدام المؤشر"""
+        ids = []
+        for i in range(5):
+            response = self.app.post('/api/news', data=json.dumps({'content': f'خبر {i}'}), content_type='application/json')
+            ids.append(json.loads(response.data)['data']['id'])
+        self.app.put(f'/api/news/{ids[2]}/archive')
+
+        seen = []
+        url = '/api/news?limit=2'
+        while url:
+            data = json.loads(self.app.get(url).data)
+            self.assertLessEqual(data['count'], 2)
+            seen.extend(item['id'] for item in data['data'])
+            url = f"/api/news?limit=2&cursor={data['next_cursor']}" if data['next_cursor'] else None
+
+        self.assertEqual(seen, [ids[4], ids[3], ids[1], ids[0]])
+
+        archived = json.loads(self.app.get('/api/news/archived?limit=1').data)
+        self.assertEqual([item['id'] for item in archived['data']], [ids[2]])
+        self.assertIsNone(archived['next_cursor'])
+
+    def test_15_invalid_page_args(self):
+        """اختبار رفض المؤشر أو الحد غير الصالح"""
+        self.assertEqual(self.app.get('/api/news?cursor=not-a-cursor').status_code, 400)
+        self.assertEqual(self.app.get('/api/news/archived?limit=0').status_code, 400)
+    def test_16_ticker_stream_pushes_snapshot_then_diff(self):
+        """اختبار بث الشريط: لقطة أولى ثم فرق عند إضافة خبر منشور"""
+        app.config['TICKER_STREAM_HEARTBEAT'] = 0.1
+        try:
+            self.app.post('/api/news', data=json.dumps({'content': 'خبر أول'}), content_type='application/json')
+            response = self.app.get('/api/ticker/stream', buffered=False)
+            self.assertEqual(response.mimetype, 'text/event-stream')
+            events = iter(response.response)
+            next(events)  # retry
+
+            first = next(events).decode('utf-8')
+            self.assertIn('event: snapshot', first)
+            etag = first.split('\n')[0][len('id: '):]
+
+            self.app.post('/api/news', data=json.dumps({'content': 'خبر ثان'}), content_type='application/json')
+            second = next(events).decode('utf-8')
+            self.assertIn('event: diff', second)
+            diff = json.loads(second.split('data: ', 1)[1])
+            self.assertEqual(len(diff['upserted']), 1)
+            self.assertEqual(diff['upserted'][0]['content'], 'خبر ثان')
+            response.close()
+
+            # الاستئناف بآخر معرّف معروف لا يعيد إرسال اللقطة
+            current = self.app.get('/api/ticker').headers['ETag'].strip('"')
+            self.assertNotEqual(current, etag)
+            resumed = self.app.get('/api/ticker/stream', headers={'Last-Event-ID': current}, buffered=False)
+            events = iter(resumed.response)
+            next(events)  # retry
+            self.assertEqual(next(events), b': heartbeat\n\n')
+            resumed.close()
+        finally:
+            del app.config['TICKER_STREAM_HEARTBEAT']
+    def test_17_batch_operations_single_save(self):
+        """اختبار تنفيذ عدة عمليات بحفظ واحد مع نتيجة لكل عملية"""
+        post_response = self.app.post('/api/news', data=json.dumps({'content': 'خبر قديم'}), content_type='application/json')
+        old_id = json.loads(post_response.data)['data']['id']
+        version_before = get_store().stats()['version']
+
+        response = self.app.post('/api/news/batch', data=json.dumps({'operations': [
+            {'op': 'create', 'content': 'إعلان 1'},
+            {'op': 'create', 'content': 'إعلان 2', 'status': 'draft'},
+            {'op': 'archive', 'id': old_id},
+            {'op': 'delete', 'id': 9999},
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertFalse(data['success'])
+        self.assertEqual(data['applied'], 3)
+        self.assertEqual([r['success'] for r in data['results']], [True, True, True, False])
+        self.assertEqual(get_store().stats()['version'], version_before + 1)
+
+        archived = json.loads(self.app.get('/api/news/archived').data)
+        self.assertEqual([item['id'] for item in archived['data']], [old_id])
+        self.assertEqual(json.loads(self.app.get('/api/news').data)['count'], 2)
+
+    def test_18_batch_atomic_mode(self):
+        """اختبار وضع الكل أو لا شيء في العمليات المجمعة"""
+        response = self.app.post('/api/news/batch', data=json.dumps({'atomic': True, 'operations': [
+            {'op': 'create', 'content': 'إعلان'},
+            {'op': 'update', 'id': 9999, 'content': 'غير موجود'},
+        ]}), content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        data = json.loads(response.data)
+        self.assertEqual(data['applied'], 0)
+        self.assertEqual(data['results'][1]['error'], 'الخبر غير موجود')
+        self.assertEqual(json.loads(self.app.get('/api/news').data)['count'], 0)
+    def test_19_search_news(self):
+        """اختبار البحث في الأخبار وتحديث الفهرس مع التعديلات"""
+        self.app.post('/api/news', data=json.dumps({'content': 'انعقاد الجَلسة العامة'}), content_type='application/json')
+        post_response = self.app.post('/api/news', data=json.dumps({'content': 'تأجيل جلسة الاستماع'}), content_type='application/json')
+        news_id = json.loads(post_response.data)['data']['id']
+
+        data = json.loads(self.app.get('/api/news/search?q=جلسه').data)
+        self.assertEqual(data['count'], 2)
+
+        self.app.put(f'/api/news/{news_id}/archive')
+        data = json.loads(self.app.get('/api/news/search?q=جلس&status=archived').data)
+        self.assertEqual([item['id'] for item in data['data']], [news_id])
+
+        self.app.delete(f'/api/news/{news_id}')
+        data = json.loads(self.app.get('/api/news/search?q=تأجيل').data)
+        self.assertEqual(data['count'], 0)
+
+        self.assertEqual(self.app.get('/api/news/search').status_code, 400)
+    def test_20_compressed_cached_variants(self):
+        """اختبار ضغط حمولات الشريط والألوان والصفحة الأولى وتخزين النسخة المضغوطة"""
+        for i in range(5):
+            self.app.post('/api/news', data=json.dumps({'content': f'خبر طويل نسبياً رقم {i} عن جلسات المجلس'}),
+                          content_type='application/json')
+
+        plain = self.app.get('/api/ticker')
+        self.assertIsNone(plain.headers.get('Content-Encoding'))
+
+        for url in ('/api/ticker', '/api/news'):
+            response = self.app.get(url, headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            self.assertIn('Accept-Encoding', response.headers['Vary'])
+            payload = json.loads(gzip.decompress(response.data))
+            self.assertEqual(payload['count'], 5)
+
+        gzipped = self.app.get('/api/ticker', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotEqual(gzipped.headers['ETag'], plain.headers['ETag'])
+        not_modified = self.app.get('/api/ticker', headers={'Accept-Encoding': 'gzip',
+                                                            'If-None-Match': gzipped.headers['ETag']})
+        self.assertEqual(not_modified.status_code, 304)
+
+        from app import build_ticker_snapshot
+        snapshot = get_store().news_view('ticker', build_ticker_snapshot)
+        self.assertIs(snapshot.encoded('gzip'), snapshot.encoded('gzip'))
+
+        colors = self.app.get('/api/settings/colors', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(colors.status_code, 200)
+        self.assertIn('orange', json.loads(colors.data)['data'])
+
+    def test_21_scheduled_publish_and_expire(self):
+        """اختبار ظهور الخبر المجدول واختفاء المنتهي عند الموعد بالضبط"""
+        boundary = datetime.now() + timedelta(seconds=0.5)
+        self.app.post('/api/news', data=json.dumps({'content': 'دائم'}), content_type='application/json')
+        self.app.post('/api/news', data=json.dumps({'content': 'ينتهي', 'expire_at': boundary.isoformat()}),
+                      content_type='application/json')
+        scheduled = json.loads(self.app.post('/api/news', data=json.dumps({'content': 'مجدول', 'publish_at': boundary.isoformat()}),
+                                             content_type='application/json').data)['data']
+        self.assertEqual(scheduled['publish_at'], boundary.isoformat())
+
+        before = self.app.get('/api/ticker')
+        self.assertEqual([item['content'] for item in json.loads(before.data)['data']], ['ينتهي', 'دائم'])
+        # الحمولة المحضرة تبقى صالحة قبل الموعد
+        self.assertEqual(self.app.get('/api/ticker').headers['ETag'], before.headers['ETag'])
+
+        time.sleep(max(0, (boundary - datetime.now()).total_seconds()))
+        after = self.app.get('/api/ticker')
+        self.assertEqual([item['content'] for item in json.loads(after.data)['data']], ['مجدول', 'دائم'])
+        self.assertNotEqual(after.headers['ETag'], before.headers['ETag'])
+
+        # إلغاء الموعد بقيمة null، ورفض المواعيد غير الصالحة
+        response = self.app.put(f"/api/news/{scheduled['id']}", data=json.dumps({'publish_at': None}),
+                                content_type='application/json')
+        self.assertNotIn('publish_at', json.loads(response.data)['data'])
+        for body in ({'content': 'خطأ', 'publish_at': 'غداً'},
+                     {'content': 'خطأ', 'publish_at': '2030-01-02T00:00:00', 'expire_at': '2030-01-01T00:00:00'}):
+            response = self.app.post('/api/news', data=json.dumps(body), content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_22_channel_tickers(self):
+        """اختبار شريط مستقل لكل قناة مع حمولة مخزنة لكل منها"""
+        app.config['TICKER_SIZE'] = 2
+        try:
+            for n, channels in enumerate((['cairo'], ['cairo', 'candidates'], [], ['cairo'])):
+                self.app.post('/api/news', data=json.dumps({'content': f'خبر {n}', 'channels': channels}),
+                              content_type='application/json')
+            cairo = self.app.get('/api/ticker?channel=cairo')
+            self.assertEqual([item['content'] for item in json.loads(cairo.data)['data']], ['خبر 3', 'خبر 1'])
+            self.assertEqual(json.loads(self.app.get('/api/ticker?channel=candidates').data)['data'][0]['channels'],
+                             ['cairo', 'candidates'])
+            self.assertEqual(json.loads(self.app.get('/api/ticker?channel=unknown').data)['count'], 0)
+            self.assertEqual(json.loads(self.app.get('/api/ticker').data)['count'], 2)
+            # الحمولة المخزنة للقناة لا تُعاد بناؤها دون تغيير
+            self.assertEqual(self.app.get('/api/ticker?channel=cairo').headers['ETag'], cairo.headers['ETag'])
+
+            # إزالة الخبر من القناة بقائمة فارغة، ورفض القنوات غير الصالحة
+            self.app.put('/api/news/4', data=json.dumps({'channels': []}), content_type='application/json')
+            cairo = json.loads(self.app.get('/api/ticker?channel=cairo').data)
+            self.assertEqual([item['content'] for item in cairo['data']], ['خبر 1', 'خبر 0'])
+            response = self.app.post('/api/news', data=json.dumps({'content': 'خطأ', 'channels': 'cairo'}),
+                                     content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+        finally:
+            app.config.pop('TICKER_SIZE', None)
 
 if __name__ == '__main__':
     unittest.main()
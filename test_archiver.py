@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+from datetime import datetime, timedelta
+from app import app, apply_news_status
+from archiver import AgingArchiver
+from news_store import NewsStore
+from storage import create_backend, load_data, save_data
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+def make_item(news_id, days_old, status='published', **extra):
+    created_at = (NOW - timedelta(days=days_old)).isoformat()
+    return dict({'id': news_id, 'content': f'خبر {news_id}', 'status': status,
+                 'created_at': created_at, 'updated_at': created_at}, **extra)
+
+class AgingArchiverTestCase(unittest.TestCase):
+    """مجموعة اختبارات للأرشفة التلقائية"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        self.news_file = os.path.join(self.test_dir, 'news.json')
+        self.settings_file = os.path.join(self.test_dir, 'settings.json')
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        for key in ('NEWS_FILE', 'SETTINGS_FILE', 'ARCHIVE_KEEP_NEWEST', 'ARCHIVE_AUTOSTART'):
+            app.config.pop(key, None)
+
+    def make_store(self, news):
+        save_data(self.news_file, news)
+        store = NewsStore(create_backend('json', self.news_file), self.settings_file,
+                          loader=load_data, saver=save_data)
+        self.commits = 0
+        original = store.backend.commit
+
+        def counting_commit(items, changes):
+            self.commits += 1
+            return original(items, changes)
+
+        store.backend.commit = counting_commit
+        return store
+
+    def test_01_max_age_in_bounded_batches(self):
+        """اختبار أرشفة الأقدم من N يوماً على دفعات بحفظ واحد لكل دفعة"""
+        news = [make_item(n, days_old=40 + n) for n in range(1, 6)]
+        news += [make_item(6, days_old=5), make_item(7, days_old=90, status='draft'),
+                 make_item(8, days_old=60, publish_at=(NOW + timedelta(days=1)).isoformat())]
+        store = self.make_store(news)
+
+        report = AgingArchiver(store, apply_news_status, max_age_days=30, batch_size=2).run(now=NOW)
+        self.assertEqual(report['moved'], 5)
+        self.assertEqual(report['batches'], 3)
+        self.assertEqual(self.commits, 3)
+        self.assertIn('duration_seconds', report)
+
+        statuses = {item['id']: item['status'] for item in load_data(self.news_file)}
+        self.assertEqual([news_id for news_id, status in sorted(statuses.items()) if status == 'archived'],
+                         [1, 2, 3, 4, 5])
+        # الخبر الحديث والمسودة والخبر المجدول لا تُؤرشف
+        self.assertEqual((statuses[6], statuses[7], statuses[8]), ('published', 'draft', 'published'))
+
+        # تشغيل ثانٍ لا يجد ما ينقله ولا يحفظ شيئاً
+        self.assertEqual(AgingArchiver(store, apply_news_status, max_age_days=30).run(now=NOW)['moved'], 0)
+        self.assertEqual(self.commits, 3)
+
+    def test_02_keep_newest_via_endpoint(self):
+        """اختبار سياسة الإبقاء على أحدث K خبر عبر نقطة التشغيل اليدوي"""
+        save_data(self.news_file, [make_item(n, days_old=10 - n) for n in range(1, 6)])
+        app.config['NEWS_FILE'] = self.news_file
+        app.config['SETTINGS_FILE'] = self.settings_file
+        app.config['ARCHIVE_AUTOSTART'] = False
+        client = app.test_client()
+        self.assertEqual(client.post('/api/archiver/run').status_code, 400)
+
+        app.config['ARCHIVE_KEEP_NEWEST'] = 2
+        response = client.post('/api/archiver/run')
+        self.assertEqual(json.loads(response.data)['data']['moved'], 3)
+        ticker = json.loads(client.get('/api/ticker').data)
+        self.assertEqual([item['id'] for item in ticker['data']], [5, 4])
+        self.assertEqual(json.loads(client.get('/health').data)['archiver']['moved'], 3)
+
+if __name__ == '__main__':
+    unittest.main()
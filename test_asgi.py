@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import shutil
+from app import app
+from asgi import app as asgi_app
+
+async def call(path, query='', headers=(), method='GET'):
+    """تنفيذ طلب واحد على تطبيق ASGI وإرجاع (الحالة، الترويسات، الجسم)"""
+    scope = {
+        'type': 'http', 'method': method, 'path': path,
+        'query_string': query.encode('latin-1'),
+        'headers': [(name.encode('latin-1'), value.encode('latin-1')) for name, value in headers],
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await asgi_app(scope, receive, send)
+    start = messages[0]
+    body = b''.join(message.get('body', b'') for message in messages[1:])
+    return start['status'], {k.decode(): v.decode() for k, v in start['headers']}, body
+
+class ASGIAppTestCase(unittest.TestCase):
+    """مجموعة اختبارات لنمط التشغيل غير المتزامن"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        app.config['NEWS_FILE'] = os.path.join(self.test_dir, 'news.json')
+        app.config['SETTINGS_FILE'] = os.path.join(self.test_dir, 'settings.json')
+        self.client = app.test_client()
+        for i in range(3):
+            self.client.post('/api/news', data=json.dumps({'content': f'خبر {i}'}), content_type='application/json')
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        for key in ('NEWS_FILE', 'SETTINGS_FILE'):
+            app.config.pop(key, None)
+
+    def test_01_same_json_contract_as_wsgi(self):
+        """اختبار تطابق الحمولات مع تطبيق Flask"""
+        for path, query in (('/api/ticker', ''), ('/api/news', ''), ('/api/news', 'limit=2'),
+                            ('/api/news/archived', ''), ('/api/settings/colors', '')):
+            status, headers, body = asyncio.run(call(path, query))
+            expected = self.client.get(f'{path}?{query}')
+            self.assertEqual(status, 200)
+            self.assertEqual(headers['content-type'], 'application/json')
+            self.assertEqual(json.loads(body), json.loads(expected.data))
+
+    def test_02_etag_and_errors(self):
+        """اختبار 304 عند تطابق ETag و 400 للمؤشر غير الصالح"""
+        status, headers, _ = asyncio.run(call('/api/ticker'))
+        self.assertEqual(headers['etag'], self.client.get('/api/ticker').headers['ETag'])
+        status, _, body = asyncio.run(call('/api/ticker', headers=[('if-none-match', headers['etag'])]))
+        self.assertEqual(status, 304)
+        self.assertEqual(body, b'')
+
+        status, _, body = asyncio.run(call('/api/news', 'cursor=@@@'))
+        self.assertEqual(status, 400)
+        self.assertFalse(json.loads(body)['success'])
+
+    def test_03_ticker_stream_until_disconnect(self):
+        """اختبار بث الشريط غير المتزامن وإنهائه عند انقطاع العميل"""
+        async def scenario():
+            chunks = []
+            disconnected = asyncio.Event()
+
+            async def receive():
+                await disconnected.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                body = message.get('body', b'').decode('utf-8')
+                chunks.append(body)
+                if body.startswith('id:') and 'event: snapshot' in body:
+                    await asyncio.to_thread(
+                        self.client.post, '/api/news',
+                        data=json.dumps({'content': 'عاجل'}), content_type='application/json')
+                elif 'event: diff' in body:
+                    disconnected.set()
+
+            scope = {'type': 'http', 'method': 'GET', 'path': '/api/ticker/stream', 'query_string': b'', 'headers': []}
+            await asyncio.wait_for(asgi_app(scope, receive, send), timeout=5)
+            return chunks
+
+        chunks = asyncio.run(scenario())
+        diff = next(chunk for chunk in chunks if 'event: diff' in chunk)
+        self.assertIn('عاجل', diff)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import json
+from app import app
+from benchmark import SCENARIOS, compare, generate_dataset, run_benchmarks, summarize
+
+class BenchmarkTestCase(unittest.TestCase):
+    """مجموعة اختبارات لأداة قياس الأداء"""
+
+    def tearDown(self):
+        """إعادة تعيين إعدادات التطبيق"""
+        for key in ('DATA_DIR', 'NEWS_BACKEND'):
+            app.config.pop(key, None)
+
+    def test_01_dataset_and_percentiles(self):
+        """اختبار ثبات البيانات الاصطناعية وحساب المئينات"""
+        self.assertEqual(generate_dataset(50, seed=3), generate_dataset(50, seed=3))
+        self.assertEqual(len({item['id'] for item in generate_dataset(50)}), 50)
+
+        stats = summarize([n / 1000 for n in range(1, 101)], elapsed=2.0)
+        self.assertAlmostEqual(stats['p50_ms'], 50)
+        self.assertAlmostEqual(stats['p95_ms'], 95)
+        self.assertAlmostEqual(stats['p99_ms'], 99)
+        self.assertEqual(stats['throughput_rps'], 50)
+
+    def test_02_report_covers_every_route(self):
+        """اختبار تغطية كل السيناريوهات وقابلية التقرير للتسلسل والمقارنة"""
+        report = run_benchmarks([20], iterations=2, micro_iterations=1, mixed=False)
+        report = json.loads(json.dumps(report))
+        names = {result['name'] for result in report['results']}
+        self.assertTrue({name for name, *_ in SCENARIOS} <= names)
+        self.assertTrue({'load_data', 'save_data'} <= names)
+
+        slower = json.loads(json.dumps(report))
+        for result in slower['results']:
+            result['p95_ms'] *= 2
+        self.assertEqual(compare(report, report), [])
+        self.assertEqual(len(compare(report, slower)), len(report['results']))
+
+if __name__ == '__main__':
+    unittest.main()
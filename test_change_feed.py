@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+from app import app
+from change_feed import ChangeLog
+
+class ChangeFeedTestCase(unittest.TestCase):
+    """مجموعة اختبارات لسجل التغييرات والمزامنة التفاضلية"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        app.config['NEWS_FILE'] = os.path.join(self.test_dir, 'news.json')
+        app.config['SETTINGS_FILE'] = os.path.join(self.test_dir, 'settings.json')
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        for key in ('NEWS_FILE', 'SETTINGS_FILE', 'CHANGE_LOG_MAX_ENTRIES'):
+            app.config.pop(key, None)
+
+    def changes(self, since):
+        response = self.client.get(f'/api/news/changes?since={since}')
+        self.assertEqual(response.status_code, 200)
+        return json.loads(response.data)
+
+    def test_01_mutations_bump_version_and_record_tombstones(self):
+        """اختبار تسجيل كل تغيير بإصدار متزايد مع شواهد الحذف والألوان"""
+        self.assertEqual(self.changes(0)['version'], 0)
+        self.assertEqual(self.client.get('/api/news/changes').status_code, 400)
+
+        first = json.loads(self.client.post('/api/news', json={'content': 'أول'}).data)['data']['id']
+        second = json.loads(self.client.post('/api/news', json={'content': 'ثان'}).data)['data']['id']
+        base = self.changes(0)['version']
+        self.assertEqual(base, 2)
+
+        self.client.put(f'/api/news/{first}', json={'content': 'محدث'})
+        self.client.put(f'/api/news/{first}/archive')
+        self.client.delete(f'/api/news/{second}')
+        self.client.put('/api/settings/colors', json={'orange': '#FF8800'})
+
+        feed = self.changes(base)
+        self.assertFalse(feed['resync'])
+        self.assertEqual(feed['version'], 6)
+        # لا يُعاد إلا آخر تغيير لكل خبر
+        self.assertEqual([(change['type'], change['op'], change.get('id')) for change in feed['changes']],
+                         [('news', 'put', first), ('news', 'delete', second), ('colors', 'put', None)])
+        self.assertEqual(feed['changes'][0]['item']['status'], 'archived')
+        self.assertEqual(feed['changes'][0]['item']['content'], 'محدث')
+        self.assertEqual(feed['changes'][2]['data']['orange'], '#FF8800')
+        self.assertEqual(self.changes(6)['changes'], [])
+
+        # إصدار أحدث من الحالي (سجل أعيد إنشاؤه) يطلب إعادة المزامنة
+        self.assertTrue(self.changes(99)['resync'])
+
+    def test_02_bounded_log_falls_back_to_resync(self):
+        """اختبار قص السجل وطلب إعادة المزامنة لمن تأخر عن أقدم تغيير محفوظ"""
+        log = ChangeLog(os.path.join(self.test_dir, 'changes'), max_entries=3)
+        for news_id in range(1, 8):
+            self.assertEqual(log.append([{'type': 'news', 'op': 'delete', 'id': news_id}]), news_id)
+        # القص عند بلوغ ضعف الحد: يبقى آخر 3 ثم يُلحق ما بعدها
+        self.assertEqual([record['version'] for record in ChangeLog(log.log_file).records()], [4, 5, 6, 7])
+
+        changes, version, resync = log.since(3)
+        self.assertEqual(([change['id'] for change in changes], version, resync), ([4, 5, 6, 7], 7, False))
+        self.assertEqual(log.since(2), ([], 7, True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+import time
+from app import app
+from invalidation import BUSES, FileBus, InvalidationBus, UnixSocketBus, connect_store, create_bus, register_bus
+from news_store import NewsStore
+from storage import create_backend, load_data, save_data
+
+def make_item(news_id):
+    return {'id': news_id, 'content': f'خبر {news_id}', 'status': 'published',
+            'created_at': f'2025-01-01T00:00:{news_id:02d}', 'updated_at': ''}
+
+class MemoryBus(InvalidationBus):
+    """محول بسيط في الذاكرة بدل وسيط حقيقي"""
+
+    def __init__(self, peers):
+        super().__init__()
+        self.peers = peers
+        peers.append(self)
+
+    def _send(self, payload):
+        for peer in self.peers:
+            peer._receive(payload)
+
+    def _listen(self):
+        self._closed.wait()
+
+class InvalidationBusTestCase(unittest.TestCase):
+    """مجموعة اختبارات لإبطال الذاكرة المؤقتة بين النسخ"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        self.news_file = os.path.join(self.test_dir, 'news.json')
+        save_data(self.news_file, [make_item(1)])
+        self.buses = []
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        for bus in self.buses:
+            bus.close(timeout=1)
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        for key in ('NEWS_FILE', 'SETTINGS_FILE', 'INVALIDATION_BUS'):
+            app.config.pop(key, None)
+        BUSES.pop('memory', None)
+
+    def make_node(self, bus):
+        """نسخة من الخدمة: مخزن خاص بها على نفس الملفات مربوط بالناقل"""
+        store = NewsStore(create_backend('json', self.news_file), os.path.join(self.test_dir, 'settings.json'),
+                          loader=load_data, saver=save_data)
+        self.buses.append(connect_store(store, bus, revalidate_interval=3600))
+        return store
+
+    def wait_for(self, condition, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if condition():
+                return True
+            time.sleep(0.02)
+        return condition()
+
+    def ids(self, store):
+        return [item['id'] for item in store.news().list()]
+
+    def check_nodes(self, first, second):
+        self.assertEqual(self.ids(first), [1])
+        self.assertEqual(self.ids(second), [1])
+
+        # كتابة خارج الخدمة لا تُرى قبل الإبطال: النسخة لا تفحص الملف مع كل قراءة
+        save_data(self.news_file, [make_item(1), make_item(2)])
+        self.assertEqual(self.ids(first), [1])
+
+        with second.transaction() as tx:
+            tx.put(make_item(3))
+        self.assertEqual(self.ids(second), [3, 2, 1])
+        self.assertTrue(self.wait_for(lambda: self.ids(first) == [3, 2, 1]))
+
+        # الإعدادات تُقرأ من الملف قبل التعديل حتى دون رسالة
+        self.assertTrue(second.save_settings({'colors': {'ticker': '#000'}}))
+        self.assertEqual(first.settings_for_update({})['colors']['ticker'], '#000')
+
+    def test_01_unix_socket_bus_invalidates_other_nodes(self):
+        """اختبار وصول الإبطال عبر مقابس Unix إلى النسخ الأخرى دون عودته إلى المرسل"""
+        directory = os.path.join(self.test_dir, 'bus')
+        first, second = self.make_node(UnixSocketBus(directory)), self.make_node(UnixSocketBus(directory))
+        self.check_nodes(first, second)
+        self.assertTrue(self.wait_for(lambda: self.buses[0].received == 2))
+        self.assertEqual(self.buses[1].received, 0)
+
+        # مقبس نسخة توقفت يُحذف عند أول إرسال
+        self.buses[0].close(timeout=1)
+        open(self.buses[0].path, 'w').close()
+        self.assertTrue(self.buses[1].publish('news'))
+        self.assertFalse(os.path.exists(self.buses[0].path))
+
+    def test_02_file_bus_tails_shared_log(self):
+        """اختبار الناقل الملفي: سطر لكل حفظ ناجح من النسخة التي كتبت فقط"""
+        path = os.path.join(self.test_dir, 'bus.log')
+        first, second = self.make_node(FileBus(path, poll_interval=0.01)), self.make_node(FileBus(path, poll_interval=0.01))
+        self.check_nodes(first, second)
+
+        with open(path, encoding='utf-8') as f:
+            messages = [json.loads(line) for line in f]
+        self.assertEqual([message['source'] for message in messages], ['news', 'settings'])
+        self.assertEqual({message['node'] for message in messages}, {self.buses[1].node_id})
+
+    def test_03_registered_adapter_and_app_wiring(self):
+        """اختبار تسجيل محول وسيط عبر register_bus وربطه بالتطبيق"""
+        with self.assertRaises(ValueError):
+            create_bus('redis://localhost:6379/0')
+        peers = []
+        register_bus('memory', lambda url: MemoryBus(peers))
+        other = self.make_node(MemoryBus(peers))
+        self.ids(other)
+        messages = []
+        peers[0].subscribe(messages.append)
+
+        app.config['NEWS_FILE'] = self.news_file
+        app.config['SETTINGS_FILE'] = os.path.join(self.test_dir, 'settings.json')
+        app.config['INVALIDATION_BUS'] = 'memory://local'
+        client = app.test_client()
+        node = json.loads(client.get('/health').data)['invalidation']['node']
+        self.assertEqual(node, peers[-1].node_id)
+        self.buses.append(peers[-1])
+
+        client.post('/api/news', json={'content': 'من التطبيق'})
+        self.assertEqual(len(self.ids(other)), 2)
+        self.assertEqual([(message['source'], message['version']) for message in messages], [('news', 1)])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import os
+import tempfile
+import shutil
+from app import app
+from metrics import Registry, render
+
+class MetricsTestCase(unittest.TestCase):
+    """مجموعة اختبارات لمقاييس Prometheus"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        app.config['DATA_DIR'] = self.test_dir
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        for key in ('DATA_DIR', 'METRICS_DIR'):
+            app.config.pop(key, None)
+
+    def test_01_workers_aggregate_through_shared_dir(self):
+        """اختبار جمع عدادات ومدرجات عدة عمال من المجلد المشترك"""
+        metrics_dir = os.path.join(self.test_dir, 'metrics')
+        first, second = Registry(), Registry()
+        for registry, seconds in ((first, 0.002), (second, 0.3)):
+            registry.inc('http_requests_total', {'route': '/api/ticker', 'method': 'GET', 'status': '200'})
+            registry.observe('http_request_duration_seconds', seconds, {'route': '/api/ticker', 'method': 'GET'})
+        first.flush(metrics_dir)
+        second.flush(metrics_dir)
+
+        text = render(second.collect(metrics_dir))
+        self.assertIn('naebak_news_http_requests_total{method="GET",route="/api/ticker",status="200"} 2', text)
+        self.assertIn('naebak_news_http_request_duration_seconds_bucket{method="GET",route="/api/ticker",le="0.0025"} 1', text)
+        self.assertIn('naebak_news_http_request_duration_seconds_bucket{method="GET",route="/api/ticker",le="0.5"} 2', text)
+        self.assertIn('naebak_news_http_request_duration_seconds_count{method="GET",route="/api/ticker"} 2', text)
+
+    def test_02_metrics_endpoint(self):
+        """اختبار نقطة /metrics: الطلبات والتخزين وعدد الأخبار وحجم الملفات"""
+        app.config['METRICS_DIR'] = os.path.join(self.test_dir, 'metrics')
+        client = app.test_client()
+        client.post('/api/news', json={'content': 'خبر'})
+        news_id = client.post('/api/news', json={'content': 'خبر آخر'}).get_json()['data']['id']
+        client.put(f'/api/news/{news_id}/archive')
+        client.get('/api/ticker')
+
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('text/plain'))
+        text = response.get_data(as_text=True)
+        self.assertIn('route="/api/news/<int:news_id>/archive",status="200"', text)
+        self.assertIn('naebak_news_storage_seconds_count{file="news.json",op="save",phase="io"}', text)
+        self.assertIn('naebak_news_storage_bytes_total{file="news.json",op="save"}', text)
+        self.assertIn('naebak_news_items{status="archived"} 1', text)
+        self.assertIn('naebak_news_items{status="published"} 1', text)
+        self.assertIn(f'naebak_news_data_file_bytes{{file="news.json"}} {os.path.getsize(os.path.join(self.test_dir, "news.json"))}', text)
+        self.assertTrue(os.listdir(app.config['METRICS_DIR']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import json
+from news_model import NewsItem, json_default
+from news_store import NewsState
+
+class NewsItemTestCase(unittest.TestCase):
+    """مجموعة اختبارات لنموذج الخبر المضغوط"""
+
+    def test_01_round_trips_exact_json_shape(self):
+        """اختبار إعادة نفس الخبر تماماً (الحقول وترتيبها) بعد الضغط"""
+        items = [
+            {'id': 1, 'content': 'خبر', 'status': 'published', 'created_at': '2025-01-01T10:00:00',
+             'updated_at': '2025-01-01T10:00:00.250000', 'publish_at': '2025-02-01T00:00:00'},
+            {'id': 2, 'content': None, 'created_at': '2025-01-01', 'updated_at': ''},
+            {'id': 3, 'status': 'draft', 'created_at': '2025-01-01T00:00:00+02:00', 'extra_field': [1]},
+        ]
+        for data in items:
+            item = NewsItem.from_dict(data)
+            self.assertEqual(json.dumps(item, default=json_default, ensure_ascii=False),
+                             json.dumps(data, ensure_ascii=False))
+            self.assertEqual(item, data)
+            self.assertEqual(dict(item, status='archived')['status'], 'archived')
+        self.assertFalse(hasattr(item, '__dict__'))
+
+        first = NewsItem.from_dict(items[0])
+        self.assertIsInstance(first.created, int)
+        self.assertIsNone(first.extra.get('created_at'))
+        self.assertIs(first.status, NewsItem.from_dict(json.loads(json.dumps(items[0]))).status)
+        self.assertEqual(NewsItem.from_dict(items[1]).get('status', 'missing'), 'missing')
+
+    def test_02_state_sorts_on_integer_keys(self):
+        """اختبار الترتيب والصفحات على المفاتيح الرقمية مع بقاء المؤشرات بصيغتها النصية"""
+        state = NewsState([
+            {'id': n, 'content': f'خبر {n}', 'status': 'published',
+             'created_at': f'2025-01-01T00:00:{60 - n:02d}', 'updated_at': ''}
+            for n in range(1, 6)
+        ])
+        page, next_key = state.page(status='published', limit=2)
+        self.assertEqual([item['id'] for item in page], [1, 2])
+        self.assertEqual(next_key, ('2025-01-01T00:00:58', 2))
+        self.assertTrue(all(isinstance(key[0], int) for key in state._index('published', None).keys))
+
+        state = state.apply([('put', {'id': 6, 'content': 'جديد', 'status': 'published',
+                                      'created_at': '2025-01-01T00:00:57.500000', 'updated_at': ''})])
+        self.assertIsInstance(state.get(6), NewsItem)
+        self.assertEqual([item['id'] for item in state.page(status='published', after=next_key)[0]], [6, 3, 4, 5])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import os
+import tempfile
+import shutil
+import threading
+import time
+from datetime import datetime
+from news_store import NewsState, NewsStore
+from storage import create_backend, load_data, save_data
+
+def make_item(news_id, status='published', created_at=None):
+    return {
+        'id': news_id,
+        'content': f'خبر {news_id}',
+        'status': status,
+        'created_at': created_at or f'2025-01-01T00:00:{news_id:02d}',
+        'updated_at': ''
+    }
+
+class NewsStateTestCase(unittest.TestCase):
+    """مجموعة اختبارات لحالة الأخبار في الذاكرة وفهارسها المرتبة"""
+
+    def test_01_page_uses_created_at_then_id(self):
+        """اختبار الترتيب من الأحدث مع كسر التعادل بالمعرّف"""
+        state = NewsState([make_item(1), make_item(2, created_at='2025-01-01T00:00:09'),
+                           make_item(3, created_at='2025-01-01T00:00:09')])
+        page, next_key = state.page(limit=2)
+        self.assertEqual([item['id'] for item in page], [3, 2])
+        page, next_key = state.page(limit=2, after=next_key)
+        self.assertEqual([item['id'] for item in page], [1])
+        self.assertIsNone(next_key)
+
+    def test_02_apply_updates_built_indexes_incrementally(self):
+        """اختبار تحديث الفهارس المبنية عند تطبيق التغييرات دون إعادة بنائها"""
+        state = NewsState([make_item(n, 'published' if n % 2 else 'archived') for n in range(1, 7)])
+        state.list(status='published')
+        state.list(exclude_status='archived')
+
+        new_state = state.apply([
+            ('put', make_item(1, 'archived')),
+            ('put', make_item(7)),
+            ('delete', 5),
+        ])
+
+        fresh = NewsState(list(new_state.items))
+        for args in (('published', None), ('archived', None), (None, 'archived')):
+            self.assertEqual(new_state.list(*args), fresh.list(*args))
+        self.assertEqual([item['id'] for item in new_state.list(status='published')], [7, 3])
+        # الحالة القديمة لا تتأثر
+        self.assertEqual([item['id'] for item in state.list(status='published')], [5, 3, 1])
+        self.assertEqual(new_state.max_id(), 7)
+
+    def test_03_schedule_index_and_visibility(self):
+        """اختبار فهرس أوقات النشر والانتهاء وتحديثه مع التغييرات"""
+        scheduled = dict(make_item(1), publish_at='2025-06-01T10:00:00')
+        expiring = dict(make_item(2), expire_at='2025-06-01T09:00:00')
+        state = NewsState([scheduled, expiring, make_item(3), make_item(4, 'draft')])
+
+        now = datetime(2025, 6, 1, 8, 0)
+        self.assertEqual(state.next_transition(now), datetime(2025, 6, 1, 9, 0))
+        self.assertEqual([item['id'] for item in state.visible(now)], [3, 2])
+        self.assertEqual([item['id'] for item in state.visible(datetime(2025, 6, 1, 10, 0))], [3, 1])
+        self.assertIsNone(state.next_transition(datetime(2025, 6, 1, 10, 0)))
+
+        new_state = state.apply([('put', dict(make_item(4), expire_at='2025-06-01T08:30:00')), ('delete', 2)])
+        self.assertEqual(new_state.next_transition(now), datetime(2025, 6, 1, 8, 30))
+        fresh = NewsState(list(new_state.items))
+        self.assertEqual(new_state._time_index().times, fresh._time_index().times)
+        # الحالة القديمة لا تتأثر
+        self.assertEqual(state.next_transition(now), datetime(2025, 6, 1, 9, 0))
+
+    def test_04_channel_indexes_and_counts(self):
+        """اختبار فهرس مستقل لكل قناة وتحديثه وعدد أخبار القنوات مع التغييرات"""
+        state = NewsState([dict(make_item(1), channels=['cairo']), dict(make_item(2), channels=['cairo', 'giza']),
+                           make_item(3), dict(make_item(4, 'draft'), channels=['giza'])])
+        now = datetime(2025, 6, 1)
+        self.assertEqual([item['id'] for item in state.visible(now, channel='cairo')], [2, 1])
+        self.assertEqual([item['id'] for item in state.visible(now, channel='giza')], [2])
+        self.assertEqual([item['id'] for item in state.visible(now)], [3, 2, 1])
+        self.assertEqual(state.channels(), {'cairo': 2, 'giza': 2})
+
+        new_state = state.apply([('put', dict(make_item(5), channels=['giza'])), ('put', make_item(2)), ('delete', 4)])
+        self.assertEqual([item['id'] for item in new_state.visible(now, channel='giza')], [5])
+        self.assertEqual([item['id'] for item in new_state.visible(now, channel='cairo')], [1])
+        self.assertEqual(new_state.channels(), {'cairo': 1, 'giza': 1})
+        self.assertEqual(NewsState(list(new_state.items)).channels(), new_state.channels())
+
+class NewsStoreSingleFlightTestCase(unittest.TestCase):
+    """مجموعة اختبارات لدمج عمليات إعادة البناء المتزامنة"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        self.news_file = os.path.join(self.test_dir, 'news.json')
+        save_data(self.news_file, [make_item(1)])
+        self.builds = 0
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def make_store(self, stale_window=0.0):
+        return NewsStore(create_backend('json', self.news_file), os.path.join(self.test_dir, 'settings.json'),
+                         loader=load_data, saver=save_data, stale_window=stale_window)
+
+    def slow_builder(self, release):
+        def build(news):
+            self.builds += 1
+            release.wait(5)
+            return [item['id'] for item in news.list()]
+        return build
+
+    def run_readers(self, store, builder, count):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.news_view('ids', builder)))
+                   for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        return threads, results
+
+    def test_01_concurrent_rebuilds_are_coalesced(self):
+        """اختبار أن خيطاً واحداً فقط يبني القيمة والبقية تنتظر نتيجته"""
+        store = self.make_store()
+        release = threading.Event()
+        threads, results = self.run_readers(store, self.slow_builder(release), 8)
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(results, [[1]] * 8)
+        self.assertEqual(self.builds, 1)
+        self.assertEqual(store.stats()['coalesced'], 7)
+        self.assertEqual(store.stats()['rebuilds'], 1)
+
+    def test_02_stale_while_revalidate(self):
+        """اختبار إرجاع القيمة القديمة أثناء إعادة البناء ضمن النافذة المضبوطة"""
+        store = self.make_store(stale_window=5.0)
+        store.news_view('ids', lambda news: [item['id'] for item in news.list()])
+        with store.transaction() as tx:
+            tx.put(make_item(2))
+
+        release = threading.Event()
+        threads, results = self.run_readers(store, self.slow_builder(release), 1)
+        time.sleep(0.1)
+        # البناء جارٍ: القارئ التالي يأخذ القيمة القديمة فوراً دون انتظار
+        self.assertEqual(store.news_view('ids', self.slow_builder(release)), [1])
+        self.assertEqual(store.stats()['stale_served'], 1)
+        release.set()
+        threads[0].join()
+        self.assertEqual(results, [[2, 1]])
+        self.assertEqual(store.news_view('ids', self.slow_builder(release)), [2, 1])
+        self.assertEqual(self.builds, 1)
+
+if __name__ == '__main__':
+    unittest.main()
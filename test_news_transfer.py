@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import io
+import json
+import os
+import tempfile
+import shutil
+from app import app
+from news_transfer import iter_ndjson
+from storage import load_data, save_data
+
+def make_item(news_id, day, status='published'):
+    created_at = f'2025-01-{day:02d}T10:00:00'
+    return {'id': news_id, 'content': f'خبر {news_id}', 'status': status,
+            'created_at': created_at, 'updated_at': created_at}
+
+class NewsTransferTestCase(unittest.TestCase):
+    """مجموعة اختبارات لتصدير الأخبار واستيرادها بصيغة NDJSON"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        self.news_file = os.path.join(self.test_dir, 'news.json')
+        app.config['NEWS_FILE'] = self.news_file
+        app.config['SETTINGS_FILE'] = os.path.join(self.test_dir, 'settings.json')
+        self.client = app.test_client()
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+        for key in ('NEWS_FILE', 'SETTINGS_FILE', 'EXPORT_CHUNK_SIZE', 'IMPORT_BATCH_SIZE'):
+            app.config.pop(key, None)
+
+    def export(self, query=''):
+        response = self.client.get(f'/api/news/export{query}')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        return [json.loads(line) for line in response.get_data().splitlines()]
+
+    def test_01_export_streams_with_filters(self):
+        """اختبار التصدير صفحة بعد صفحة مع التصفية حسب الحالة والتاريخ"""
+        save_data(self.news_file, [make_item(n, day=n, status='archived' if n % 3 == 0 else 'published')
+                                   for n in range(1, 8)])
+        app.config['EXPORT_CHUNK_SIZE'] = 2
+
+        response = self.client.get('/api/news/export')
+        self.assertTrue(response.is_streamed)
+        self.assertEqual([item['id'] for item in self.export()], [7, 6, 5, 4, 3, 2, 1])
+        self.assertEqual([item['id'] for item in self.export('?status=archived')], [6, 3])
+        self.assertEqual([item['id'] for item in self.export('?from=2025-01-03&to=2025-01-06')], [5, 4, 3])
+        self.assertEqual([item['id'] for item in self.export('?status=published&from=2025-01-02T10:00:00')],
+                         [7, 5, 4, 2])
+        self.assertEqual(self.client.get('/api/news/export?from=أمس').status_code, 400)
+
+    def test_02_import_upserts_in_batches(self):
+        """اختبار الاستيراد على أجزاء مع الإضافة أو الاستبدال حسب المعرّف والحفظ على دفعات"""
+        save_data(self.news_file, [make_item(1, day=1), make_item(2, day=2)])
+        app.config['IMPORT_BATCH_SIZE'] = 2
+        lines = [
+            json.dumps(dict(make_item(2, day=2), content='محدث'), ensure_ascii=False),
+            json.dumps(make_item(10, day=10, status='archived')),
+            '',
+            '{not json',
+            json.dumps({'id': 11, 'content': ''}),
+            json.dumps({'id': 12, 'content': 'بلا تاريخ', 'status': 'draft'}, ensure_ascii=False),
+        ]
+        body = '\n'.join(lines).encode('utf-8')
+
+        response = self.client.post('/api/news/import', data=body, content_type='application/x-ndjson')
+        report = json.loads(response.data)['data']
+        self.assertFalse(json.loads(response.data)['success'])
+        self.assertEqual((report['created'], report['updated'], report['failed']), (2, 1, 2))
+        self.assertEqual(report['batches'], 2)
+        self.assertEqual([error['line'] for error in report['errors']], [4, 5])
+
+        saved = {item['id']: item for item in load_data(self.news_file)}
+        self.assertEqual(sorted(saved), [1, 2, 10, 12])
+        self.assertEqual(saved[2]['content'], 'محدث')
+        self.assertEqual(saved[10]['status'], 'archived')
+        self.assertTrue(saved[12]['created_at'])
+
+        # التصدير ثم الاستيراد في مجلد فارغ يعيد نفس الأخبار، ولا يُعاد استخدام المعرّفات
+        exported = self.client.get('/api/news/export').get_data()
+        app.config['NEWS_FILE'] = os.path.join(self.test_dir, 'restored.json')
+        self.client.post('/api/news/import', data=exported, content_type='application/x-ndjson')
+        self.assertEqual(sorted(load_data(app.config['NEWS_FILE']), key=lambda item: item['id']),
+                         sorted(saved.values(), key=lambda item: item['id']))
+        new_id = json.loads(self.client.post('/api/news', json={'content': 'جديد'}).data)['data']['id']
+        self.assertEqual(new_id, 13)
+
+    def test_03_reader_handles_lines_split_across_chunks(self):
+        """اختبار قراءة الأسطر الممتدة عبر حدود الأجزاء"""
+        body = b'{"id": 1}\n{"id": 22}\r\n\n{"id": 333}'
+        records = list(iter_ndjson(io.BytesIO(body), chunk_size=4))
+        self.assertEqual([(line, value) for line, value, _ in records], [(1, {'id': 1}), (2, {'id': 22}), (4, {'id': 333})])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+from search import SearchIndex, normalize_arabic
+
+class SearchIndexTestCase(unittest.TestCase):
+    """مجموعة اختبارات للبحث النصي العربي"""
+
+    def test_01_normalize_arabic(self):
+        """اختبار حذف التشكيل والتطويل وتوحيد الألف والهمزة والتاء المربوطة"""
+        self.assertEqual(normalize_arabic('الجَلْسَةُ'), 'الجلسه')
+        self.assertEqual(normalize_arabic('القادمـــة'), 'القادمه')
+        self.assertEqual(normalize_arabic('أحمد إلى آخر'), 'احمد الي اخر')
+
+    def test_02_prefix_and_status_filter(self):
+        """اختبار البحث بالبادئة والتصفية حسب الحالة"""
+        index = SearchIndex()
+        index.rebuild([
+            {'id': 1, 'content': 'انعقاد الجلسة العامة للمجلس', 'status': 'published'},
+            {'id': 2, 'content': 'تأجيل جلسة الاستماع', 'status': 'archived'},
+            {'id': 3, 'content': 'إطلاق ميزات جديدة', 'status': 'published'},
+        ])
+        self.assertEqual(index.search('جلسه'), {1, 2})
+        self.assertEqual(index.search('جلس'), {1, 2})
+        self.assertEqual(index.search('جلس', prefix=False), set())
+        self.assertEqual(index.search('جلسة', status='archived'), {2})
+        self.assertEqual(index.search('اطلاق ميزات'), {3})
+        self.assertEqual(index.search('اطلاق الجلسة'), set())
+
+    def test_03_incremental_updates(self):
+        """اختبار تحديث الفهرس تدريجياً من تغييرات المخزن"""
+        index = SearchIndex()
+        index.rebuild([{'id': 1, 'content': 'خبر قديم', 'status': 'published'}])
+        index.on_change('news', [
+            ('put', {'id': 1, 'content': 'خبر محدث', 'status': 'archived'}),
+            ('put', {'id': 2, 'content': 'خبر جديد', 'status': 'published'}),
+        ])
+        self.assertEqual(index.search('قديم'), set())
+        self.assertEqual(index.search('محدث', status='archived'), {1})
+        index.on_change('news', [('delete', 2)])
+        self.assertEqual(index.search('خبر'), {1})
+        self.assertEqual(index.rebuilds, 1)
+
+        # إعادة التحميل من القرص تجعل الفهرس قديماً فيُعاد بناؤه عند البحث التالي
+        index.on_change('news', None)
+        self.assertTrue(index.stale)
+
+if __name__ == '__main__':
+    unittest.main()
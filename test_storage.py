@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import unittest
+import json
+import os
+import tempfile
+import shutil
+from datetime import datetime
+from news_store import NewsStore
+from storage import JournalBackend, SqliteBackend, TieredBackend, load_data, save_data
+
+class JournalBackendTestCase(unittest.TestCase):
+    """مجموعة اختبارات لمحرك السجل الإلحاقي"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        self.news_file = os.path.join(self.test_dir, 'news.json')
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def make_item(self, news_id, status='published'):
+        return {
+            'id': news_id,
+            'content': f'خبر {news_id}',
+            'status': status,
+            'created_at': f'2025-01-01T00:00:{news_id:02d}',
+            'updated_at': f'2025-01-01T00:00:{news_id:02d}'
+        }
+
+    def test_01_commit_appends_and_load_replays(self):
+        """اختبار إلحاق التغييرات بالسجل وإعادة تطبيقها عند التحميل"""
+        backend = JournalBackend(self.news_file)
+        backend.commit([], [('put', self.make_item(1)), ('put', self.make_item(2))])
+        backend.commit([], [('put', self.make_item(1, status='archived'))])
+        backend.commit([], [('delete', 2)])
+
+        # اللقطة لا تُكتب عند كل تغيير
+        self.assertFalse(os.path.exists(self.news_file))
+        with open(backend.journal_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(len(f.readlines()), 4)
+
+        news = JournalBackend(self.news_file).load()
+        self.assertEqual(len(news), 1)
+        self.assertEqual(news[0]['status'], 'archived')
+
+    def test_02_ignores_torn_last_record(self):
+        """اختبار تجاهل سطر مقطوع في نهاية السجل"""
+        backend = JournalBackend(self.news_file)
+        backend.commit([], [('put', self.make_item(1))])
+        with open(backend.journal_file, 'a', encoding='utf-8') as f:
+            f.write('{"op": "put", "item": {"id"')
+
+        news = JournalBackend(self.news_file).load()
+        self.assertEqual([item['id'] for item in news], [1])
+
+    def test_03_background_compaction(self):
+        """اختبار دمج السجل في لقطة عند تجاوز حد عدد السجلات"""
+        backend = JournalBackend(self.news_file, max_records=3)
+        for news_id in range(1, 4):
+            backend.commit([], [('put', self.make_item(news_id))])
+        backend.wait_for_compaction(timeout=5)
+
+        self.assertEqual(backend.compactions, 1)
+        self.assertFalse(os.path.exists(backend.journal_file))
+        self.assertFalse(os.path.exists(backend.compacting_file))
+        self.assertEqual(len(load_data(self.news_file)), 3)
+
+        backend.commit([], [('delete', 3)])
+        news = JournalBackend(self.news_file).load()
+        self.assertEqual(sorted(item['id'] for item in news), [1, 2])
+
+    def test_04_app_with_journal_backend(self):
+        """اختبار عمل نقاط النهاية مع محرك السجل"""
+        from app import app
+        app.config['NEWS_BACKEND'] = 'journal'
+        app.config['NEWS_FILE'] = self.news_file
+        app.config['SETTINGS_FILE'] = os.path.join(self.test_dir, 'settings.json')
+        try:
+            client = app.test_client()
+            response = client.post('/api/news', data=json.dumps({'content': 'خبر'}), content_type='application/json')
+            news_id = json.loads(response.data)['data']['id']
+            client.put(f'/api/news/{news_id}/archive')
+
+            self.assertTrue(os.path.exists(self.news_file + '.journal'))
+            archived = json.loads(client.get('/api/news/archived').data)
+            self.assertEqual(archived['count'], 1)
+        finally:
+            for key in ('NEWS_BACKEND', 'NEWS_FILE', 'SETTINGS_FILE'):
+                app.config.pop(key, None)
+
+class SqliteBackendTestCase(unittest.TestCase):
+    """مجموعة اختبارات لمحرك SQLite"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        self.news_file = os.path.join(self.test_dir, 'news.json')
+        self.db_file = os.path.join(self.test_dir, 'news.db')
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def test_01_migrates_existing_json_once(self):
+        """اختبار الترحيل لمرة واحدة من ملف news.json"""
+        save_data(self.news_file, [
+            {'id': 1, 'content': 'أ', 'status': 'published', 'created_at': '2025-01-01T00:00:01', 'updated_at': ''},
+            {'id': 2, 'content': 'ب', 'status': 'archived', 'created_at': '2025-01-01T00:00:02', 'updated_at': ''},
+        ])
+        backend = SqliteBackend(self.news_file, self.db_file)
+        self.assertEqual(backend.count(), 2)
+
+        # إعادة الفتح لا تعيد الترحيل حتى لو تغير ملف JSON
+        save_data(self.news_file, [])
+        self.assertEqual(SqliteBackend(self.news_file, self.db_file).count(), 2)
+
+    def test_02_queries_use_status_created_index(self):
+        """اختبار الاستعلامات والفهرس المركب"""
+        backend = SqliteBackend(self.news_file, self.db_file)
+        version = backend.signature()
+        backend.commit(None, [
+            ('put', {'id': n, 'content': f'خبر {n}', 'status': 'published' if n % 2 else 'archived',
+                     'created_at': f'2025-01-01T00:00:{n:02d}', 'updated_at': '', 'extra_field': n})
+            for n in range(1, 7)
+        ])
+        self.assertNotEqual(backend.signature(), version)
+
+        ticker = backend.list(status='published', limit=2)
+        self.assertEqual([item['id'] for item in ticker], [5, 3])
+        self.assertEqual(backend.get(4)['extra_field'], 4)
+        self.assertIsNone(backend.get(99))
+
+        plan = ' '.join(row[3] for row in backend._connection().execute(
+            'EXPLAIN QUERY PLAN SELECT * FROM news WHERE status = ? ORDER BY created_at DESC LIMIT 10',
+            ('published',)))
+        self.assertIn('idx_news_status_created', plan)
+
+        backend.commit(None, [('delete', 5)])
+        self.assertEqual([item['id'] for item in backend.list(status='published')], [3, 1])
+
+        page, next_key = backend.page(status='published', limit=1)
+        self.assertEqual([item['id'] for item in page], [3])
+        page, next_key = backend.page(status='published', limit=1, after=next_key)
+        self.assertEqual([item['id'] for item in page], [1])
+        self.assertIsNone(next_key)
+
+    def test_03_app_with_sqlite_backend(self):
+        """اختبار عمل نقاط النهاية مع محرك SQLite"""
+        from app import app
+        app.config['NEWS_BACKEND'] = 'sqlite'
+        app.config['NEWS_FILE'] = self.news_file
+        app.config['NEWS_DB_FILE'] = self.db_file
+        app.config['SETTINGS_FILE'] = os.path.join(self.test_dir, 'settings.json')
+        try:
+            client = app.test_client()
+            response = client.post('/api/news', data=json.dumps({'content': 'خبر'}), content_type='application/json')
+            news_id = json.loads(response.data)['data']['id']
+            client.put(f'/api/news/{news_id}', data=json.dumps({'content': 'محدث'}), content_type='application/json')
+
+            ticker = json.loads(client.get('/api/ticker').data)
+            self.assertEqual(ticker['data'][0]['content'], 'محدث')
+            client.put(f'/api/news/{news_id}/archive')
+            self.assertEqual(json.loads(client.get('/api/ticker').data)['count'], 0)
+            self.assertEqual(json.loads(client.get('/api/news/archived').data)['count'], 1)
+        finally:
+            for key in ('NEWS_BACKEND', 'NEWS_FILE', 'NEWS_DB_FILE', 'SETTINGS_FILE'):
+                app.config.pop(key, None)
+
+class TieredBackendTestCase(unittest.TestCase):
+    """مجموعة اختبارات للتخزين المتدرج"""
+
+    def setUp(self):
+        """إعداد بيئة الاختبار"""
+        self.test_dir = tempfile.mkdtemp()
+        self.news_file = os.path.join(self.test_dir, 'news.json')
+        self.archive_dir = os.path.join(self.test_dir, 'news.archive')
+
+    def tearDown(self):
+        """تنظيف بيئة الاختبار"""
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def make_item(self, news_id, month, status='archived'):
+        return {'id': news_id, 'content': f'خبر {news_id}', 'status': status,
+                'created_at': f'2025-{month:02d}-01T00:00:{news_id:02d}', 'updated_at': ''}
+
+    def make_store(self):
+        return NewsStore(TieredBackend(self.news_file, self.archive_dir), os.path.join(self.test_dir, 'settings.json'),
+                         loader=load_data, saver=save_data)
+
+    def test_01_migrates_archived_into_monthly_segments(self):
+        """اختبار نقل الأخبار المؤرشفة من news.json إلى قطع شهرية لا تُقرأ إلا عند الحاجة"""
+        news = [self.make_item(n, month=1 + n % 3) for n in range(1, 10)]
+        news += [self.make_item(10, month=4, status='published'), self.make_item(11, month=4, status='draft')]
+        save_data(self.news_file, news)
+
+        store = self.make_store()
+        state = store.news()
+        archive = store.backend.archive
+        self.assertEqual([item['id'] for item in load_data(self.news_file)], [10, 11])
+        self.assertEqual(sorted(archive.manifest()), ['2025-01', '2025-02', '2025-03'])
+        self.assertEqual(archive.manifest()['2025-02']['count'], 3)
+        self.assertEqual(len(load_data(os.path.join(self.archive_dir, '2025-03.json'))), 3)
+
+        # الشريط والعدادات لا تقرأ أي قطعة
+        archive._segments.clear()
+        loads = archive.segment_loads
+        self.assertEqual([item['id'] for item in state.visible(datetime.now())], [10])
+        self.assertEqual(state.count('archived'), 9)
+        self.assertEqual(state.status_counts(), {'archived': 9, 'published': 1, 'draft': 1})
+        self.assertEqual([item['id'] for item in state.page(exclude_status='archived')[0]], [11, 10])
+        self.assertEqual(archive.segment_loads, loads)
+
+        # صفحات الأرشيف تقرأ القطع تدريجياً من الأحدث
+        page, next_key = state.page(status='archived', limit=2)
+        self.assertEqual([item['id'] for item in page], [8, 5])
+        self.assertEqual(archive.segment_loads, loads + 1)
+        page, next_key = state.page(status='archived', limit=2, after=next_key)
+        self.assertEqual([item['id'] for item in page], [2, 7])
+        self.assertEqual(archive.segment_loads, loads + 2)
+        pages = [page]
+        while next_key is not None:
+            page, next_key = state.page(status='archived', limit=2, after=next_key)
+            pages.append(page)
+        self.assertEqual([item['id'] for page in pages for item in page], [2, 7, 4, 1, 9, 6, 3])
+
+        # الصفحات بلا تصفية تدمج الطبقتين
+        page, next_key = state.page(limit=3)
+        self.assertEqual([item['id'] for item in page], [11, 10, 8])
+        self.assertEqual([item['id'] for item in state.page(limit=3, after=next_key)[0]], [5, 2, 7])
+
+    def test_02_archive_and_restore_round_trip(self):
+        """اختبار الأرشفة والاستعادة والحذف عبر نقاط النهاية"""
+        from app import app
+        app.config['NEWS_BACKEND'] = 'tiered'
+        app.config['NEWS_FILE'] = self.news_file
+        app.config['NEWS_ARCHIVE_DIR'] = self.archive_dir
+        app.config['SETTINGS_FILE'] = os.path.join(self.test_dir, 'settings.json')
+        try:
+            client = app.test_client()
+            ids = [json.loads(client.post('/api/news', json={'content': f'خبر {n}'}).data)['data']['id']
+                   for n in range(3)]
+            client.put(f'/api/news/{ids[0]}/archive')
+            client.put(f'/api/news/{ids[1]}/archive')
+
+            self.assertEqual([item['id'] for item in load_data(self.news_file)], [ids[2]])
+            archived = json.loads(client.get('/api/news/archived').data)
+            self.assertEqual([item['id'] for item in archived['data']], [ids[1], ids[0]])
+            self.assertEqual(json.loads(client.get('/api/ticker').data)['count'], 1)
+
+            response = client.put(f'/api/news/{ids[0]}', json={'content': 'محدث'})
+            self.assertEqual(json.loads(response.data)['data']['content'], 'محدث')
+            self.assertEqual(json.loads(client.get('/api/news/archived').data)['data'][1]['content'], 'محدث')
+            client.put(f'/api/news/{ids[0]}/unarchive')
+            client.delete(f'/api/news/{ids[1]}')
+            self.assertEqual(json.loads(client.get('/api/news/archived').data)['count'], 0)
+            self.assertEqual(sorted(item['id'] for item in load_data(self.news_file)), [ids[0], ids[2]])
+            self.assertEqual(json.loads(client.get('/api/ticker').data)['count'], 2)
+            self.assertEqual(os.listdir(self.archive_dir), ['manifest.json'])
+
+            # معرّف جديد لا يعيد استخدام معرّفات الأرشيف
+            new_id = json.loads(client.post('/api/news', json={'content': 'جديد'}).data)['data']['id']
+            self.assertGreater(new_id, max(ids))
+        finally:
+            for key in ('NEWS_BACKEND', 'NEWS_FILE', 'NEWS_ARCHIVE_DIR', 'SETTINGS_FILE'):
+                app.config.pop(key, None)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+بث الشريط الإخباري عبر Server-Sent Events
+Server-Sent Events push for the News Ticker
+
+يرسل لكل عميل لقطة الشريط الحالية ثم فرقاً (أو لقطة كاملة) عند كل تغيير،
+مع رسائل نبض دورية واستئناف الاتصال عبر Last-Event-ID.
+معرّف كل حدث هو ETag حمولة الشريط، فهو ثابت بين العمال ويصلح للاستئناف عند أي عامل.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from news_model import json_default
+
+
+def format_event(event, data, event_id=None):
+    """تنسيق حدث SSE واحد"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=json_default)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def diff_items(old_items, new_items):
+    """الفرق بين قائمتي أخبار: العناصر الجديدة أو المعدلة، والمعرّفات المحذوفة، والترتيب الجديد"""
+    old_by_id = {item['id']: item for item in old_items}
+    new_ids = {item['id'] for item in new_items}
+    return {
+        'upserted': [item for item in new_items if old_by_id.get(item['id']) != item],
+        'removed': [news_id for news_id in old_by_id if news_id not in new_ids],
+        'order': [item['id'] for item in new_items],
+    }
+
+
+class TickerBroadcaster:
+    """ينبه المشتركين عند تغير الشريط ويحتفظ بآخر اللقطات لحساب الفروقات عند الاستئناف"""
+
+    def __init__(self, history_size=64):
+        self._condition = threading.Condition()
+        # يزداد عند كل تنبيه؛ المشترك يقارنه بآخر قيمة رآها حتى لا يفوته تنبيه
+        self._generation = 0
+        self._history = OrderedDict()
+        self._history_size = history_size
+        # مشتركو نمط ASGI: (حلقة الأحداث، asyncio.Event) يُنبَّهون من خيط الحفظ بأمان
+        self._async_waiters = set()
+        self.subscribers = 0
+
+    def notify(self, *args):
+        """تنبيه جميع المشتركين لإعادة فحص الشريط (يصلح كمستمع لتغييرات المخزن)"""
+        with self._condition:
+            self._generation += 1
+            self._condition.notify_all()
+            waiters = list(self._async_waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # الحلقة أُغلقت؛ المشترك سيُزال عند انتهاء مولّده
+                pass
+
+    def remember(self, snapshot):
+        with self._condition:
+            self._history[snapshot.etag] = snapshot.payload['data']
+            self._history.move_to_end(snapshot.etag)
+            while len(self._history) > self._history_size:
+                self._history.popitem(last=False)
+
+    def previous(self, etag):
+        with self._condition:
+            return self._history.get(etag)
+
+    def wait(self, generation, timeout):
+        """الانتظار حتى تنبيه جديد أو انتهاء المهلة؛ يعيد رقم التنبيه الحالي"""
+        with self._condition:
+            if self._generation == generation:
+                self._condition.wait(timeout)
+            return self._generation
+
+    def _event(self, snapshot, sent_etag):
+        """لقطة كاملة لمشترك جديد، أو فرق عن آخر لقطة أرسلت إليه إن كانت في السجل"""
+        self.remember(snapshot)
+        previous = self.previous(sent_etag) if sent_etag else None
+        if previous is None:
+            return format_event('snapshot', snapshot.payload, snapshot.etag)
+        return format_event('diff', diff_items(previous, snapshot.payload['data']), snapshot.etag)
+
+    @staticmethod
+    def _timeout(heartbeat_at, wake_in):
+        """مدة الانتظار: حتى موعد النبض أو أقرب تغيير مجدول في الشريط أيهما أسبق"""
+        timeout = heartbeat_at - time.monotonic()
+        scheduled = wake_in() if wake_in is not None else None
+        if scheduled is not None:
+            timeout = min(timeout, scheduled)
+        return max(0.0, timeout)
+
+    def stream(self, current, last_event_id=None, heartbeat=15.0, retry_ms=3000, wake_in=None):
+        """
+        مولّد أحداث SSE لمشترك واحد.
+        current(): دالة تعيد لقطة الشريط الحالية (Snapshot بحمولة ومعرّف ETag).
+        wake_in(): ثوانٍ حتى أقرب تغيير مجدول (publish_at / expire_at) أو None؛ يوقظ المشترك عند الموعد دون تنبيه.
+        """
+        with self._condition:
+            self.subscribers += 1
+            generation = self._generation
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            sent_etag = last_event_id
+            heartbeat_at = time.monotonic() + heartbeat
+            while True:
+                snapshot = current()
+                if snapshot.etag != sent_etag:
+                    yield self._event(snapshot, sent_etag)
+                    sent_etag = snapshot.etag
+                    heartbeat_at = time.monotonic() + heartbeat
+                    continue
+
+                generation = self.wait(generation, self._timeout(heartbeat_at, wake_in))
+                if time.monotonic() >= heartbeat_at:
+                    # لا تغيير خلال المهلة: رسالة نبض تبقي الاتصال مفتوحاً عبر الوسطاء
+                    yield ': heartbeat\n\n'
+                    heartbeat_at = time.monotonic() + heartbeat
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+
+    async def astream(self, current, last_event_id=None, heartbeat=15.0, retry_ms=3000, wake_in=None):
+        """
+        نسخة غير متزامنة من stream لنمط ASGI: لا تحجز خيطاً لكل مشترك.
+        current() تُستدعى في خيط منفصل لأنها قد تقرأ الملفات من القرص.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        event = waiter[1]
+        with self._condition:
+            self.subscribers += 1
+            self._async_waiters.add(waiter)
+        try:
+            yield f'retry: {retry_ms}\n\n'
+            sent_etag = last_event_id
+            heartbeat_at = time.monotonic() + heartbeat
+            while True:
+                # المسح قبل الفحص: أي تنبيه بعده يوقظ الانتظار التالي فلا يفوت
+                event.clear()
+                snapshot = await asyncio.to_thread(current)
+                if snapshot.etag != sent_etag:
+                    yield self._event(snapshot, sent_etag)
+                    sent_etag = snapshot.etag
+                    heartbeat_at = time.monotonic() + heartbeat
+                    continue
+
+                timeout = await asyncio.to_thread(self._timeout, heartbeat_at, wake_in)
+                try:
+                    await asyncio.wait_for(event.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                if time.monotonic() >= heartbeat_at:
+                    yield ': heartbeat\n\n'
+                    heartbeat_at = time.monotonic() + heartbeat
+        finally:
+            with self._condition:
+                self.subscribers -= 1
+                self._async_waiters.discard(waiter)